@@ -0,0 +1,101 @@
+"""
+Cache de modelos carregados, com recarga quando o arquivo muda e troca atômica da Q-table
+"""
+
+import os
+import threading
+
+
+def assinatura_arquivo(caminho):
+    """
+    Identifica a versão de um arquivo de modelo no disco
+
+    Args:
+        caminho (str): Caminho do modelo
+
+    Returns:
+        tuple or None: (mtime em ns, tamanho, inode) ou None se o arquivo não existe
+    """
+    try:
+        info = os.stat(caminho)
+    except FileNotFoundError:
+        return None
+    return info.st_mtime_ns, info.st_size, info.st_ino
+
+
+class CacheModelos:
+    """Guarda uma tabela por caminho e só recarrega quando mtime, tamanho ou inode mudam"""
+
+    def __init__(self):
+        self._entradas = {}
+        self._trava = threading.Lock()
+
+    def carregar(self, agente, caminho):
+        """
+        Coloca no agente a versão atual do modelo, lendo o disco só se o arquivo mudou
+
+        A tabela é trocada de uma vez por QLearningAgent.trocar_tabela; chame entre
+        partidas para que cada partida use um único snapshot do modelo.
+
+        Args:
+            agente (QLearningAgent): Agente que recebe a tabela
+            caminho (str): Caminho do modelo
+
+        Returns:
+            bool: True se o agente tem o modelo do arquivo, False se o arquivo não existe
+        """
+        # O mesmo arquivo lido por agentes de outro backend ou tabuleiro é outra entrada
+        chave = (os.path.abspath(caminho), agente.backend,
+                 agente.geometria.tamanho, agente.geometria.em_linha)
+        assinatura = assinatura_arquivo(caminho)
+        if assinatura is None:
+            return False
+
+        with self._trava:
+            entrada = self._entradas.get(chave)
+            if entrada is None or entrada[0] != assinatura:
+                entrada = self._ler(agente, caminho, assinatura)
+                if entrada is None:
+                    return False
+                self._entradas[chave] = entrada
+
+        if agente.tabela_atual() is not entrada[1]:
+            agente.trocar_tabela(entrada[1])
+        return True
+
+    def _ler(self, agente, caminho, assinatura):
+        """Lê o modelo num agente temporário, sem tocar no agente em uso"""
+        from agente.qlearning import QLearningAgent
+
+        geometria = agente.geometria
+        temporario = QLearningAgent(backend=agente.backend, simetria=agente.simetria,
+                                    tamanho=geometria.tamanho, em_linha=geometria.em_linha)
+        if not temporario.load_model(caminho):
+            return None
+        if temporario.backend == 'numpy':
+            # Compartilhado entre agentes: quem for treinar copia antes de alterar
+            temporario.q_table.flags.writeable = False
+        # O arquivo pode ter sido trocado durante a leitura; guarda a versão do início
+        # para que a próxima consulta confira de novo
+        if assinatura_arquivo(caminho) != assinatura:
+            assinatura = None
+        return assinatura, temporario.tabela_atual()
+
+    def descartar(self, caminho=None):
+        """
+        Remove entradas do cache
+
+        Args:
+            caminho (str or None): Caminho do modelo; None limpa o cache inteiro
+        """
+        with self._trava:
+            if caminho is None:
+                self._entradas.clear()
+                return
+            alvo = os.path.abspath(caminho)
+            for chave in [c for c in self._entradas if c[0] == alvo]:
+                del self._entradas[chave]
+
+
+# Cache compartilhado pelo processo
+cache_padrao = CacheModelos()
@@ -0,0 +1,179 @@
+"""
+Formato binário versionado da Q-table, lido com numpy.memmap sem cópia
+
+Layout do arquivo (little-endian):
+
+    cabeçalho (64 bytes)  magic, versão, tipo dos valores, denso/esparso, flags,
+                          número de estados, de ações, de linhas gravadas e escala
+    índices (esparso)     uint32[num_linhas] com o estado de cada linha, em ordem crescente
+    valores               tipo[num_linhas, num_acoes] (float32, float16 ou int8 * escala)
+
+Cada seção começa em um deslocamento múltiplo de 64 bytes.
+"""
+
+import struct
+
+import numpy as np
+
+MAGIC = b'TTTQTAB\x00'
+VERSAO = 1
+ALINHAMENTO = 64
+
+# Campos: magic, versão, tipo, esparso, flags, num_estados, num_acoes, num_linhas, escala
+_CABECALHO = struct.Struct('<8sHBBIIIId')
+TAMANHO_CABECALHO = ALINHAMENTO
+
+TIPOS_VALOR = {
+    'float32': (0, np.float32),
+    'float16': (1, np.float16),
+    'int8': (2, np.int8),
+}
+_TIPO_POR_CODIGO = {codigo: (nome, dtype) for nome, (codigo, dtype) in TIPOS_VALOR.items()}
+
+FLAG_SIMETRIA = 1
+
+
+class FormatoInvalido(ValueError):
+    """Arquivo que não está no formato binário da Q-table ou em versão não suportada"""
+
+
+def _alinhar(deslocamento):
+    return -(-deslocamento // ALINHAMENTO) * ALINHAMENTO
+
+
+def eh_formato_binario(caminho):
+    """
+    Args:
+        caminho (str): Caminho do arquivo
+
+    Returns:
+        bool: True se o arquivo começa com o magic do formato binário
+    """
+    try:
+        with open(caminho, 'rb') as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def salvar_tabela(arquivo, q_table, tipo_valor='float32', esparso=False, simetria=False, linhas=None):
+    """
+    Grava a Q-table densa no formato binário
+
+    Args:
+        arquivo (file): Arquivo aberto em modo binário para escrita
+        q_table (numpy.ndarray): Array (num_estados, num_acoes) de valores Q
+        tipo_valor (str): 'float32', 'float16' ou 'int8' (quantizado com escala)
+        esparso (bool or None): Grava só as linhas com algum valor diferente de zero;
+            None decide pelo menor arquivo
+        simetria (bool): Se a tabela foi treinada com estados canônicos
+        linhas (numpy.ndarray or None): Grava no formato esparso exatamente estas linhas,
+            em ordem crescente, mesmo as zeradas (diferenças dos checkpoints de treino)
+    """
+    if tipo_valor not in TIPOS_VALOR:
+        raise ValueError(f"Tipo de valor desconhecido: {tipo_valor!r} (use {', '.join(TIPOS_VALOR)})")
+    codigo, dtype = TIPOS_VALOR[tipo_valor]
+    num_estados, num_acoes = q_table.shape
+
+    if linhas is not None:
+        linhas_usadas = np.asarray(linhas, dtype=np.uint32)
+        esparso = True
+    else:
+        linhas_usadas = np.flatnonzero(np.any(q_table != 0, axis=1)).astype(np.uint32)
+    if esparso is None:
+        tamanho_linha = num_acoes * np.dtype(dtype).itemsize
+        esparso = len(linhas_usadas) * (tamanho_linha + 4) < num_estados * tamanho_linha
+    valores = q_table[linhas_usadas] if esparso else q_table
+
+    escala = 1.0
+    if tipo_valor == 'int8':
+        maximo = float(np.abs(valores).max()) if valores.size else 0.0
+        escala = maximo / 127.0 if maximo > 0 else 1.0
+        valores = np.clip(np.rint(valores / escala), -127, 127)
+
+    flags = FLAG_SIMETRIA if simetria else 0
+    cabecalho = _CABECALHO.pack(MAGIC, VERSAO, codigo, int(bool(esparso)), flags,
+                                num_estados, num_acoes, len(valores), escala)
+    arquivo.write(cabecalho.ljust(TAMANHO_CABECALHO, b'\x00'))
+
+    deslocamento = TAMANHO_CABECALHO
+    if esparso:
+        dados = linhas_usadas.astype('<u4').tobytes()
+        arquivo.write(dados)
+        deslocamento += len(dados)
+        arquivo.write(b'\x00' * (_alinhar(deslocamento) - deslocamento))
+    arquivo.write(np.ascontiguousarray(valores, dtype=np.dtype(dtype).newbyteorder('<')).tobytes())
+
+
+class ModeloMapeado:
+    """Q-table mapeada de um arquivo binário, sem copiar os valores para a memória do processo"""
+
+    def __init__(self, caminho, modo='c'):
+        """
+        Abre o arquivo e mapeia suas seções
+
+        Args:
+            caminho (str): Caminho do arquivo binário
+            modo (str): Modo do numpy.memmap: 'r' (somente leitura) ou 'c' (cópia na escrita,
+                as páginas continuam compartilhadas até serem alteradas)
+        """
+        with open(caminho, 'rb') as f:
+            bruto = f.read(_CABECALHO.size)
+        if len(bruto) < _CABECALHO.size or not bruto.startswith(MAGIC):
+            raise FormatoInvalido(f"{caminho} não é um modelo binário da Q-table")
+        (_, versao, codigo, esparso, flags, num_estados, num_acoes,
+         num_linhas, escala) = _CABECALHO.unpack(bruto)
+        if versao != VERSAO:
+            raise FormatoInvalido(f"Versão {versao} do formato não suportada (esperada {VERSAO})")
+        if codigo not in _TIPO_POR_CODIGO:
+            raise FormatoInvalido(f"Tipo de valor desconhecido no arquivo: {codigo}")
+
+        self.caminho = caminho
+        self.tipo_valor, dtype = _TIPO_POR_CODIGO[codigo]
+        self.esparso = bool(esparso)
+        self.simetria = bool(flags & FLAG_SIMETRIA)
+        self.num_estados = num_estados
+        self.num_acoes = num_acoes
+        self.escala = escala
+
+        deslocamento = TAMANHO_CABECALHO
+        self.indices = None
+        if self.esparso:
+            if num_linhas:
+                self.indices = np.memmap(caminho, dtype='<u4', mode='r',
+                                         offset=deslocamento, shape=(num_linhas,))
+            else:
+                self.indices = np.zeros(0, dtype=np.uint32)
+            deslocamento = _alinhar(deslocamento + 4 * num_linhas)
+        if num_linhas:
+            self.valores = np.memmap(caminho, dtype=np.dtype(dtype).newbyteorder('<'), mode=modo,
+                                     offset=deslocamento, shape=(num_linhas, num_acoes))
+        else:
+            self.valores = np.zeros((0, num_acoes), dtype=dtype)
+
+    def tabela_densa(self):
+        """
+        Tabela (num_estados, num_acoes) pronta para consulta
+
+        Arquivos densos devolvem o próprio memmap (sem cópia; int8 continua quantizado,
+        ver escala). Arquivos esparsos são expandidos para um array float32 novo.
+
+        Returns:
+            numpy.ndarray: Tabela densa
+        """
+        if not self.esparso:
+            return self.valores
+        densa = np.zeros((self.num_estados, self.num_acoes), dtype=np.float32)
+        densa[self.indices] = self.valores
+        if self.tipo_valor == 'int8':
+            densa *= self.escala
+        return densa
+
+    def escala_da_tabela_densa(self):
+        """
+        Returns:
+            float: Fator que converte os valores de tabela_densa() para valores Q
+        """
+        if self.tipo_valor == 'int8' and not self.esparso:
+            return self.escala
+        return 1.0
@@ -0,0 +1,286 @@
+"""
+Agente de busca em árvore Monte Carlo (MCTS) com UCT, reaproveitamento da árvore e simulações em lote
+"""
+
+import math
+import random
+import time
+
+from jogo.bitboard import como_bitboard, obter_geometria
+
+try:
+    import numpy as np
+except ImportError:  # Sem NumPy as simulações rodam uma a uma em Python puro
+    np = None
+
+# Valores dos jogadores nos arrays das simulações
+_X = 1
+_O = 2
+
+
+class No:
+    """Nó da árvore: posição, estatísticas de visita e filhos por casa jogada"""
+
+    __slots__ = ('x', 'o', 'vez_x', 'terminal', 'filhos', 'nao_expandidas', 'visitas', 'valor')
+
+    def __init__(self, x, o, vez_x, terminal, livres):
+        """
+        Args:
+            x (int): Máscara das casas de X
+            o (int): Máscara das casas de O
+            vez_x (bool): Se X joga nesta posição
+            terminal (int or None): None em andamento; senão _X, _O ou 0 (empate)
+            livres (list): Casas vazias ainda não expandidas
+        """
+        self.x = x
+        self.o = o
+        self.vez_x = vez_x
+        self.terminal = terminal
+        self.filhos = {}
+        self.nao_expandidas = livres
+        self.visitas = 0
+        # Soma dos resultados (1 vitória, 0.5 empate) de quem jogou para chegar aqui
+        self.valor = 0.0
+
+
+class AgenteMCTS:
+    """Jogador MCTS para tabuleiros NxN, com a mesma interface de escolha do QLearningAgent"""
+
+    def __init__(self, tamanho=3, em_linha=3, iteracoes=2000, tempo_limite=None,
+                 tamanho_lote=32, exploracao=1.4, seed=None):
+        """
+        Args:
+            tamanho (int): Número de linhas e colunas do tabuleiro
+            em_linha (int): Peças seguidas necessárias para vencer
+            iteracoes (int or None): Máximo de iterações (seleção, expansão, simulação)
+                por jogada; None usa só o tempo
+            tempo_limite (float or None): Segundos de busca por jogada; None usa só as iterações
+            tamanho_lote (int): Simulações aleatórias feitas juntas a cada folha expandida
+            exploracao (float): Constante c do UCT
+            seed (int or None): Semente das simulações
+        """
+        if iteracoes is None and tempo_limite is None:
+            raise ValueError("Informe iteracoes, tempo_limite ou ambos")
+        self.geometria = obter_geometria(tamanho, em_linha)
+        self.iteracoes = iteracoes
+        self.tempo_limite = tempo_limite
+        self.tamanho_lote = tamanho_lote
+        self.exploracao = exploracao
+        self.rng = random.Random(seed)
+        self.raiz = None
+        self.simulacoes = 0
+
+        geometria = self.geometria
+        self._linhas_por_casa = [
+            [geometria.linhas[i] for i in indices] for indices in geometria.linhas_por_casa
+        ]
+        if np is not None:
+            self.rng_np = np.random.default_rng(seed)
+            # Casas de cada linha vencedora, (L, k), para checar todas as simulações de uma vez
+            self._casas_linhas = np.array([
+                [pos for pos in range(geometria.num_casas) if mascara >> pos & 1]
+                for mascara in geometria.linhas
+            ], dtype=np.intp)
+
+    def _novo_no(self, x, o, vez_x, ultima=None):
+        """Cria um nó, marcando-o como terminal se a última jogada venceu ou encheu o tabuleiro"""
+        terminal = None
+        if ultima is not None:
+            # Só as linhas que passam pela última casa podem ter sido completadas
+            mascara = o if vez_x else x
+            if any(mascara & linha == linha for linha in self._linhas_por_casa[ultima]):
+                terminal = _O if vez_x else _X
+            elif x | o == self.geometria.mascara_cheia:
+                terminal = 0
+        livres = []
+        if terminal is None:
+            vazias = ~(x | o) & self.geometria.mascara_cheia
+            livres = [pos for pos in range(self.geometria.num_casas) if vazias >> pos & 1]
+            self.rng.shuffle(livres)
+        return No(x, o, vez_x, terminal, livres)
+
+    def _reaproveitar(self, x, o):
+        """
+        Procura a posição atual entre os netos e filhos da raiz anterior
+
+        Returns:
+            No or None: Subárvore já explorada para a posição, desligada do resto
+        """
+        raiz = self.raiz
+        if raiz is None:
+            return None
+        if (raiz.x, raiz.o) == (x, o):
+            return raiz
+        for filho in raiz.filhos.values():
+            if (filho.x, filho.o) == (x, o):
+                return filho
+            for neto in filho.filhos.values():
+                if (neto.x, neto.o) == (x, o):
+                    return neto
+        return None
+
+    def _selecionar_filho(self, no):
+        """Filho com maior UCT: média de resultados + c * sqrt(ln N / n)"""
+        log_pai = math.log(no.visitas)
+        c = self.exploracao
+        melhor = None
+        melhor_uct = -1.0
+        for filho in no.filhos.values():
+            uct = filho.valor / filho.visitas + c * math.sqrt(log_pai / filho.visitas)
+            if uct > melhor_uct:
+                melhor_uct = uct
+                melhor = filho
+        return melhor
+
+    def _expandir(self, no):
+        """Cria um filho para uma das casas ainda não tentadas"""
+        pos = no.nao_expandidas.pop()
+        bit = 1 << pos
+        if no.vez_x:
+            filho = self._novo_no(no.x | bit, no.o, False, pos)
+        else:
+            filho = self._novo_no(no.x, no.o | bit, True, pos)
+        no.filhos[pos] = filho
+        return filho
+
+    def _simular(self, no):
+        """
+        Joga tamanho_lote partidas aleatórias a partir do nó
+
+        Returns:
+            tuple: (simulações, pontos de quem jogou para chegar ao nó)
+        """
+        lote = self.tamanho_lote
+        if no.terminal is not None:
+            vencedor_ultimo = _O if no.vez_x else _X
+            pontos = 1.0 if no.terminal == vencedor_ultimo else 0.5 if no.terminal == 0 else 0.0
+            return lote, pontos * lote
+        if np is None:
+            vitorias_x, vitorias_o = self._simular_python(no, lote)
+        else:
+            vitorias_x, vitorias_o = self._simular_lote(no, lote)
+        self.simulacoes += lote
+        empates = lote - vitorias_x - vitorias_o
+        # Quem jogou para chegar ao nó é o oposto de quem joga nele
+        vitorias = vitorias_o if no.vez_x else vitorias_x
+        return lote, vitorias + 0.5 * empates
+
+    def _simular_lote(self, no, lote):
+        """Simulações vetorizadas: ordem aleatória das casas vazias e vencedor pela 1ª linha completa"""
+        num_casas = self.geometria.num_casas
+        casas = [_X if no.x >> pos & 1 else _O if no.o >> pos & 1 else 0 for pos in range(num_casas)]
+        vazias = np.array([pos for pos, valor in enumerate(casas) if not valor], dtype=np.intp)
+        # Uma permutação aleatória por simulação dá o instante em que cada casa vazia é ocupada
+        instantes = self.rng_np.random((lote, len(vazias))).argsort(axis=1)
+        quem_joga, outro = (_X, _O) if no.vez_x else (_O, _X)
+
+        tempo = np.full((lote, num_casas), -1, dtype=np.int64)
+        dono = np.tile(np.array(casas, dtype=np.int8), (lote, 1))
+        tempo[:, vazias] = instantes
+        dono[:, vazias] = np.where(instantes % 2 == 0, quem_joga, outro)
+
+        donos_linha = dono[:, self._casas_linhas]
+        completas = (donos_linha == donos_linha[:, :, :1]).all(axis=2)
+        # Uma linha fecha quando sua última casa é ocupada; vence quem fechar primeiro
+        fechamento = np.where(completas, tempo[:, self._casas_linhas].max(axis=2), num_casas)
+        primeira = fechamento.argmin(axis=1)
+        linhas_lote = np.arange(lote)
+        vencedor = np.where(fechamento[linhas_lote, primeira] < num_casas,
+                            donos_linha[linhas_lote, primeira, 0], 0)
+        return int(np.count_nonzero(vencedor == _X)), int(np.count_nonzero(vencedor == _O))
+
+    def _simular_python(self, no, lote):
+        """Mesmas simulações de _simular_lote, uma a uma"""
+        cheia = self.geometria.mascara_cheia
+        vazias = [pos for pos in range(self.geometria.num_casas) if not (no.x | no.o) >> pos & 1]
+        vitorias_x = vitorias_o = 0
+        for _ in range(lote):
+            self.rng.shuffle(vazias)
+            x, o, vez_x = no.x, no.o, no.vez_x
+            for pos in vazias:
+                bit = 1 << pos
+                if vez_x:
+                    x |= bit
+                    if any(x & linha == linha for linha in self._linhas_por_casa[pos]):
+                        vitorias_x += 1
+                        break
+                else:
+                    o |= bit
+                    if any(o & linha == linha for linha in self._linhas_por_casa[pos]):
+                        vitorias_o += 1
+                        break
+                vez_x = not vez_x
+                if x | o == cheia:
+                    break
+        return vitorias_x, vitorias_o
+
+    def _iterar(self, raiz):
+        """Uma iteração: desce pelo UCT, expande uma folha, simula em lote e propaga"""
+        caminho = [raiz]
+        no = raiz
+        while no.terminal is None and not no.nao_expandidas and no.filhos:
+            no = self._selecionar_filho(no)
+            caminho.append(no)
+        if no.terminal is None and no.nao_expandidas:
+            no = self._expandir(no)
+            caminho.append(no)
+
+        simulacoes, pontos = self._simular(no)
+        # Os pontos alternam de perspectiva a cada nível da árvore
+        for no in reversed(caminho):
+            no.visitas += simulacoes
+            no.valor += pontos
+            pontos = simulacoes - pontos
+
+    def choose_action(self, tabuleiro, training=False):
+        """
+        Busca a melhor jogada para o jogador da vez dentro do orçamento de iterações/tempo
+
+        A subárvore da posição atual, se já explorada na jogada anterior, é reaproveitada.
+
+        Args:
+            tabuleiro (list, BitBoard or int): Estado atual do tabuleiro
+            training (bool): Ignorado; existe para manter a interface do QLearningAgent
+
+        Returns:
+            tuple or None: (linha, coluna) da jogada ou None se o jogo acabou
+        """
+        bits = como_bitboard(tabuleiro, self.geometria)
+        x, o = bits.x, bits.o
+        raiz = self._reaproveitar(x, o)
+        if raiz is None:
+            vez_x = bin(x).count('1') == bin(o).count('1')
+            raiz = self._novo_no(x, o, vez_x)
+            # Partida já decidida no tabuleiro recebido: nada a buscar
+            if bits.vencedor() is not None:
+                raiz.nao_expandidas = []
+        self.raiz = raiz
+        if not (raiz.nao_expandidas or raiz.filhos):
+            return None
+
+        limite = None if self.tempo_limite is None else time.monotonic() + self.tempo_limite
+        iteracao = 0
+        while True:
+            self._iterar(raiz)
+            iteracao += 1
+            if self.iteracoes is not None and iteracao >= self.iteracoes:
+                break
+            if limite is not None and time.monotonic() >= limite:
+                break
+
+        # Jogada mais visitada (mais estável que a de maior média)
+        pos = max(raiz.filhos, key=lambda casa: raiz.filhos[casa].visitas)
+        return divmod(pos, self.geometria.tamanho)
+
+    def get_stats(self):
+        """
+        Retorna estatísticas da busca
+
+        Returns:
+            dict: Visitas da raiz atual, filhos explorados e simulações acumuladas
+        """
+        return {
+            'visitas_raiz': self.raiz.visitas if self.raiz else 0,
+            'filhos_raiz': len(self.raiz.filhos) if self.raiz else 0,
+            'simulacoes': self.simulacoes,
+        }
@@ -0,0 +1,274 @@
+"""
+Solver perfeito do Jogo da Velha - negamax com poda alfa-beta e tabela de transposição
+"""
+
+import struct
+
+from utils.arquivos import escrita_atomica
+from jogo.bitboard import BASE3, MASCARA_CHEIA, POPCOUNT, como_bitboard
+from jogo.terminal import EM_ANDAMENTO, EMPATE, RESULTADOS
+
+# Tipos de entrada da tabela de transposição
+EXATO = 0
+LIMITE_INFERIOR = 1
+LIMITE_SUPERIOR = 2
+
+# Ordem de tentativa das casas: centro, cantos e depois os meios das bordas
+ORDEM_JOGADAS = (4, 0, 2, 6, 8, 1, 3, 5, 7)
+# Mesma ordem, mas começando pela melhor casa guardada na tabela de transposição
+ORDEM_COM_PRIMEIRA = tuple(
+    (primeira,) + tuple(pos for pos in ORDEM_JOGADAS if pos != primeira) for primeira in range(9)
+)
+
+# Valores ficam em [-5, 5]: vitória vale 1 + casas vazias restantes (vencer antes vale mais)
+VALOR_INFINITO = 10
+
+# Arquivo: magic, versão e número de entradas, seguidos de registros (índice, valor, tipo, jogada)
+MAGIC = b'TTTNEGA\x00'
+VERSAO = 1
+_CABECALHO = struct.Struct('<8sHI')
+_REGISTRO = struct.Struct('<HbBb')
+
+
+class AgenteNegamax:
+    """Oponente que joga de forma ótima, com a mesma interface de escolha do QLearningAgent"""
+
+    def __init__(self):
+        """Inicializa o solver com a tabela de transposição vazia"""
+        # índice em base 3 -> (valor para quem joga, tipo da entrada, melhor casa ou -1)
+        self.transposicao = {}
+        # índice em base 3 -> (linha, coluna) da resposta ótima já resolvida
+        self.respostas = {}
+        self.nos_visitados = 0
+
+    def _negamax(self, x, o, alfa, beta):
+        """
+        Valor da posição para o jogador da vez, entre os limites alfa e beta
+
+        Args:
+            x (int): Máscara das casas de X
+            o (int): Máscara das casas de O
+            alfa (int): Limite inferior da janela de busca
+            beta (int): Limite superior da janela de busca
+
+        Returns:
+            int: Valor exato dentro da janela, ou um limite fora dela
+        """
+        self.nos_visitados += 1
+        indice = BASE3[x] + 2 * BASE3[o]
+        resultado = RESULTADOS[indice]
+        if resultado != EM_ANDAMENTO:
+            # Quem acabou de jogar venceu, então o jogador da vez perdeu
+            return 0 if resultado == EMPATE else -(1 + POPCOUNT[MASCARA_CHEIA & ~(x | o)])
+
+        alfa_original = alfa
+        jogada_tabela = -1
+        entrada = self.transposicao.get(indice)
+        if entrada is not None:
+            valor, tipo, jogada_tabela = entrada
+            if tipo == EXATO:
+                return valor
+            if tipo == LIMITE_INFERIOR:
+                alfa = max(alfa, valor)
+            else:
+                beta = min(beta, valor)
+            if alfa >= beta:
+                return valor
+
+        vez_x = POPCOUNT[x] == POPCOUNT[o]
+        ocupadas = x | o
+        melhor_valor = -VALOR_INFINITO
+        melhor_jogada = -1
+        ordem = ORDEM_JOGADAS if jogada_tabela < 0 else ORDEM_COM_PRIMEIRA[jogada_tabela]
+        for pos in ordem:
+            bit = 1 << pos
+            if ocupadas & bit:
+                continue
+            if vez_x:
+                valor = -self._negamax(x | bit, o, -beta, -alfa)
+            else:
+                valor = -self._negamax(x, o | bit, -beta, -alfa)
+            if valor > melhor_valor:
+                melhor_valor = valor
+                melhor_jogada = pos
+            if valor > alfa:
+                alfa = valor
+                if alfa >= beta:
+                    break
+
+        if melhor_valor <= alfa_original:
+            tipo = LIMITE_SUPERIOR
+        elif melhor_valor >= beta:
+            tipo = LIMITE_INFERIOR
+        else:
+            tipo = EXATO
+        self.transposicao[indice] = (melhor_valor, tipo, melhor_jogada)
+        return melhor_valor
+
+    def _resolver(self, x, o):
+        """Garante uma entrada exata na tabela para a posição e devolve (valor, casa)"""
+        indice = BASE3[x] + 2 * BASE3[o]
+        self._negamax(x, o, -VALOR_INFINITO, VALOR_INFINITO)
+        entrada = self.transposicao.get(indice)
+        if entrada is None:
+            return None, -1
+        if entrada[1] != EXATO:
+            # Um corte anterior deixou só um limite; a busca em janela cheia o refaz exato
+            del self.transposicao[indice]
+            self._negamax(x, o, -VALOR_INFINITO, VALOR_INFINITO)
+            entrada = self.transposicao[indice]
+        return entrada[0], entrada[2]
+
+    def choose_action(self, tabuleiro, training=False):
+        """
+        Escolhe a jogada ótima para o jogador da vez (deduzido pelo número de peças)
+
+        Depois da primeira consulta de uma posição (ou de aquecer()), a resposta sai de
+        um dicionário, sem busca.
+
+        Args:
+            tabuleiro (list, BitBoard or int): Estado atual do tabuleiro
+            training (bool): Ignorado; existe para manter a interface do QLearningAgent
+
+        Returns:
+            tuple or None: (linha, coluna) da jogada ou None se o jogo acabou
+        """
+        bits = como_bitboard(tabuleiro)
+        indice = BASE3[bits.x] + 2 * BASE3[bits.o]
+        resposta = self.respostas.get(indice)
+        if resposta is not None:
+            return resposta
+        if RESULTADOS[indice] != EM_ANDAMENTO:
+            return None
+        _, pos = self._resolver(bits.x, bits.o)
+        resposta = divmod(pos, 3)
+        self.respostas[indice] = resposta
+        return resposta
+
+    def valor(self, tabuleiro):
+        """
+        Args:
+            tabuleiro (list, BitBoard or int): Estado do tabuleiro
+
+        Returns:
+            int: Valor exato para o jogador da vez (> 0 vence, 0 empata, < 0 perde)
+        """
+        bits = como_bitboard(tabuleiro)
+        indice = BASE3[bits.x] + 2 * BASE3[bits.o]
+        if RESULTADOS[indice] != EM_ANDAMENTO:
+            return self._negamax(bits.x, bits.o, -VALOR_INFINITO, VALOR_INFINITO)
+        return self._resolver(bits.x, bits.o)[0]
+
+    def jogadas_otimas(self, tabuleiro):
+        """
+        Todas as jogadas que preservam o resultado teórico da posição
+
+        Args:
+            tabuleiro (list, BitBoard or int): Estado do tabuleiro
+
+        Returns:
+            list: Lista de (linha, coluna) com o melhor resultado (vitória, empate ou derrota)
+        """
+        bits = como_bitboard(tabuleiro)
+        vez_x = POPCOUNT[bits.x] == POPCOUNT[bits.o]
+        resultados = {}
+        for pos in range(9):
+            bit = 1 << pos
+            if (bits.x | bits.o) & bit:
+                continue
+            filho_x, filho_o = (bits.x | bit, bits.o) if vez_x else (bits.x, bits.o | bit)
+            valor = -self.valor(BASE3[filho_x] + 2 * BASE3[filho_o])
+            # Só o sinal importa: qualquer vitória conta como ótima, não apenas a mais rápida
+            resultados[divmod(pos, 3)] = (valor > 0) - (valor < 0)
+        if not resultados:
+            return []
+        melhor = max(resultados.values())
+        return [casa for casa, sinal in resultados.items() if sinal == melhor]
+
+    def aquecer(self):
+        """
+        Resolve todas as posições alcançáveis a partir do tabuleiro vazio
+
+        Returns:
+            int: Número de posições com resposta pronta
+        """
+        visitados = set()
+        pendentes = [(0, 0)]
+        while pendentes:
+            x, o = pendentes.pop()
+            indice = BASE3[x] + 2 * BASE3[o]
+            if indice in visitados or RESULTADOS[indice] != EM_ANDAMENTO:
+                continue
+            visitados.add(indice)
+            self.choose_action(indice)
+            vez_x = POPCOUNT[x] == POPCOUNT[o]
+            livres = MASCARA_CHEIA & ~(x | o)
+            for pos in range(9):
+                bit = 1 << pos
+                if livres & bit:
+                    pendentes.append((x | bit, o) if vez_x else (x, o | bit))
+        return len(self.respostas)
+
+    def save_model(self, filename):
+        """
+        Grava a tabela de transposição de forma atômica
+
+        Args:
+            filename (str): Caminho do arquivo
+        """
+        with escrita_atomica(filename) as f:
+            f.write(_CABECALHO.pack(MAGIC, VERSAO, len(self.transposicao)))
+            f.write(b''.join(
+                _REGISTRO.pack(indice, valor, tipo, jogada)
+                for indice, (valor, tipo, jogada) in self.transposicao.items()
+            ))
+
+    def load_model(self, filename):
+        """
+        Carrega uma tabela de transposição gravada por save_model
+
+        As entradas exatas viram respostas prontas, sem nenhuma busca.
+
+        Args:
+            filename (str): Caminho do arquivo
+
+        Returns:
+            bool: True se carregado com sucesso, False se o arquivo não existe
+        """
+        try:
+            with open(filename, 'rb') as f:
+                dados = f.read()
+        except FileNotFoundError:
+            return False
+        if len(dados) < _CABECALHO.size:
+            raise ValueError(f"{filename} não é uma tabela do solver")
+        magic, versao, quantidade = _CABECALHO.unpack_from(dados)
+        if magic != MAGIC or versao != VERSAO:
+            raise ValueError(f"{filename} não é uma tabela do solver na versão {VERSAO}")
+        corpo = dados[_CABECALHO.size:_CABECALHO.size + quantidade * _REGISTRO.size]
+        if len(corpo) != quantidade * _REGISTRO.size:
+            raise ValueError(f"{filename} está truncado")
+
+        self.transposicao = {
+            indice: (valor, tipo, jogada)
+            for indice, valor, tipo, jogada in _REGISTRO.iter_unpack(corpo)
+        }
+        self.respostas = {
+            indice: divmod(jogada, 3)
+            for indice, (_, tipo, jogada) in self.transposicao.items()
+            if tipo == EXATO and jogada >= 0
+        }
+        return True
+
+    def get_stats(self):
+        """
+        Retorna estatísticas do solver
+
+        Returns:
+            dict: Dicionário com estatísticas do solver
+        """
+        return {
+            'num_posicoes': len(self.transposicao),
+            'num_respostas': len(self.respostas),
+            'nos_visitados': self.nos_visitados,
+        }
@@ -0,0 +1,166 @@
+"""
+Política compilada - a jogada gulosa de cada estado do 3x3 pré-calculada num array de bytes
+
+Para jogar, só o argmax de cada linha da Q-table importa. compilar_politica percorre uma
+vez todas as posições alcançáveis em andamento e guarda a casa escolhida (0 a 8) no byte
+do índice em base 3 do tabuleiro; a jogada passa a ser uma leitura no array.
+
+Layout do arquivo (little-endian):
+
+    cabeçalho (16 bytes)  magic, versão e número de estados
+    jogadas               uint8[num_estados], SEM_JOGADA nos estados sem jogada
+"""
+
+import struct
+
+from agente.tabela_congelada import congelar
+from jogo.bitboard import NUM_ESTADOS, BitBoard, como_bitboard
+from jogo.terminal import EM_ANDAMENTO, RESULTADOS
+from utils.arquivos import escrita_atomica
+
+MAGIC = b'TTTQPOL\x00'
+VERSAO = 1
+
+# Campos: magic, versão, número de estados
+_CABECALHO = struct.Struct('<8sHxxI')
+
+# Byte dos estados encerrados ou inalcançáveis
+SEM_JOGADA = 0xFF
+
+_alcancaveis = None
+
+
+def estados_alcancaveis():
+    """
+    Calcula (uma única vez) os índices das posições em andamento que aparecem em jogo real
+
+    Sem linha completa, qualquer tabuleiro com tantos X quanto O (ou um X a mais) é
+    alcançável jogando as casas em alguma ordem.
+
+    Returns:
+        tuple: Índices em ordem crescente
+    """
+    global _alcancaveis
+    if _alcancaveis is None:
+        alcancaveis = []
+        for indice in range(NUM_ESTADOS):
+            if RESULTADOS[indice] != EM_ANDAMENTO:
+                continue
+            bits = BitBoard.de_indice(indice)
+            if bin(bits.x).count('1') - bin(bits.o).count('1') in (0, 1):
+                alcancaveis.append(indice)
+        _alcancaveis = tuple(alcancaveis)
+    return _alcancaveis
+
+
+class PoliticaCompilada:
+    """
+    Jogada gulosa de um QLearningAgent por índice de estado, somente leitura
+
+    Cada posição alcançável em andamento tem a mesma jogada de choose_action(training=False)
+    do agente de origem: a primeira casa livre de maior valor, com o desempate do backend
+    que treinou o modelo, e a primeira casa livre nos estados nunca visitados.
+    """
+
+    def __init__(self, jogadas):
+        """
+        Args:
+            jogadas (bytes): Casa escolhida em cada um dos NUM_ESTADOS índices
+        """
+        if len(jogadas) != NUM_ESTADOS:
+            raise ValueError(f"jogadas deve ter {NUM_ESTADOS} bytes")
+        self.jogadas = bytes(jogadas)
+
+    @property
+    def nbytes(self):
+        """Bytes ocupados pelas jogadas"""
+        return len(self.jogadas)
+
+    def choose_action(self, tabuleiro, training=False):
+        """
+        Jogada pré-calculada para o tabuleiro
+
+        Args:
+            tabuleiro (list, BitBoard or int): Estado atual do tabuleiro 3x3
+            training (bool): Aceito pela mesma interface do agente; a jogada é sempre gulosa
+
+        Returns:
+            tuple: (linha, coluna) da jogada ou None se o estado não tem jogada
+        """
+        casa = self.jogadas[como_bitboard(tabuleiro).indice()]
+        if casa == SEM_JOGADA:
+            return None
+        return divmod(casa, 3)
+
+    def save_model(self, caminho):
+        """
+        Grava a política no formato binário de forma atômica
+
+        Args:
+            caminho (str): Caminho do arquivo
+        """
+        with escrita_atomica(caminho) as f:
+            f.write(_CABECALHO.pack(MAGIC, VERSAO, NUM_ESTADOS))
+            f.write(self.jogadas)
+
+    @classmethod
+    def load_model(cls, caminho):
+        """
+        Lê uma política gravada por save_model
+
+        Args:
+            caminho (str): Caminho do arquivo
+
+        Returns:
+            PoliticaCompilada or None: Política lida ou None se o arquivo não existe ou
+                não está no formato
+        """
+        try:
+            with open(caminho, 'rb') as f:
+                bruto = f.read()
+        except OSError:
+            return None
+        if len(bruto) != _CABECALHO.size + NUM_ESTADOS or not bruto.startswith(MAGIC):
+            return None
+        _, versao, num_estados = _CABECALHO.unpack_from(bruto)
+        if versao != VERSAO or num_estados != NUM_ESTADOS:
+            return None
+        return cls(bruto[_CABECALHO.size:])
+
+
+def eh_politica(caminho):
+    """
+    Args:
+        caminho (str): Caminho do arquivo
+
+    Returns:
+        bool: True se o arquivo começa com o magic da política compilada
+    """
+    try:
+        with open(caminho, 'rb') as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def compilar_politica(agente):
+    """
+    Pré-calcula a jogada gulosa do agente em cada posição alcançável
+
+    As jogadas vêm da cópia congelada da Q-table, então consultar não insere estados na
+    tabela de dicionários. Alterações posteriores no agente não chegam à política.
+
+    Args:
+        agente (QLearningAgent): Agente treinado no tabuleiro 3x3, de qualquer backend
+
+    Returns:
+        PoliticaCompilada: Política pronta para consulta
+    """
+    if not agente.geometria.padrao:
+        raise ValueError("A política compilada só existe para o tabuleiro 3x3")
+    tabela = congelar(agente)
+    jogadas = bytearray([SEM_JOGADA]) * NUM_ESTADOS
+    for indice in estados_alcancaveis():
+        linha, coluna = tabela.choose_action(indice)
+        jogadas[indice] = linha * 3 + coluna
+    return PoliticaCompilada(jogadas)
@@ -2,12 +2,133 @@
 Implementação do agente QLearning para jogar Jogo da Velha
 """
 
+import os
 import random
 import pickle
 from collections import defaultdict
 
+from utils.arquivos import escrita_atomica
+from jogo.bitboard import (
+    BASE3, BitBoard, CASAS_POR_MASCARA, MASCARA_CHEIA, NUM_CASAS, NUM_ESTADOS, como_bitboard,
+    obter_geometria,
+)
+
+try:
+    import numpy as np
+except ImportError:  # NumPy é opcional; sem ele só o backend 'dict' está disponível
+    np = None
+
+if np is not None:
+    from agente import formato_modelo
+
+BACKENDS = ('dict', 'numpy')
+
+# Lambda padrão dos alvos de TD no treino: 0 = TD(0) de um passo, que parte do valor da
+# próxima decisão de cada jogador; 1 = retorno de Monte Carlo, opcional
+LAMBDA_PADRAO = 0.0
+
+if np is not None:
+    # Para cada máscara de casas vazias: 0 nas casas livres e -inf nas ocupadas,
+    # somado à linha da Q-table para fazer o argmax mascarado
+    _PENALIDADE_VAZIAS = np.full((MASCARA_CHEIA + 1, NUM_CASAS), -np.inf, dtype=np.float32)
+    for _mascara in range(MASCARA_CHEIA + 1):
+        for _pos in range(NUM_CASAS):
+            if _mascara >> _pos & 1:
+                _PENALIDADE_VAZIAS[_mascara, _pos] = 0.0
+
+
+# Simetrias do tabuleiro 3x3 (grupo D4): cada uma leva a casa (linha, coluna) do
+# tabuleiro original para a casa indicada do tabuleiro transformado
+_TRANSFORMACOES = (
+    lambda l, c: (l, c),          # identidade
+    lambda l, c: (c, 2 - l),      # rotação 90°
+    lambda l, c: (2 - l, 2 - c),  # rotação 180°
+    lambda l, c: (2 - c, l),      # rotação 270°
+    lambda l, c: (l, 2 - c),      # reflexão horizontal
+    lambda l, c: (2 - l, c),      # reflexão vertical
+    lambda l, c: (c, l),          # diagonal principal
+    lambda l, c: (2 - c, 2 - l),  # diagonal secundária
+)
+
+# PARA_CANONICO[t][pos]: casa do tabuleiro transformado que recebe a casa original pos
+PARA_CANONICO = tuple(
+    tuple((lambda l, c: l * 3 + c)(*transformacao(*divmod(pos, 3))) for pos in range(NUM_CASAS))
+    for transformacao in _TRANSFORMACOES
+)
+# DO_CANONICO[t][pos]: casa original que foi levada para a casa pos do tabuleiro transformado
+DO_CANONICO = tuple(
+    tuple(perm.index(pos) for pos in range(NUM_CASAS)) for perm in PARA_CANONICO
+)
+
+_tabelas_simetria = None
+
+
+def tabelas_simetria():
+    """
+    Calcula (uma única vez) o representante canônico de cada um dos 3^9 estados
+    
+    O representante é a transformação com menor índice em base 3.
+    
+    Returns:
+        tuple: (canonico, transformacao, mascaras) onde canonico[indice] é o índice
+            canônico, transformacao[indice] é a simetria t que leva o estado até ele e
+            mascaras[t][m] é a máscara m transformada por t
+    """
+    global _tabelas_simetria
+    if _tabelas_simetria is None:
+        mascaras = tuple(
+            tuple(
+                sum(1 << perm[pos] for pos in range(NUM_CASAS) if mascara >> pos & 1)
+                for mascara in range(MASCARA_CHEIA + 1)
+            )
+            for perm in PARA_CANONICO
+        )
+        canonico = [0] * NUM_ESTADOS
+        transformacao = bytearray(NUM_ESTADOS)
+        for x in range(MASCARA_CHEIA + 1):
+            livres = MASCARA_CHEIA & ~x
+            o = livres
+            while True:
+                melhor, melhor_t = None, 0
+                for t, mapa in enumerate(mascaras):
+                    indice = BASE3[mapa[x]] + 2 * BASE3[mapa[o]]
+                    if melhor is None or indice < melhor:
+                        melhor, melhor_t = indice, t
+                original = BASE3[x] + 2 * BASE3[o]
+                canonico[original] = melhor
+                transformacao[original] = melhor_t
+                if o == 0:
+                    break
+                o = (o - 1) & livres
+        _tabelas_simetria = (canonico, bytes(transformacao), mascaras)
+    return _tabelas_simetria
+
+
+_tabelas_simetria_np = None
+
+
+def tabelas_simetria_np():
+    """
+    Versão em arrays NumPy das tabelas de simetria, para operações em lote
+    
+    Returns:
+        tuple: (canonico, transformacao, permutacoes) com permutacoes[t][pos] igual a
+            PARA_CANONICO[t][pos]
+    """
+    global _tabelas_simetria_np
+    if _tabelas_simetria_np is None:
+        canonico, transformacao, _ = tabelas_simetria()
+        _tabelas_simetria_np = (
+            np.array(canonico, dtype=np.int64),
+            np.frombuffer(transformacao, dtype=np.uint8).astype(np.intp),
+            np.array(PARA_CANONICO, dtype=np.intp),
+        )
+    return _tabelas_simetria_np
+
+
 class QLearningAgent:
-    def __init__(self, alpha=0.1, gamma=0.9, epsilon=0.9, epsilon_decay=0.995, epsilon_min=0.1):
+    def __init__(self, alpha=0.1, gamma=0.9, epsilon=0.9, epsilon_decay=0.995, epsilon_min=0.1,
+                 backend=None, simetria=False, tamanho=3, em_linha=3):
         """
         Inicializa o agente de Q-Learning
         
@@ -17,24 +138,152 @@ class QLearningAgent:
             epsilon (float): Taxa de exploração inicial
             epsilon_decay (float): Taxa de decaimento do epsilon
             epsilon_min (float): Valor mínimo do epsilon
+            backend (str or None): 'numpy' (array float32 3^9 x 9 indexado pelo estado em
+                base 3) ou 'dict' (dicionários aninhados). None escolhe 'numpy' se disponível
+            simetria (bool): Se True, as 8 simetrias do tabuleiro compartilham a mesma
+                entrada da Q-table (estado canônico); as ações continuam nas coordenadas
+                do tabuleiro recebido
+            tamanho (int): Número de linhas e colunas do tabuleiro
+            em_linha (int): Peças seguidas necessárias para vencer. Fora do 3x3 padrão
+                o agente usa o backend 'dict' com chaves inteiras compactas (2 * N² bits)
+                e sem simetria
         """
-        self.q_table = defaultdict(lambda: defaultdict(float))
+        self.geometria = obter_geometria(tamanho, em_linha)
+        if not self.geometria.padrao:
+            if backend == 'numpy' or simetria:
+                raise ValueError("Backend 'numpy' e simetria só existem para o tabuleiro 3x3")
+            backend = 'dict'
+        if backend is None:
+            backend = 'numpy' if np is not None else 'dict'
+        if backend not in BACKENDS:
+            raise ValueError(f"Backend desconhecido: {backend!r} (use {' ou '.join(BACKENDS)})")
+        if backend == 'numpy' and np is None:
+            raise ImportError("O backend 'numpy' requer o pacote numpy instalado")
+        
+        self.backend = backend
+        self.q_table = self._nova_tabela()
         self.alpha = alpha
         self.gamma = gamma
         self.epsilon = epsilon
         self.epsilon_decay = epsilon_decay
         self.epsilon_min = epsilon_min
+        self._configurar_simetria(simetria)
+        
+        # Tabelas int8 carregadas de arquivo guardam valores quantizados: Q = valor * escala_q.
+        # Elas (e as float16) são usadas direto nas consultas e convertidas para float32
+        # na primeira atualização
+        self.escala_q = 1.0
+        self._converter_antes_de_gravar = False
+        # Tabela vinda de arquivo (ver tabela_atual/trocar_tabela)
+        self._snapshot = None
+        
+        if backend == 'numpy':
+            # Buffer reutilizado no argmax/max mascarado para não alocar a cada consulta
+            self._buffer = np.empty(NUM_CASAS, dtype=np.float32)
+    
+    def _configurar_simetria(self, simetria):
+        """Liga ou desliga a canonização de estados"""
+        self.simetria = simetria
+        if simetria:
+            self._canonico, self._transformacao, self._mascaras_simetria = tabelas_simetria()
+    
+    def _garantir_tabela_gravavel(self):
+        """Copia para float32 uma tabela compartilhada ou float16/int8 antes de alterá-la"""
+        tabela = np.array(self.q_table, dtype=np.float32)
+        if self.escala_q != 1.0:
+            tabela *= np.float32(self.escala_q)
+        self.q_table = tabela
+        self.escala_q = 1.0
+        self._converter_antes_de_gravar = False
+        # A cópia privada deixou de ser a tabela do arquivo
+        self._snapshot = None
+    
+    def tabela_atual(self):
+        """
+        Snapshot da tabela em uso, usado pelo cache de modelos
+        
+        Returns:
+            tuple: (q_table, escala_q, simetria)
+        """
+        if self._snapshot is None:
+            self._snapshot = (self.q_table, self.escala_q, self.simetria)
+        return self._snapshot
+    
+    def trocar_tabela(self, tabela):
+        """
+        Passa a usar outra tabela, como devolvida por tabela_atual()
+        
+        Arrays não graváveis (compartilhados pelo cache) continuam compartilhados nas
+        consultas e são copiados na primeira atualização. Chame entre partidas para que
+        cada partida use um único snapshot.
+        
+        Args:
+            tabela (tuple): (q_table, escala_q, simetria)
+        """
+        q_table, escala, simetria = tabela
+        if self.backend == 'numpy':
+            self._configurar_simetria(simetria)
+            self.escala_q = escala
+            self._converter_antes_de_gravar = (
+                q_table.dtype != np.float32 or not q_table.flags.writeable
+            )
+            self.q_table = q_table
+        else:
+            # Consultas no backend 'dict' inserem chaves; cada agente recebe sua cópia
+            self._configurar_simetria(simetria)
+            self.q_table = defaultdict(
+                lambda: defaultdict(float),
+                {chave: defaultdict(float, acoes) for chave, acoes in q_table.items()}
+            )
+        self._snapshot = tabela
+    
+    def _canonizar(self, bits):
+        """
+        Leva o tabuleiro ao seu representante canônico
+        
+        Args:
+            bits (BitBoard): Tabuleiro original
+            
+        Returns:
+            tuple: (BitBoard canônico, índice t da simetria aplicada)
+        """
+        t = self._transformacao[bits.indice()]
+        if t == 0:
+            return bits, 0
+        mapa = self._mascaras_simetria[t]
+        return BitBoard(mapa[bits.x], mapa[bits.o]), t
+    
+    def _nova_tabela(self):
+        """Cria uma Q-table vazia no formato do backend"""
+        if self.backend == 'numpy':
+            return np.zeros((NUM_ESTADOS, NUM_CASAS), dtype=np.float32)
+        return defaultdict(lambda: defaultdict(float))
         
     def get_state_key(self, tabuleiro):
         """
-        Converte o tabuleiro em uma string para usar como chave
+        Converte o tabuleiro na chave usada pela Q-table (a do estado canônico se simetria=True)
         
         Args:
-            tabuleiro (list): Matriz 3x3 representando o tabuleiro
+            tabuleiro (list, BitBoard or int): Matriz 3x3, BitBoard ou índice em base 3
             
         Returns:
-            str: Representação string do estado do tabuleiro
+            str or int: String do estado (backend 'dict'), índice em base 3 (backend 'numpy')
+                ou chave inteira compacta (tabuleiros maiores que 3x3)
         """
+        if not self.geometria.padrao:
+            if isinstance(tabuleiro, int):
+                return tabuleiro
+            return como_bitboard(tabuleiro, self.geometria).chave_compacta()
+        if self.simetria:
+            tabuleiro = self._canonizar(como_bitboard(tabuleiro))[0]
+        if self.backend == 'numpy':
+            if isinstance(tabuleiro, int):
+                return tabuleiro
+            return como_bitboard(tabuleiro).indice()
+        if isinstance(tabuleiro, BitBoard):
+            return tabuleiro.chave()
+        if isinstance(tabuleiro, int):
+            return BitBoard.de_indice(tabuleiro).chave()
         return ''.join([''.join(linha) for linha in tabuleiro])
     
     def get_valid_actions(self, tabuleiro):
@@ -42,11 +291,13 @@ class QLearningAgent:
         Retorna lista de ações válidas (posições vazias)
         
         Args:
-            tabuleiro (list): Matriz 3x3 representando o tabuleiro
+            tabuleiro (list, BitBoard or int): Matriz 3x3, BitBoard ou índice em base 3
             
         Returns:
             list: Lista de tuplas (linha, coluna) das posições vazias
         """
+        if isinstance(tabuleiro, (BitBoard, int)) or not self.geometria.padrao:
+            return como_bitboard(tabuleiro, self.geometria).posicoes_vazias()
         actions = []
         for i in range(3):
             for j in range(3):
@@ -59,44 +310,87 @@ class QLearningAgent:
         Escolhe uma ação usando estratégia epsilon-greedy
         
         Args:
-            tabuleiro (list): Estado atual do tabuleiro
+            tabuleiro (list or BitBoard): Estado atual do tabuleiro
             training (bool): Se True, usa exploração; se False, usa apenas exploração
             
         Returns:
             tuple: (linha, coluna) da ação escolhida ou None se não há ações válidas
         """
+        if self.backend == 'numpy':
+            return self._choose_action_numpy(como_bitboard(tabuleiro), training)
+        
         valid_actions = self.get_valid_actions(tabuleiro)
         if not valid_actions:
             return None
         
-        state_key = self.get_state_key(tabuleiro)
+        if self.simetria:
+            canonico, t = self._canonizar(como_bitboard(tabuleiro))
+            state_key = canonico.chave()
+            perm = PARA_CANONICO[t]
+        else:
+            state_key = self.get_state_key(tabuleiro)
         
         # Durante o treinamento, usa epsilon-greedy
         if training and random.random() < self.epsilon:
             return random.choice(valid_actions)
         
-        # Escolhe a melhor ação conhecida
+        # Escolhe a melhor ação conhecida (percorrida nas coordenadas originais)
         best_action = None
         best_value = float('-inf')
         
         for action in valid_actions:
-            q_value = self.q_table[state_key][action]
+            chave_acao = divmod(perm[action[0] * 3 + action[1]], 3) if self.simetria else action
+            q_value = self.q_table[state_key][chave_acao]
             if q_value > best_value:
                 best_value = q_value
                 best_action = action
         
         return best_action if best_action else random.choice(valid_actions)
     
+    def _choose_action_numpy(self, bits, training):
+        """Epsilon-greedy com argmax mascarado sobre a linha do estado no array"""
+        vazias = bits.vazias()
+        if not vazias:
+            return None
+        
+        if training and random.random() < self.epsilon:
+            return random.choice(CASAS_POR_MASCARA[vazias])
+        
+        # argmax devolve a primeira casa de maior valor, como o laço do backend 'dict'
+        indice = bits.indice()
+        if self.simetria:
+            # argmax nas coordenadas canônicas, com a casa escolhida levada de volta ao original
+            t = self._transformacao[indice]
+            vazias_canonicas = self._mascaras_simetria[t][vazias]
+            np.add(self.q_table[self._canonico[indice]], _PENALIDADE_VAZIAS[vazias_canonicas],
+                   out=self._buffer)
+            return divmod(DO_CANONICO[t][int(self._buffer.argmax())], 3)
+        else:
+            np.add(self.q_table[indice], _PENALIDADE_VAZIAS[vazias], out=self._buffer)
+        return divmod(int(self._buffer.argmax()), 3)
+    
     def update_q_value(self, state, action, reward, next_state):
         """
         Atualiza o valor Q usando a equação de Bellman
         
         Args:
-            state (list): Estado atual do tabuleiro
+            state (list or BitBoard): Estado atual do tabuleiro
             action (tuple): Ação tomada (linha, coluna)
             reward (float): Recompensa recebida
-            next_state (list): Próximo estado do tabuleiro
+            next_state (list or BitBoard): Próximo estado do tabuleiro
         """
+        if self.backend == 'numpy':
+            self._update_q_value_numpy(como_bitboard(state), action, reward, como_bitboard(next_state))
+            return
+        
+        # A cópia de trocar_tabela deixa de ser a tabela do arquivo
+        self._snapshot = None
+        if self.simetria:
+            # Atualiza a entrada canônica, com a ação levada às mesmas coordenadas
+            state, t = self._canonizar(como_bitboard(state))
+            action = divmod(PARA_CANONICO[t][action[0] * 3 + action[1]], 3)
+            next_state = self._canonizar(como_bitboard(next_state))[0]
+        
         state_key = self.get_state_key(state)
         next_state_key = self.get_state_key(next_state)
         
@@ -110,38 +404,321 @@ class QLearningAgent:
         current_q = self.q_table[state_key][action]
         self.q_table[state_key][action] = current_q + self.alpha * (reward + self.gamma * max_next_q - current_q)
     
-    def decay_epsilon(self):
-        """Diminui epsilon gradualmente durante o treinamento"""
-        if self.epsilon > self.epsilon_min:
+    def _update_q_value_numpy(self, bits, action, reward, next_bits):
+        """Equação de Bellman com máximo vetorizado sobre as ações válidas do próximo estado"""
+        if self._converter_antes_de_gravar:
+            self._garantir_tabela_gravavel()
+        
+        pos = action[0] * 3 + action[1]
+        indice = bits.indice()
+        next_indice = next_bits.indice()
+        vazias = next_bits.vazias()
+        if self.simetria:
+            # Só os índices e a máscara de vazias precisam ir para o estado canônico
+            t = self._transformacao[indice]
+            pos = PARA_CANONICO[t][pos]
+            indice = self._canonico[indice]
+            vazias = self._mascaras_simetria[self._transformacao[next_indice]][vazias]
+            next_indice = self._canonico[next_indice]
+        
+        max_next_q = 0.0
+        if vazias:
+            np.add(self.q_table[next_indice], _PENALIDADE_VAZIAS[vazias], out=self._buffer)
+            max_next_q = float(self._buffer.max())
+        
+        linha = self.q_table[indice]
+        current_q = float(linha[pos])
+        linha[pos] = current_q + self.alpha * (reward + self.gamma * max_next_q - current_q)
+    
+    def valor_maximo(self, tabuleiro):
+        """
+        Maior valor Q entre as jogadas válidas do estado
+        
+        Args:
+            tabuleiro (list, BitBoard or int): Estado do tabuleiro
+            
+        Returns:
+            float: max_a Q(s, a), ou 0 se não há jogadas válidas
+        """
+        if self.backend == 'numpy':
+            bits = como_bitboard(tabuleiro)
+            vazias = bits.vazias()
+            if not vazias:
+                return 0.0
+            indice = bits.indice()
+            if self.simetria:
+                vazias = self._mascaras_simetria[self._transformacao[indice]][vazias]
+                indice = self._canonico[indice]
+            np.add(self.q_table[indice], _PENALIDADE_VAZIAS[vazias], out=self._buffer)
+            return float(self._buffer.max()) * self.escala_q
+        
+        if self.simetria:
+            tabuleiro = self._canonizar(como_bitboard(tabuleiro))[0]
+        acoes = self.get_valid_actions(tabuleiro)
+        # Consulta sem inserir chaves novas na tabela
+        valores = self.q_table.get(self.get_state_key(tabuleiro))
+        if not acoes or valores is None:
+            return 0.0
+        return max(valores.get(acao, 0.0) for acao in acoes)
+    
+    def valores_maximos(self, estados):
+        """
+        Versão em lote de valor_maximo para o tabuleiro 3x3
+        
+        Args:
+            estados (numpy.ndarray): Índices em base 3 dos estados (coordenadas originais)
+            
+        Returns:
+            numpy.ndarray: max_a Q(s, a) de cada estado (0 para tabuleiros cheios)
+        """
+        if self.backend != 'numpy':
+            raise ValueError("Consulta em lote requer o backend 'numpy'")
+        if self.simetria:
+            estados = tabelas_simetria_np()[0][estados]
+        # Casas vazias a partir dos dígitos em base 3 do próprio índice
+        vazias = estados[:, None] // 3 ** np.arange(NUM_CASAS, dtype=np.int64) % 3 == 0
+        valores = np.where(vazias, self.q_table[estados], -np.inf).max(axis=1)
+        return np.where(vazias.any(axis=1), valores * self.escala_q, 0.0)
+    
+    def update_q_target(self, state, action, alvo):
+        """
+        Aproxima Q(s, a) de um alvo já calculado: Q(s, a) += alpha * (alvo - Q(s, a))
+        
+        Usado pelas atualizações de TD(lambda), em que o alvo combina recompensa e
+        valores de estados seguintes (ver JogoDaVelha.treinar_ia).
+        
+        Args:
+            state (list or BitBoard): Estado em que a ação foi tomada
+            action (tuple): Ação tomada (linha, coluna)
+            alvo (float): Valor alvo da atualização
+        """
+        if self.backend == 'numpy':
+            if self._converter_antes_de_gravar:
+                self._garantir_tabela_gravavel()
+            bits = como_bitboard(state)
+            pos = action[0] * 3 + action[1]
+            indice = bits.indice()
+            if self.simetria:
+                pos = PARA_CANONICO[self._transformacao[indice]][pos]
+                indice = self._canonico[indice]
+            linha = self.q_table[indice]
+            current_q = float(linha[pos])
+            linha[pos] = current_q + self.alpha * (alvo - current_q)
+            return
+        
+        self._snapshot = None
+        if self.simetria:
+            state, t = self._canonizar(como_bitboard(state))
+            action = divmod(PARA_CANONICO[t][action[0] * 3 + action[1]], 3)
+        state_key = self.get_state_key(state)
+        current_q = self.q_table[state_key][action]
+        self.q_table[state_key][action] = current_q + self.alpha * (alvo - current_q)
+    
+    def update_q_values_batch(self, estados, casas, alvos):
+        """
+        Aplica em lote Q(s, a) += alpha * (alvo - Q(s, a)) para as jogadas de partidas encerradas
+        
+        Quando o mesmo par (estado, ação) aparece k vezes, as k atualizações viram uma só
+        em direção ao alvo médio, com passo 1 - (1 - alpha)^k (o efeito de k
+        atualizações seguidas com o mesmo alvo). Somar os k passos faria a tabela divergir.
+        
+        Args:
+            estados (numpy.ndarray): Índices em base 3 dos estados (coordenadas originais)
+            casas (numpy.ndarray): Casa jogada (0-8) em cada estado
+            alvos (numpy.ndarray): Alvo de cada jogada (recompensa final ou retorno de TD)
+        """
+        if self.backend != 'numpy':
+            raise ValueError("Atualização em lote requer o backend 'numpy'")
+        if self._converter_antes_de_gravar:
+            self._garantir_tabela_gravavel()
+        if self.simetria:
+            canonico, transformacao, permutacoes = tabelas_simetria_np()
+            casas = permutacoes[transformacao[estados], casas]
+            estados = canonico[estados]
+        
+        chaves, inverso, repeticoes = np.unique(
+            estados * NUM_CASAS + casas, return_inverse=True, return_counts=True
+        )
+        media = np.bincount(inverso, weights=alvos) / repeticoes
+        passo = 1.0 - (1.0 - self.alpha) ** repeticoes
+        q_plana = self.q_table.reshape(-1)
+        q_plana[chaves] += (passo * (media - q_plana[chaves])).astype(np.float32)
+    
+    def decay_epsilon(self, vezes=1):
+        """
+        Diminui epsilon gradualmente durante o treinamento
+        
+        Args:
+            vezes (int): Número de episódios concluídos a descontar de uma vez
+        """
+        for _ in range(vezes):
+            if self.epsilon <= self.epsilon_min:
+                break
             self.epsilon *= self.epsilon_decay
     
-    def save_model(self, filename):
+    def save_model(self, filename, tipo_valor='float32', esparso=False):
         """
         Salva o Q-table treinado em arquivo
         
+        Arquivos terminados em '.pkl' usam pickle (formato antigo); os demais usam o
+        formato binário de agente.formato_modelo, que requer NumPy. O arquivo é escrito
+        num temporário e renomeado, então leitores nunca veem um modelo pela metade.
+        
         Args:
             filename (str): Caminho do arquivo para salvar
+            tipo_valor (str): Formato binário: 'float32', 'float16' ou 'int8' (quantizado)
+            esparso (bool or None): Formato binário: grava só os estados visitados (arquivo
+                menor, mas expandido na carga); False mantém o arquivo denso e mapeável sem
+                cópia; None escolhe o menor arquivo
         """
-        with open(filename, 'wb') as f:
-            pickle.dump(dict(self.q_table), f)
+        if filename.endswith('.pkl'):
+            with escrita_atomica(filename) as f:
+                if self.backend == 'numpy':
+                    pickle.dump(np.asarray(self.q_table, dtype=np.float32) * np.float32(self.escala_q), f)
+                else:
+                    pickle.dump(dict(self.q_table), f)
+            return
+        
+        if not self.geometria.padrao:
+            raise ValueError("O formato binário só existe para o tabuleiro 3x3; use um arquivo .pkl")
+        if np is None:
+            raise ImportError("O formato binário de modelo requer o pacote numpy instalado")
+        if self.backend == 'numpy':
+            tabela = np.asarray(self.q_table, dtype=np.float32) * np.float32(self.escala_q)
+        else:
+            tabela = self._dict_para_array(self.q_table)
+        with escrita_atomica(filename) as f:
+            formato_modelo.salvar_tabela(f, tabela, tipo_valor, esparso, self.simetria)
     
     def load_model(self, filename):
         """
         Carrega um Q-table treinado de arquivo
         
+        Modelos salvos por qualquer um dos backends são convertidos para o backend do agente.
+        Modelos binários densos entram no backend 'numpy' como numpy.memmap, sem cópia, e
+        a configuração de simetria do arquivo passa a valer para o agente.
+        
+        Só arquivos terminados em '.pkl' são lidos com pickle, que pode executar código
+        arbitrário ao desserializar; qualquer outro arquivo precisa estar no formato binário.
+        
         Args:
             filename (str): Caminho do arquivo para carregar
             
         Returns:
-            bool: True se carregado com sucesso, False caso contrário
+            bool: True se carregado com sucesso, False se o arquivo não existe
+            
+        Raises:
+            FormatoInvalido: Arquivo que não está no formato binário (sem extensão '.pkl')
+                ou pickle corrompido (ValueError sem NumPy)
         """
+        erro_formato = formato_modelo.FormatoInvalido if np is not None else ValueError
+        if not filename.endswith('.pkl'):
+            if not os.path.exists(filename):
+                return False
+            if np is None:
+                raise ImportError("O formato binário de modelo requer o pacote numpy instalado")
+            if not formato_modelo.eh_formato_binario(filename):
+                raise erro_formato(
+                    f"{filename} não é um modelo binário da Q-table; modelos em pickle só são "
+                    f"lidos de arquivos .pkl"
+                )
+            if not self.geometria.padrao:
+                raise ValueError(f"{filename} é um modelo binário 3x3")
+            self._load_model_binario(filename)
+            return True
+        
         try:
             with open(filename, 'rb') as f:
                 loaded_table = pickle.load(f)
-                self.q_table = defaultdict(lambda: defaultdict(float), loaded_table)
-            return True
         except FileNotFoundError:
             return False
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError, IndexError,
+                TypeError, ValueError) as erro:
+            raise erro_formato(f"{filename} não é um modelo em pickle válido: {erro}") from erro
+        densa = (np is not None and isinstance(loaded_table, np.ndarray)
+                 and loaded_table.shape == (NUM_ESTADOS, NUM_CASAS))
+        if not (densa or isinstance(loaded_table, dict)):
+            raise erro_formato(f"{filename} não guarda uma Q-table")
+        
+        self.escala_q = 1.0
+        self._converter_antes_de_gravar = False
+        self._snapshot = None
+        if isinstance(loaded_table, dict):
+            if self.backend == 'numpy':
+                self.q_table = self._dict_para_array(loaded_table)
+            else:
+                self.q_table = defaultdict(lambda: defaultdict(float), loaded_table)
+        elif not self.geometria.padrao:
+            raise ValueError(f"{filename} guarda uma Q-table densa 3x3")
+        elif self.backend == 'numpy':
+            self.q_table = np.asarray(loaded_table, dtype=np.float32).copy()
+        else:
+            self.q_table = self._array_para_dict(loaded_table)
+        return True
+    
+    def _load_model_binario(self, filename):
+        """Carrega um modelo no formato binário, mapeado em memória quando denso"""
+        modelo = formato_modelo.ModeloMapeado(filename)
+        if (modelo.num_estados, modelo.num_acoes) != (NUM_ESTADOS, NUM_CASAS):
+            raise formato_modelo.FormatoInvalido(
+                f"{filename} tem {modelo.num_estados} estados x {modelo.num_acoes} ações; "
+                f"esperado {NUM_ESTADOS} x {NUM_CASAS}"
+            )
+        self._configurar_simetria(modelo.simetria)
+        tabela = modelo.tabela_densa()
+        escala = modelo.escala_da_tabela_densa()
+        
+        self._snapshot = None
+        if self.backend == 'dict':
+            self.q_table = self._array_para_dict(np.asarray(tabela, dtype=np.float32) * np.float32(escala))
+            return
+        
+        self.q_table = tabela
+        self.escala_q = escala
+        self._converter_antes_de_gravar = tabela.dtype != np.float32
+    
+    @staticmethod
+    def _dict_para_array(tabela):
+        """Converte uma Q-table de dicionários (chaves string) para o array denso"""
+        array = np.zeros((NUM_ESTADOS, NUM_CASAS), dtype=np.float32)
+        for chave, acoes in tabela.items():
+            indice = BitBoard.de_matriz([chave[0:3], chave[3:6], chave[6:9]]).indice()
+            for (linha, coluna), valor in acoes.items():
+                array[indice, linha * 3 + coluna] = valor
+        return array
+    
+    @staticmethod
+    def _array_para_dict(array):
+        """Converte o array denso para Q-table de dicionários, só com estados visitados"""
+        tabela = defaultdict(lambda: defaultdict(float))
+        for indice in np.flatnonzero(np.any(array != 0, axis=1)):
+            acoes = tabela[BitBoard.de_indice(int(indice)).chave()]
+            for pos in np.flatnonzero(array[indice]):
+                acoes[divmod(int(pos), 3)] = float(array[indice, pos])
+        return tabela
+    
+    def congelar(self):
+        """
+        Cópia somente leitura da política gulosa, para servir o modelo sem alterá-lo
+        
+        Consultas na cópia não inserem estados nem usam buffers compartilhados (ver
+        agente.tabela_congelada); ela pode ser usada por várias threads.
+        
+        Returns:
+            TabelaCongelada: Visão congelada da Q-table atual
+        """
+        from agente.tabela_congelada import congelar
+        return congelar(self)
+    
+    def compilar(self):
+        """
+        Pré-calcula a jogada gulosa de cada posição alcançável do 3x3 (ver agente.politica)
+        
+        Returns:
+            PoliticaCompilada: Array com a jogada de cada índice de estado
+        """
+        from agente.politica import compilar_politica
+        return compilar_politica(self)
     
     def get_stats(self):
         """
@@ -150,9 +727,14 @@ class QLearningAgent:
         Returns:
             dict: Dicionário com estatísticas do agente
         """
+        if self.backend == 'numpy':
+            num_states = int(np.count_nonzero(np.any(self.q_table != 0, axis=1)))
+        else:
+            num_states = len(self.q_table)
         return {
-            'num_states': len(self.q_table),
+            'num_states': num_states,
             'epsilon': self.epsilon,
             'alpha': self.alpha,
-            'gamma': self.gamma
-        }
\ No newline at end of file
+            'gamma': self.gamma,
+            'backend': self.backend
+        }
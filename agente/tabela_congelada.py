@@ -0,0 +1,162 @@
+"""
+Tabela congelada - visão somente leitura de uma Q-table treinada, para jogar sem alterá-la
+
+As consultas de QLearningAgent.choose_action(training=False) no backend 'dict' inserem
+estados e ações nos defaultdicts a cada posição nunca vista, e o backend 'numpy' usa um
+buffer próprio do agente no argmax. A tabela congelada guarda só os estados visitados,
+ordenados, num array de chaves e outro de valores float32, ambos expostos como
+memoryviews somente leitura: consultar não grava nada, então a mesma instância pode ser
+usada por várias threads ao mesmo tempo.
+"""
+
+from array import array
+from bisect import bisect_left
+
+from agente.qlearning import DO_CANONICO, PARA_CANONICO, tabelas_simetria
+from jogo.bitboard import BitBoard, como_bitboard
+
+try:
+    import numpy as np
+except ImportError:  # Sem NumPy só existem agentes com o backend 'dict'
+    np = None
+
+
+def _compactar_chaves(chaves):
+    """Chaves ordenadas no menor tipo inteiro sem sinal que as comporta"""
+    maior = chaves[-1] if chaves else 0
+    for tipo in 'HIQ':
+        bruto = array(tipo)
+        if maior < 1 << (8 * bruto.itemsize):
+            bruto.extend(chaves)
+            return memoryview(bruto).toreadonly()
+    # Chaves compactas de tabuleiros grandes passam de 64 bits
+    return tuple(chaves)
+
+
+class TabelaCongelada:
+    """
+    Política gulosa de um QLearningAgent, imutável depois de criada
+
+    Escolhe a mesma jogada de choose_action(training=False) do agente de origem: a
+    primeira casa livre de maior valor, percorrida nas coordenadas canônicas quando o
+    agente usa simetria (ou nas originais, como faz o backend 'dict'). Estados que o
+    agente nunca visitou jogam na primeira casa livre.
+    """
+
+    def __init__(self, chaves, valores, geometria, simetria=False, desempate_original=False):
+        """
+        Args:
+            chaves (list): Chaves dos estados em ordem crescente (índice em base 3 no 3x3,
+                canônico se simetria; chave compacta nos demais tabuleiros)
+            valores (array.array): Valores Q em float32 ('f'), uma linha de
+                geometria.num_casas valores por chave, na mesma ordem
+            geometria (Geometria): Geometria do tabuleiro
+            simetria (bool): Se as chaves do 3x3 são de estados canônicos
+            desempate_original (bool): Com simetria, percorre as casas nas coordenadas do
+                tabuleiro recebido em vez das canônicas
+        """
+        if len(valores) != len(chaves) * geometria.num_casas:
+            raise ValueError("valores deve ter uma linha por chave")
+        self.geometria = geometria
+        self.simetria = simetria
+        self.desempate_original = desempate_original
+        self.num_estados = len(chaves)
+        self.num_acoes = geometria.num_casas
+        self._chaves = _compactar_chaves(chaves)
+        self._valores = memoryview(valores).toreadonly()
+        if simetria:
+            self._canonico, self._transformacao, self._mascaras_simetria = tabelas_simetria()
+
+    @property
+    def nbytes(self):
+        """Bytes ocupados pelas chaves e valores"""
+        chaves = self._chaves
+        tamanho_chaves = chaves.nbytes if isinstance(chaves, memoryview) else 8 * len(chaves)
+        return tamanho_chaves + self._valores.nbytes
+
+    def _inicio_linha(self, chave):
+        """Posição da linha do estado em _valores, ou -1 se ele não foi visitado"""
+        chaves = self._chaves
+        i = bisect_left(chaves, chave)
+        if i < self.num_estados and chaves[i] == chave:
+            return i * self.num_acoes
+        return -1
+
+    def _melhor_casa(self, chave, vazias, permutacao=None):
+        """Primeira casa livre de maior valor na linha do estado (lida em permutacao[casa])"""
+        inicio = self._inicio_linha(chave)
+        if inicio < 0:
+            return (vazias & -vazias).bit_length() - 1
+        valores = self._valores
+        melhor = -1
+        melhor_valor = float('-inf')
+        for pos in range(self.num_acoes):
+            if vazias >> pos & 1:
+                valor = valores[inicio + (pos if permutacao is None else permutacao[pos])]
+                if valor > melhor_valor:
+                    melhor, melhor_valor = pos, valor
+        return melhor
+
+    def choose_action(self, tabuleiro, training=False):
+        """
+        Jogada gulosa no tabuleiro
+
+        Args:
+            tabuleiro (list, BitBoard or int): Estado atual do tabuleiro
+            training (bool): Aceito pela mesma interface do agente; a jogada é sempre gulosa
+
+        Returns:
+            tuple: (linha, coluna) da jogada ou None se não há casas vazias
+        """
+        bits = como_bitboard(tabuleiro, self.geometria)
+        vazias = bits.vazias()
+        if not vazias:
+            return None
+        if not self.geometria.padrao:
+            return self.geometria.casas[self._melhor_casa(bits.chave_compacta(), vazias)]
+        indice = bits.indice()
+        if self.simetria:
+            t = self._transformacao[indice]
+            if self.desempate_original:
+                return divmod(self._melhor_casa(self._canonico[indice], vazias, PARA_CANONICO[t]), 3)
+            pos = self._melhor_casa(self._canonico[indice], self._mascaras_simetria[t][vazias])
+            return divmod(DO_CANONICO[t][pos], 3)
+        return divmod(self._melhor_casa(indice, vazias), 3)
+
+
+def congelar(agente):
+    """
+    Copia a Q-table de um agente para uma TabelaCongelada
+
+    Só entram os estados com algum valor diferente de zero: os demais já jogam na
+    primeira casa livre. Alterações posteriores no agente não chegam à cópia.
+
+    Args:
+        agente (QLearningAgent): Agente treinado, de qualquer backend
+
+    Returns:
+        TabelaCongelada: Tabela pronta para consulta
+    """
+    geometria = agente.geometria
+    valores = array('f')
+    if agente.backend == 'numpy':
+        tabela = np.asarray(agente.q_table, dtype=np.float32) * np.float32(agente.escala_q)
+        visitados = np.flatnonzero(np.any(tabela != 0, axis=1))
+        valores.frombytes(np.ascontiguousarray(tabela[visitados]).tobytes())
+        return TabelaCongelada(visitados.tolist(), valores, geometria, agente.simetria)
+
+    linhas = {}
+    for chave, acoes in agente.q_table.items():
+        if not any(acoes.values()):
+            continue
+        if geometria.padrao:
+            chave = BitBoard.de_matriz([chave[0:3], chave[3:6], chave[6:9]]).indice()
+        linha = [0.0] * geometria.num_casas
+        for (i, j), valor in acoes.items():
+            linha[i * geometria.tamanho + j] = valor
+        linhas[chave] = linha
+    chaves = sorted(linhas)
+    for chave in chaves:
+        valores.extend(linhas[chave])
+    # O backend 'dict' percorre as jogadas válidas nas coordenadas do tabuleiro recebido
+    return TabelaCongelada(chaves, valores, geometria, agente.simetria, desempate_original=True)
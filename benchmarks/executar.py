@@ -0,0 +1,78 @@
+"""
+Executa os benchmarks, grava o relatório JSON e opcionalmente compara com uma linha de base
+
+    python -m benchmarks.executar --saida benchmarks/base.json
+    python -m benchmarks.executar --comparar benchmarks/base.json --limite 0.15
+
+Com --comparar o processo termina com código 1 se alguma métrica piorou além do limite.
+"""
+
+import argparse
+import os
+import sys
+
+# Permite também `python benchmarks/executar.py` a partir da raiz do projeto
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.medidas import GRUPOS
+from benchmarks.relatorio import (
+    carregar_relatorio, comparar, formatar_comparacao, montar_relatorio, salvar_relatorio,
+)
+
+SAIDA_OK = 0
+SAIDA_REGRESSAO = 1
+
+
+def criar_parser():
+    """
+    Returns:
+        argparse.ArgumentParser: Parser dos argumentos dos benchmarks
+    """
+    parser = argparse.ArgumentParser(description="Benchmarks do Jogo da Velha com IA")
+    parser.add_argument('--grupos', nargs='+', choices=sorted(GRUPOS), default=sorted(GRUPOS),
+                        help="Grupos a medir (padrão: todos)")
+    parser.add_argument('--rapido', action='store_true',
+                        help="Usa tamanhos reduzidos (para CI ou checagem rápida)")
+    parser.add_argument('--saida', default=None,
+                        help="Arquivo JSON onde gravar os resultados")
+    parser.add_argument('--comparar', metavar='BASE', default=None,
+                        help="Relatório JSON de linha de base para detectar regressões")
+    parser.add_argument('--limite', type=float, default=0.10,
+                        help="Piora relativa tolerada na comparação (padrão: 0.10)")
+    return parser
+
+
+def main(argv=None):
+    """
+    Args:
+        argv (list or None): Argumentos da linha de comando (None usa sys.argv)
+
+    Returns:
+        int: Código de saída do processo
+    """
+    args = criar_parser().parse_args(argv)
+    base = carregar_relatorio(args.comparar) if args.comparar else None
+
+    metricas = {}
+    for nome in args.grupos:
+        funcao, completos, rapidos = GRUPOS[nome]
+        print(f"[benchmark] {nome}...", file=sys.stderr, flush=True)
+        medidas = funcao(**(rapidos if args.rapido else completos))
+        for chave, medida in sorted(medidas.items()):
+            print(f"  {chave}: {medida['valor']:.4g} {medida['unidade']}", file=sys.stderr)
+        metricas.update(medidas)
+
+    relatorio = montar_relatorio(metricas, args.grupos)
+    if args.saida:
+        salvar_relatorio(relatorio, args.saida)
+        print(f"[benchmark] resultados gravados em {args.saida}", file=sys.stderr)
+
+    if base is None:
+        return SAIDA_OK
+    linhas = comparar(relatorio, base, args.limite)
+    print(formatar_comparacao(linhas, args.limite))
+    return SAIDA_REGRESSAO if any(regrediu for *_, regrediu in linhas) else SAIDA_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,320 @@
+"""
+Medidas de desempenho do jogo e do agente - cada função devolve métricas no formato do relatório
+
+Toda métrica é um dicionário {'valor': float, 'unidade': str, 'maior_melhor': bool}.
+"""
+
+import contextlib
+import io
+import multiprocessing as mp
+import os
+import queue
+import random
+import shutil
+import tempfile
+import time
+
+try:
+    import resource
+except ImportError:  # Windows: sem pico de RSS
+    resource = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from agente.qlearning import QLearningAgent
+from jogo.bitboard import BitBoard
+from jogo.motor import JogoDaVelha
+from jogo.terminal import EM_ANDAMENTO, RESULTADOS
+
+
+def metrica(valor, unidade, maior_melhor):
+    """
+    Args:
+        valor (float): Valor medido
+        unidade (str): Unidade exibida no relatório
+        maior_melhor (bool): True se valores maiores indicam melhor desempenho
+
+    Returns:
+        dict: Métrica no formato do relatório
+    """
+    return {'valor': float(valor), 'unidade': unidade, 'maior_melhor': maior_melhor}
+
+
+def percentil(amostras, p):
+    """
+    Args:
+        amostras (list): Valores já ordenados
+        p (float): Percentil entre 0 e 100
+
+    Returns:
+        float: Valor do percentil pelo método do vizinho mais próximo
+    """
+    posicao = min(len(amostras) - 1, max(0, round(p / 100 * len(amostras)) - 1))
+    return amostras[posicao]
+
+
+def posicoes_aleatorias(quantidade, seed=0):
+    """
+    Gera posições alcançáveis e ainda em andamento, sorteando partidas aleatórias
+
+    Args:
+        quantidade (int): Número de posições
+        seed (int): Semente do sorteio
+
+    Returns:
+        list: Lista de BitBoard
+    """
+    rng = random.Random(seed)
+    posicoes = []
+    while len(posicoes) < quantidade:
+        bits = BitBoard()
+        jogador = 'X'
+        while RESULTADOS[bits.indice()] == EM_ANDAMENTO and len(posicoes) < quantidade:
+            posicoes.append(bits.copiar())
+            linha, coluna = rng.choice(bits.posicoes_vazias())
+            bits.jogar(linha * 3 + coluna, jogador)
+            jogador = 'O' if jogador == 'X' else 'X'
+    return posicoes
+
+
+def posicoes_alcancaveis(seed=0):
+    """
+    Todas as posições alcançáveis e ainda em andamento, em ordem embaralhada
+
+    Args:
+        seed (int): Semente do embaralhamento
+
+    Returns:
+        list: Lista de BitBoard sem repetições (4.520 posições)
+    """
+    vistos = set()
+    pendentes = [BitBoard()]
+    posicoes = []
+    while pendentes:
+        bits = pendentes.pop()
+        indice = bits.indice()
+        if indice in vistos or RESULTADOS[indice] != EM_ANDAMENTO:
+            continue
+        vistos.add(indice)
+        posicoes.append(bits)
+        jogador = 'X' if bits.num_jogadas() % 2 == 0 else 'O'
+        for linha, coluna in bits.posicoes_vazias():
+            filho = bits.copiar()
+            filho.jogar(linha * 3 + coluna, jogador)
+            pendentes.append(filho)
+    random.Random(seed).shuffle(posicoes)
+    return posicoes
+
+
+@contextlib.contextmanager
+def _pasta_temporaria():
+    """Muda para uma pasta temporária, onde JogoDaVelha cria 'modelos/' sem sujar o projeto"""
+    original = os.getcwd()
+    pasta = tempfile.mkdtemp(prefix='benchmark-')
+    os.chdir(pasta)
+    try:
+        yield pasta
+    finally:
+        os.chdir(original)
+        shutil.rmtree(pasta, ignore_errors=True)
+
+
+def medir_treino(num_episodios=20000, num_ambientes=1024):
+    """
+    Episódios de self-play por segundo em JogoDaVelha.treinar_ia
+
+    Args:
+        num_episodios (int): Episódios do treino no tabuleiro único
+        num_ambientes (int): Partidas simultâneas do treino vetorizado (só com NumPy)
+
+    Returns:
+        dict: Métricas de treino
+    """
+    metricas = {}
+    modos = [('treino_episodios_por_s', num_episodios, None)]
+    if np is not None:
+        modos.append(('treino_vetorizado_episodios_por_s', num_episodios * 20, num_ambientes))
+
+    with _pasta_temporaria():
+        for nome, episodios, ambientes in modos:
+            jogo = JogoDaVelha()
+            with contextlib.redirect_stdout(io.StringIO()):
+                resumo = jogo.treinar_ia(episodios, num_ambientes=ambientes, seed=0,
+                                         interativo=False, intervalo_progresso=3600)
+            metricas[nome] = metrica(resumo['episodios_por_segundo'], 'ep/s', True)
+    return metricas
+
+
+def _agente_treinado(num_episodios):
+    """Agente do jogo após um treino curto, para que a Q-table tenha valores de verdade"""
+    with _pasta_temporaria():
+        jogo = JogoDaVelha()
+        with contextlib.redirect_stdout(io.StringIO()):
+            jogo.treinar_ia(num_episodios, seed=0, interativo=False, intervalo_progresso=3600)
+    return jogo.agente_ia
+
+
+def medir_choose_action(num_chamadas=20000, episodios_treino=2000):
+    """
+    Latência p50/p99 de QLearningAgent.choose_action com e sem exploração
+
+    Args:
+        num_chamadas (int): Chamadas medidas em cada modo
+        episodios_treino (int): Episódios do treino que prepara a Q-table
+
+    Returns:
+        dict: Métricas de latência em microssegundos
+    """
+    agente = _agente_treinado(episodios_treino)
+    posicoes = posicoes_aleatorias(num_chamadas)
+    relogio = time.perf_counter_ns
+    metricas = {}
+    for training, sufixo in ((True, 'treino'), (False, 'jogo')):
+        amostras = []
+        for bits in posicoes:
+            inicio = relogio()
+            agente.choose_action(bits, training=training)
+            amostras.append(relogio() - inicio)
+        amostras.sort()
+        for p in (50, 99):
+            metricas[f'choose_action_p{p}_{sufixo}_us'] = metrica(percentil(amostras, p) / 1000, 'us', False)
+    return metricas
+
+
+def medir_verificar_vitoria(num_chamadas=200000):
+    """
+    Chamadas por segundo de JogoDaVelha.verificar_vitoria em posições variadas
+
+    Args:
+        num_chamadas (int): Total de chamadas medidas
+
+    Returns:
+        dict: Métrica de vazão
+    """
+    with _pasta_temporaria():
+        jogo = JogoDaVelha()
+    posicoes = posicoes_aleatorias(1000)
+    repeticoes = max(1, num_chamadas // len(posicoes))
+    tabuleiro = jogo.tabuleiro
+    verificar = jogo.verificar_vitoria
+
+    inicio = time.perf_counter()
+    for posicao in posicoes:
+        tabuleiro.definir_posicao(posicao)
+        for _ in range(repeticoes):
+            verificar()
+    segundos = time.perf_counter() - inicio
+    return {'verificar_vitoria_chamadas_por_s': metrica(repeticoes * len(posicoes) / segundos, 'chamadas/s', True)}
+
+
+def _pico_rss_kb():
+    """Pico de memória residente do processo atual em KB, ou None sem o módulo resource"""
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS informa bytes; Linux, KB
+    return pico / 1024 if os.uname().sysname == 'Darwin' else pico
+
+
+def _medir_persistencia_processo(num_estados, extensao, backend, opcoes, pasta, resposta):
+    """Roda num processo novo para que o pico de RSS reflita só este tamanho de tabela"""
+    rng = random.Random(num_estados)
+    # Sem simetria cada posição distinta ocupa sua própria linha da tabela
+    origem = QLearningAgent(backend=backend)
+    posicoes = posicoes_alcancaveis()[:num_estados]
+    for posicao in posicoes:
+        for acao in origem.get_valid_actions(posicao):
+            origem.update_q_value(posicao, acao, rng.uniform(-1, 1), posicao)
+    caminho = os.path.join(pasta, f'modelo_{num_estados}{extensao}')
+
+    inicio = time.perf_counter()
+    origem.save_model(caminho, **opcoes)
+    salvar = time.perf_counter() - inicio
+    del origem
+
+    destino = QLearningAgent(backend=backend)
+    inicio = time.perf_counter()
+    destino.load_model(caminho)
+    carregar = time.perf_counter() - inicio
+    # Uma consulta por estado traz para a memória as páginas que o jogo realmente usaria
+    for posicao in posicoes:
+        destino.choose_action(posicao, training=False)
+
+    resposta.put({
+        'salvar_s': salvar,
+        'carregar_s': carregar,
+        'tamanho_kb': os.path.getsize(caminho) / 1024,
+        'pico_rss_kb': _pico_rss_kb(),
+    })
+
+
+def _aguardar_medidas(processo, resposta, espera=1.0, limite=600.0):
+    """Espera as medidas do processo, falhando se ele terminar sem enviá-las ou demorar demais"""
+    prazo = time.monotonic() + limite
+    while True:
+        encerrado = processo.exitcode is not None
+        try:
+            return resposta.get(timeout=espera)
+        except queue.Empty:
+            pass
+        if encerrado or time.monotonic() > prazo:
+            processo.terminate()
+            processo.join()
+            raise RuntimeError(
+                f"O processo de medida de persistência terminou sem resposta "
+                f"(código {processo.exitcode})"
+            )
+
+
+def medir_persistencia(tamanhos=(500, 2000, 4520)):
+    """
+    Tempo de save_model/load_model, tamanho do arquivo e pico de RSS conforme a tabela cresce
+
+    Cada combinação de tamanho e formato roda em um processo novo ('spawn'). O pickle é
+    medido com o backend 'dict', cujo arquivo cresce com os estados visitados; os formatos
+    binários, com o backend 'numpy'.
+
+    Args:
+        tamanhos (tuple): Números de posições preenchidas antes de salvar (até 4.520)
+
+    Returns:
+        dict: Métricas por formato e tamanho
+    """
+    formatos = [('pkl', '.pkl', 'dict', {})]
+    if np is not None:
+        formatos = [('qtab', '.qtab', 'numpy', {}),
+                    ('qtab_esparso', '.qtab', 'numpy', {'esparso': True})] + formatos
+
+    contexto = mp.get_context('spawn')
+    metricas = {}
+    with _pasta_temporaria() as pasta:
+        for num_estados in tamanhos:
+            for nome, extensao, backend, opcoes in formatos:
+                resposta = contexto.Queue()
+                processo = contexto.Process(
+                    target=_medir_persistencia_processo,
+                    args=(num_estados, extensao, backend, opcoes, pasta, resposta),
+                )
+                processo.start()
+                medidas = _aguardar_medidas(processo, resposta)
+                processo.join()
+
+                prefixo = f'modelo_{nome}_{num_estados}'
+                metricas[f'{prefixo}_salvar_ms'] = metrica(medidas['salvar_s'] * 1000, 'ms', False)
+                metricas[f'{prefixo}_carregar_ms'] = metrica(medidas['carregar_s'] * 1000, 'ms', False)
+                metricas[f'{prefixo}_arquivo_kb'] = metrica(medidas['tamanho_kb'], 'KB', False)
+                if medidas['pico_rss_kb'] is not None:
+                    metricas[f'{prefixo}_pico_rss_kb'] = metrica(medidas['pico_rss_kb'], 'KB', False)
+    return metricas
+
+
+# Grupos disponíveis na linha de comando: nome -> (função, argumentos completos, argumentos rápidos)
+GRUPOS = {
+    'treino': (medir_treino, {}, {'num_episodios': 3000}),
+    'choose_action': (medir_choose_action, {}, {'num_chamadas': 3000, 'episodios_treino': 500}),
+    'verificar_vitoria': (medir_verificar_vitoria, {}, {'num_chamadas': 30000}),
+    'persistencia': (medir_persistencia, {}, {'tamanhos': (500, 2000)}),
+}
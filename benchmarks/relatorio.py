@@ -0,0 +1,124 @@
+"""
+Relatório JSON dos benchmarks e comparação contra uma linha de base
+"""
+
+import json
+import os
+import platform
+import time
+
+from utils.arquivos import escrita_atomica
+
+VERSAO_RELATORIO = 1
+
+
+def descrever_ambiente():
+    """
+    Returns:
+        dict: Versões e máquina em que as medidas foram feitas
+    """
+    try:
+        import numpy
+        versao_numpy = numpy.__version__
+    except ImportError:
+        versao_numpy = None
+    return {
+        'python': platform.python_version(),
+        'implementacao': platform.python_implementation(),
+        'plataforma': platform.platform(),
+        'processador': platform.machine(),
+        'cpus': os.cpu_count(),
+        'numpy': versao_numpy,
+    }
+
+
+def montar_relatorio(metricas, grupos):
+    """
+    Args:
+        metricas (dict): Métricas medidas, por nome
+        grupos (list): Grupos de benchmark executados
+
+    Returns:
+        dict: Relatório pronto para gravar em JSON
+    """
+    return {
+        'versao': VERSAO_RELATORIO,
+        'data': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'grupos': list(grupos),
+        'ambiente': descrever_ambiente(),
+        'metricas': metricas,
+    }
+
+
+def salvar_relatorio(relatorio, caminho):
+    """
+    Args:
+        relatorio (dict): Relatório de montar_relatorio
+        caminho (str): Arquivo JSON de destino
+    """
+    with escrita_atomica(caminho, 'w') as f:
+        json.dump(relatorio, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def carregar_relatorio(caminho):
+    """
+    Args:
+        caminho (str): Arquivo JSON gravado por salvar_relatorio
+
+    Returns:
+        dict: Relatório lido
+    """
+    with open(caminho, encoding='utf-8') as f:
+        relatorio = json.load(f)
+    if relatorio.get('versao') != VERSAO_RELATORIO:
+        raise ValueError(f"{caminho}: versão de relatório {relatorio.get('versao')!r} não suportada")
+    return relatorio
+
+
+def comparar(atual, base, limite=0.10):
+    """
+    Compara as métricas presentes nos dois relatórios
+
+    Uma métrica regride quando piora mais que o limite relativo, no sentido indicado por
+    'maior_melhor' (vazão caindo ou latência/tempo/memória subindo).
+
+    Args:
+        atual (dict): Relatório recém-medido
+        base (dict): Relatório da linha de base
+        limite (float): Piora relativa tolerada (0.10 = 10%)
+
+    Returns:
+        list: Tuplas (nome, valor_base, valor_atual, variacao, regrediu), em ordem de nome
+    """
+    linhas = []
+    for nome in sorted(set(atual['metricas']) & set(base['metricas'])):
+        medida = atual['metricas'][nome]
+        referencia = base['metricas'][nome]['valor']
+        valor = medida['valor']
+        if referencia == 0:
+            variacao = 0.0 if valor == 0 else float('inf')
+        else:
+            variacao = (valor - referencia) / abs(referencia)
+        piora = -variacao if medida['maior_melhor'] else variacao
+        linhas.append((nome, referencia, valor, variacao, piora > limite))
+    return linhas
+
+
+def formatar_comparacao(linhas, limite):
+    """
+    Args:
+        linhas (list): Resultado de comparar
+        limite (float): Limite usado na comparação
+
+    Returns:
+        str: Tabela de texto com uma linha por métrica
+    """
+    largura = max([len(nome) for nome, *_ in linhas] + [7])
+    saida = [f"{'métrica':<{largura}}  {'base':>12}  {'atual':>12}  {'variação':>9}"]
+    for nome, referencia, valor, variacao, regrediu in linhas:
+        marca = '  ❌ REGRESSÃO' if regrediu else ''
+        saida.append(f"{nome:<{largura}}  {referencia:>12.4g}  {valor:>12.4g}  {variacao:>+9.1%}{marca}")
+    regressoes = sum(1 for *_, regrediu in linhas if regrediu)
+    saida.append(f"{regressoes} regressão(ões) acima de {limite:.0%} em {len(linhas)} métricas comparadas")
+    return '\n'.join(saida)
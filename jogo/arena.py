@@ -0,0 +1,569 @@
+"""
+Arena de agentes - milhares de partidas sem tela entre pares de jogadores, em vários processos
+
+Jogadores são descritos por texto:
+
+    aleatorio            jogadas uniformes entre as casas vazias
+    perfeito             solver negamax (só 3x3)
+    mcts[:iteracoes]     AgenteMCTS com o orçamento de iterações por jogada (padrão 200)
+    <caminho>            modelo do QLearningAgent (.qtab ou .pkl), jogando de forma gulosa,
+                         ou política compilada (.pol, só 3x3)
+
+No 3x3 com NumPy, confrontos entre aleatorio, perfeito e modelos jogam blocos inteiros de
+partidas em arrays; os demais jogam partida a partida. Cada partida tem sua semente e a
+partida g de um confronto começa com o primeiro jogador como X quando g é par, então os
+resultados não dependem do número de processos.
+"""
+
+import math
+import multiprocessing as mp
+import os
+import random
+
+from agente.mcts import AgenteMCTS
+from agente.negamax import AgenteNegamax
+from agente.politica import PoliticaCompilada, eh_politica
+from agente.qlearning import QLearningAgent
+from jogo.tabuleiro import Tabuleiro
+from jogo.terminal import EM_ANDAMENTO, VITORIA_O, VITORIA_X
+
+try:
+    import numpy as np
+    from jogo.trajetorias import GravadorTrajetorias, empacotar
+    from jogo.vecenv import POTENCIAS_3, RESULTADOS_NP
+except ImportError:  # Sem NumPy todas as partidas são jogadas uma a uma
+    np = None
+
+# Partidas por tarefa enviada aos processos, conforme o confronto roda em lote ou não
+PARTIDAS_POR_BLOCO_LOTE = 65536
+PARTIDAS_POR_BLOCO = 256
+
+# Quantil da normal para os intervalos de confiança de 95%
+Z_95 = 1.959963984540054
+
+# Partidas distintas contadas por confronto; acima disso basta saber que há variedade
+LIMITE_DISTINTAS = 1000
+
+ITERACOES_MCTS = 200
+
+
+class JogadorAleatorio:
+    """Joga uniformemente entre as casas vazias"""
+
+    em_lote = True
+
+    def __init__(self):
+        self.rng = random.Random()
+
+    def reiniciar(self, semente):
+        """Prepara o jogador para uma nova partida com a semente dela"""
+        self.rng.seed(semente)
+
+    def escolher(self, bits):
+        """
+        Args:
+            bits (BitBoard): Posição atual
+
+        Returns:
+            tuple: (linha, coluna) da jogada
+        """
+        return self.rng.choice(bits.posicoes_vazias())
+
+    def escolher_lote(self, indices, legal, rng):
+        """
+        Args:
+            indices (numpy.ndarray): Índices em base 3 das posições, (N,)
+            legal (numpy.ndarray): Casas vazias de cada posição, (N, 9)
+            rng (numpy.random.Generator): Gerador do bloco
+
+        Returns:
+            numpy.ndarray: Casa (0-8) escolhida em cada posição
+        """
+        return _aleatorias_lote(legal, rng)
+
+
+def _aleatorias_lote(legal, rng):
+    """Casa vazia uniforme em cada linha: argmax de ruído mascarado"""
+    return np.where(legal, rng.random(legal.shape), -1.0).argmax(axis=1)
+
+
+class JogadorAgente:
+    """
+    Adapta um agente com choose_action (QLearningAgent, PoliticaCompilada, AgenteNegamax,
+    AgenteMCTS)
+    """
+
+    def __init__(self, agente, em_lote=False):
+        """
+        Args:
+            agente: Agente que joga com choose_action(bits, training=False)
+            em_lote (bool): Se o agente também joga em lote no 3x3
+        """
+        self.agente = agente
+        self.em_lote = em_lote and np is not None
+        self._respostas = None
+        # Modelos jogam pela política compilada no 3x3 e, nos demais tabuleiros, pela cópia
+        # congelada, que não cresce a cada posição nova
+        if isinstance(agente, QLearningAgent):
+            self._tabela = agente.compilar() if agente.geometria.padrao else agente.congelar()
+        elif isinstance(agente, PoliticaCompilada):
+            self._tabela = agente
+        else:
+            self._tabela = None
+
+    def reiniciar(self, semente):
+        """Prepara o jogador para uma nova partida com a semente dela"""
+        if isinstance(self.agente, AgenteMCTS):
+            # A árvore da partida anterior não serve e as simulações seguem a semente do jogo
+            self.agente.rng.seed(semente)
+            if np is not None:
+                self.agente.rng_np = np.random.default_rng(self.agente.rng.getrandbits(64))
+            self.agente.raiz = None
+
+    def escolher(self, bits):
+        """
+        Args:
+            bits (BitBoard): Posição atual
+
+        Returns:
+            tuple: (linha, coluna) da jogada
+        """
+        if self._tabela is not None:
+            return self._tabela.choose_action(bits)
+        return self.agente.choose_action(bits, training=False)
+
+    def escolher_lote(self, indices, legal, rng):
+        """Mesma interface de JogadorAleatorio.escolher_lote"""
+        if isinstance(self._tabela, PoliticaCompilada):
+            if self._respostas is None:
+                self._respostas = np.frombuffer(self._tabela.jogadas, dtype=np.uint8).astype(np.intp)
+            return self._respostas[indices]
+        if self._respostas is None:
+            # Resposta ótima de cada posição alcançável, consultada por índice
+            self.agente.aquecer()
+            self._respostas = np.zeros(len(RESULTADOS_NP), dtype=np.intp)
+            for indice, (linha, coluna) in self.agente.respostas.items():
+                self._respostas[indice] = linha * 3 + coluna
+        return self._respostas[indices]
+
+
+def criar_jogador(especificacao, tamanho=3, em_linha=3, tabela_solver=None):
+    """
+    Monta um jogador a partir da sua descrição em texto (ver o início do módulo)
+
+    Args:
+        especificacao (str): 'aleatorio', 'perfeito', 'mcts[:iteracoes]' ou caminho de modelo
+        tamanho (int): Número de linhas e colunas do tabuleiro
+        em_linha (int): Peças seguidas necessárias para vencer
+        tabela_solver (str or None): Tabela de transposição do solver lida, se existir
+
+    Returns:
+        JogadorAleatorio or JogadorAgente: Jogador pronto para a arena
+    """
+    padrao = (tamanho, em_linha) == (3, 3)
+    if especificacao == 'aleatorio':
+        return JogadorAleatorio()
+    if especificacao == 'perfeito':
+        if not padrao:
+            raise ValueError("O solver perfeito só existe para o tabuleiro 3x3")
+        solver = AgenteNegamax()
+        if tabela_solver is not None:
+            solver.load_model(tabela_solver)
+        return JogadorAgente(solver, em_lote=True)
+    if especificacao == 'mcts' or especificacao.startswith('mcts:'):
+        _, _, iteracoes = especificacao.partition(':')
+        agente = AgenteMCTS(tamanho, em_linha, iteracoes=int(iteracoes or ITERACOES_MCTS))
+        return JogadorAgente(agente)
+
+    if eh_politica(especificacao):
+        politica = PoliticaCompilada.load_model(especificacao)
+        if politica is None or not padrao:
+            raise ValueError(f"Política compilada inválida ou fora do 3x3: {especificacao!r}")
+        return JogadorAgente(politica, em_lote=True)
+
+    agente = QLearningAgent(tamanho=tamanho, em_linha=em_linha)
+    if not os.path.exists(especificacao) or not agente.load_model(especificacao):
+        raise ValueError(f"Jogador desconhecido ou modelo inexistente: {especificacao!r}")
+    return JogadorAgente(agente, em_lote=padrao)
+
+
+# Jogadores de cada processo, criados uma única vez em _inicializar_processo
+_jogadores = None
+
+
+def _inicializar_processo(especificacoes, tamanho, em_linha, tabela_solver):
+    global _jogadores
+    _jogadores = [criar_jogador(especificacao, tamanho, em_linha, tabela_solver)
+                  for especificacao in especificacoes]
+
+
+def _semente_partida(seed, confronto, partida):
+    """Semente própria de cada partida, estável entre execuções e processos"""
+    return f"{seed}:{confronto}:{partida}"
+
+
+def jogar_partidas(jogador_a, jogador_b, inicio, quantidade, tamanho=3, em_linha=3, seed=0,
+                   confronto=0, abertura=0, jogadas=None):
+    """
+    Joga as partidas inicio..inicio+quantidade-1 de um confronto, uma a uma
+
+    Args:
+        jogador_a: Primeiro jogador do confronto (X nas partidas pares)
+        jogador_b: Segundo jogador do confronto
+        inicio (int): Número da primeira partida
+        quantidade (int): Número de partidas
+        tamanho (int): Número de linhas e colunas do tabuleiro
+        em_linha (int): Peças seguidas necessárias para vencer
+        seed (int): Semente da arena
+        confronto (int): Número do confronto, para separar as sementes
+        abertura (int): Jogadas iniciais sorteadas antes de os jogadores assumirem
+        jogadas (list or None): Se informada, recebe a lista de casas jogadas de cada partida
+
+    Returns:
+        list: [vitórias de A como X, como O, empates, vitórias de B como X, como O]
+    """
+    tabuleiro = Tabuleiro(tamanho, em_linha)
+    contagem = [0] * 5
+    sorteio = random.Random()
+    for partida in range(inicio, inicio + quantidade):
+        semente = _semente_partida(seed, confronto, partida)
+        sorteio.seed(semente)
+        jogador_a.reiniciar(semente + ':a')
+        jogador_b.reiniciar(semente + ':b')
+        a_eh_x = partida % 2 == 0
+        jogadores = (jogador_a, jogador_b) if a_eh_x else (jogador_b, jogador_a)
+
+        tabuleiro.limpar()
+        simbolo = 'X'
+        vez = 0
+        casas = []
+        while tabuleiro.resultado() == EM_ANDAMENTO:
+            if tabuleiro.num_ocupadas < abertura:
+                linha, coluna = sorteio.choice(tabuleiro.bits.posicoes_vazias())
+            else:
+                linha, coluna = jogadores[vez].escolher(tabuleiro.bits)
+            tabuleiro.fazer_jogada(linha, coluna, simbolo)
+            casas.append(linha * tamanho + coluna)
+            simbolo = 'O' if simbolo == 'X' else 'X'
+            vez = 1 - vez
+
+        if jogadas is not None:
+            jogadas.append(casas)
+        resultado = tabuleiro.resultado()
+        if resultado == VITORIA_X:
+            contagem[0 if a_eh_x else 3] += 1
+        elif resultado == VITORIA_O:
+            contagem[4 if a_eh_x else 1] += 1
+        else:
+            contagem[2] += 1
+    return contagem
+
+
+def jogar_partidas_lote(jogador_a, jogador_b, inicio, quantidade, seed=0, confronto=0, abertura=0,
+                        jogadas=None):
+    """
+    Mesmas partidas de jogar_partidas no 3x3, todas avançadas juntas em arrays
+
+    A semente vale para o bloco inteiro (inicio identifica o bloco), então os sorteios
+    diferem dos de jogar_partidas, mas não do número de processos. Se `jogadas` for
+    informado, um array (quantidade, 9) preenchido com -1, recebe as casas jogadas.
+
+    Returns:
+        list: [vitórias de A como X, como O, empates, vitórias de B como X, como O]
+    """
+    rng = np.random.default_rng([seed, confronto, inicio])
+    casas = np.zeros((quantidade, 9), dtype=np.int8)
+    indices = np.zeros(quantidade, dtype=np.int64)
+    resultados = np.zeros(quantidade, dtype=np.uint8)
+    a_eh_x = (np.arange(inicio, inicio + quantidade) % 2) == 0
+
+    for jogada in range(9):
+        ativos = np.flatnonzero(resultados == EM_ANDAMENTO)
+        if len(ativos) == 0:
+            break
+        legal = casas[ativos] == 0
+        indices_ativos = indices[ativos]
+        if jogada < abertura:
+            acoes = _aleatorias_lote(legal, rng)
+        else:
+            # X joga nas jogadas pares: é a vez de A onde (jogada par) == (A é X)
+            vez_a = a_eh_x[ativos] == (jogada % 2 == 0)
+            acoes = np.empty(len(ativos), dtype=np.intp)
+            for jogador, selecao in ((jogador_a, vez_a), (jogador_b, ~vez_a)):
+                if selecao.any():
+                    acoes[selecao] = jogador.escolher_lote(indices_ativos[selecao], legal[selecao], rng)
+        simbolo = 1 if jogada % 2 == 0 else 2
+        casas[ativos, acoes] = simbolo
+        if jogadas is not None:
+            jogadas[ativos, jogada] = acoes
+        indices[ativos] = indices_ativos + POTENCIAS_3[acoes] * simbolo
+        resultados[ativos] = RESULTADOS_NP[indices[ativos]]
+
+    vitoria_x = resultados == VITORIA_X
+    vitoria_o = resultados == VITORIA_O
+    return [
+        int(np.count_nonzero(vitoria_x & a_eh_x)),
+        int(np.count_nonzero(vitoria_o & ~a_eh_x)),
+        int(np.count_nonzero(~vitoria_x & ~vitoria_o)),
+        int(np.count_nonzero(vitoria_x & ~a_eh_x)),
+        int(np.count_nonzero(vitoria_o & a_eh_x)),
+    ]
+
+
+def _jogar_bloco(tarefa):
+    """
+    Executa uma tarefa (confronto, i, j, inicio, quantidade) com os jogadores do processo
+
+    Returns:
+        tuple: (confronto, contagem, registros de trajetórias, até LIMITE_DISTINTAS + 1
+            sequências de casas distintas)
+    """
+    confronto, i, j, inicio, quantidade, em_lote, config = tarefa
+    jogador_a, jogador_b = _jogadores[i], _jogadores[j]
+    registros = b''
+    if em_lote:
+        jogadas = np.full((quantidade, 9), -1, dtype=np.int8)
+        contagem = jogar_partidas_lote(jogador_a, jogador_b, inicio, quantidade, config['seed'],
+                                       confronto, config['abertura'], jogadas)
+        unicas = np.unique(jogadas, axis=0)[:LIMITE_DISTINTAS + 1]
+        distintas = {tuple(casa for casa in linha if casa >= 0) for linha in unicas.tolist()}
+        if config['gravar']:
+            registros = empacotar(jogadas, (jogadas >= 0).sum(axis=1)).tobytes()
+    else:
+        jogadas = []
+        contagem = jogar_partidas(jogador_a, jogador_b, inicio, quantidade, config['tamanho'],
+                                  config['em_linha'], config['seed'], confronto, config['abertura'],
+                                  jogadas)
+        distintas = set()
+        for casas in jogadas:
+            if len(distintas) > LIMITE_DISTINTAS:
+                break
+            distintas.add(tuple(casas))
+        if config['gravar'] and jogadas:
+            matriz = np.zeros((len(jogadas), 9), dtype=np.int8)
+            for numero, casas in enumerate(jogadas):
+                matriz[numero, :len(casas)] = casas
+            registros = empacotar(matriz, [len(casas) for casas in jogadas]).tobytes()
+    return confronto, contagem, registros, distintas
+
+
+def intervalo_pontuacao(vitorias, empates, derrotas):
+    """
+    Pontuação média (vitória 1, empate 0.5) com intervalo de confiança de 95%
+
+    Aproximação normal ajustada como a de Agresti-Coull: o centro e a variância do
+    intervalo contam z²/2 vitórias e z²/2 derrotas a mais que as observadas. Assim
+    confrontos em que todas as partidas terminam igual (só empates, só vitórias) não
+    recebem um intervalo de largura zero.
+
+    Returns:
+        tuple: (pontuacao, inferior, superior)
+    """
+    partidas = vitorias + empates + derrotas
+    if partidas == 0:
+        return 0.5, 0.0, 1.0
+    pontuacao = (vitorias + 0.5 * empates) / partidas
+    extra = Z_95 ** 2 / 2
+    vitorias_ajustadas, derrotas_ajustadas = vitorias + extra, derrotas + extra
+    ajustadas = partidas + 2 * extra
+    centro = (vitorias_ajustadas + 0.5 * empates) / ajustadas
+    variancia = (vitorias_ajustadas * (1 - centro) ** 2 + empates * (0.5 - centro) ** 2
+                 + derrotas_ajustadas * centro ** 2) / ajustadas
+    margem = Z_95 * math.sqrt(variancia / ajustadas)
+    return pontuacao, max(0.0, centro - margem), min(1.0, centro + margem)
+
+
+def diferenca_elo(pontuacao, partidas):
+    """
+    Diferença de Elo que explica a pontuação média
+
+    Pontuações de 0 ou 1 são trazidas para meia partida dentro do intervalo, para que
+    confrontos sem nenhuma derrota (ou vitória) tenham um valor finito.
+
+    Args:
+        pontuacao (float): Pontuação média entre 0 e 1
+        partidas (int): Número de partidas da pontuação
+
+    Returns:
+        float: Diferença de Elo a favor do jogador pontuado
+    """
+    margem = 0.5 / max(partidas, 1)
+    pontuacao = min(max(pontuacao, margem), 1 - margem)
+    # + 0.0 evita exibir -0 em confrontos equilibrados
+    return -400.0 * math.log10(1.0 / pontuacao - 1.0) + 0.0
+
+
+def ratings_elo(nomes, confrontos, iteracoes=500):
+    """
+    Ratings de Elo de todos os jogadores a partir dos confrontos (modelo de Bradley-Terry)
+
+    Cada empate vale meia vitória para cada lado e todo par recebe um empate fictício,
+    para que jogadores invictos tenham rating finito. A média dos ratings é 0.
+
+    Args:
+        nomes (list): Nomes dos jogadores
+        confrontos (list): Dicionários com 'a', 'b' (índices), 'vitorias', 'empates', 'derrotas'
+        iteracoes (int): Iterações do ajuste
+
+    Returns:
+        list: Rating de cada jogador, na ordem de nomes
+    """
+    n = len(nomes)
+    pontos = [0.0] * n
+    partidas = [[0.0] * n for _ in range(n)]
+    for confronto in confrontos:
+        a, b = confronto['a'], confronto['b']
+        total = confronto['vitorias'] + confronto['empates'] + confronto['derrotas'] + 1
+        pontos[a] += confronto['vitorias'] + 0.5 * confronto['empates'] + 0.5
+        pontos[b] += confronto['derrotas'] + 0.5 * confronto['empates'] + 0.5
+        partidas[a][b] += total
+        partidas[b][a] += total
+
+    forcas = [1.0] * n
+    for _ in range(iteracoes):
+        for i in range(n):
+            denominador = sum(partidas[i][j] / (forcas[i] + forcas[j]) for j in range(n) if partidas[i][j])
+            if denominador:
+                forcas[i] = pontos[i] / denominador
+        media_log = sum(math.log(forca) for forca in forcas) / n
+        forcas = [forca / math.exp(media_log) for forca in forcas]
+    return [400.0 * math.log10(forca) for forca in forcas]
+
+
+def disputar(especificacoes, partidas=10000, processos=None, tamanho=3, em_linha=3, seed=0,
+             abertura=0, tabela_solver=None, trajetorias=None):
+    """
+    Torneio todos contra todos: `partidas` partidas em cada par de jogadores
+
+    Args:
+        especificacoes (list): Descrições dos jogadores (ver criar_jogador), ao menos duas
+        partidas (int): Partidas por confronto; o início alterna entre os dois jogadores
+        processos (int or None): Processos de trabalho; None usa os.cpu_count(), 1 joga aqui
+        tamanho (int): Número de linhas e colunas do tabuleiro
+        em_linha (int): Peças seguidas necessárias para vencer
+        seed (int): Semente da arena
+        abertura (int): Jogadas iniciais sorteadas em cada partida (variedade entre
+            jogadores determinísticos)
+        tabela_solver (str or None): Tabela de transposição para o jogador 'perfeito'
+        trajetorias (str or None): Se informado, acrescenta todas as partidas a esse
+            registro de trajetórias (ver jogo.trajetorias; só 3x3), na ordem em que os
+            blocos terminam
+
+    Returns:
+        dict: 'jogadores', 'confrontos' (vitórias, empates e derrotas do primeiro jogador,
+            separadas também por cor, com pontuação, intervalo, Elo e o número de sequências
+            de jogadas distintas, contado até LIMITE_DISTINTAS) e 'ratings'
+    """
+    global _jogadores
+    if len(especificacoes) < 2:
+        raise ValueError("A arena precisa de pelo menos dois jogadores")
+    if partidas <= 0:
+        raise ValueError("O número de partidas deve ser positivo")
+    if processos is None:
+        processos = os.cpu_count() or 1
+    if trajetorias is not None and (tamanho, em_linha) != (3, 3):
+        raise ValueError("O registro de trajetórias só existe para o tabuleiro 3x3")
+    if trajetorias is not None and np is None:
+        raise ValueError("O registro de trajetórias requer NumPy")
+
+    # Valida as descrições antes de abrir processos e decide quais confrontos rodam em lote
+    jogadores = [criar_jogador(especificacao, tamanho, em_linha, tabela_solver)
+                 for especificacao in especificacoes]
+    config = {'tamanho': tamanho, 'em_linha': em_linha, 'seed': seed, 'abertura': abertura,
+              'gravar': trajetorias is not None}
+    pares = [(i, j) for i in range(len(jogadores)) for j in range(i + 1, len(jogadores))]
+    tarefas = []
+    for confronto, (i, j) in enumerate(pares):
+        em_lote = jogadores[i].em_lote and jogadores[j].em_lote
+        bloco = PARTIDAS_POR_BLOCO_LOTE if em_lote else PARTIDAS_POR_BLOCO
+        for inicio in range(0, partidas, bloco):
+            tarefas.append((confronto, i, j, inicio, min(bloco, partidas - inicio), em_lote, config))
+
+    contagens = [[0] * 5 for _ in pares]
+    distintas = [set() for _ in pares]
+
+    gravador = GravadorTrajetorias(trajetorias) if trajetorias is not None else None
+
+    def somar(resultados):
+        for confronto, contagem, registros, sequencias in resultados:
+            contagens[confronto] = [total + parcial for total, parcial in zip(contagens[confronto], contagem)]
+            if len(distintas[confronto]) <= LIMITE_DISTINTAS:
+                distintas[confronto] |= sequencias
+            if gravador is not None:
+                gravador.registrar_bytes(registros)
+
+    try:
+        if processos == 1:
+            _jogadores = jogadores
+            somar(map(_jogar_bloco, tarefas))
+        else:
+            argumentos = (especificacoes, tamanho, em_linha, tabela_solver)
+            with mp.Pool(min(processos, len(tarefas)), _inicializar_processo, argumentos) as pool:
+                somar(pool.imap_unordered(_jogar_bloco, tarefas))
+    finally:
+        if gravador is not None:
+            gravador.fechar()
+
+    confrontos = []
+    for (i, j), (a_x, a_o, empates, b_x, b_o), sequencias in zip(pares, contagens, distintas):
+        vitorias, derrotas = a_x + a_o, b_x + b_o
+        pontuacao, inferior, superior = intervalo_pontuacao(vitorias, empates, derrotas)
+        total = vitorias + empates + derrotas
+        confrontos.append({
+            'a': i, 'b': j,
+            'partidas': total,
+            'partidas_distintas': min(len(sequencias), LIMITE_DISTINTAS),
+            'vitorias': vitorias, 'empates': empates, 'derrotas': derrotas,
+            'vitorias_como_x': a_x, 'vitorias_como_o': a_o,
+            'derrotas_como_x': b_o, 'derrotas_como_o': b_x,
+            'pontuacao': pontuacao,
+            'intervalo': [inferior, superior],
+            'elo': diferenca_elo(pontuacao, total),
+            'intervalo_elo': [diferenca_elo(inferior, total), diferenca_elo(superior, total)],
+        })
+    return {
+        'jogadores': list(especificacoes),
+        'partidas_por_confronto': partidas,
+        'seed': seed,
+        'abertura': abertura,
+        'confrontos': confrontos,
+        'ratings': ratings_elo(especificacoes, confrontos),
+    }
+
+
+def formatar_resultado(resultado):
+    """
+    Args:
+        resultado (dict): Retorno de disputar
+
+    Returns:
+        str: Tabela dos confrontos seguida dos ratings
+    """
+    nomes = resultado['jogadores']
+    largura = max(len(nome) for nome in nomes)
+    linhas = [f"{'jogador A':<{largura}}  {'jogador B':<{largura}}  {'partidas':>10}  "
+              f"{'V':>7}  {'E':>7}  {'D':>7}  {'pontos A (IC 95%)':>22}  {'Elo A-B (IC 95%)':>24}"]
+    for confronto in resultado['confrontos']:
+        inferior, superior = confronto['intervalo']
+        elo_inferior, elo_superior = confronto['intervalo_elo']
+        total = max(confronto['partidas'], 1)
+        linhas.append(
+            f"{nomes[confronto['a']]:<{largura}}  {nomes[confronto['b']]:<{largura}}  "
+            f"{confronto['partidas']:>10,}  {confronto['vitorias'] / total:>7.1%}  "
+            f"{confronto['empates'] / total:>7.1%}  {confronto['derrotas'] / total:>7.1%}  "
+            f"{confronto['pontuacao']:>7.1%} [{inferior:>6.1%}, {superior:>6.1%}]  "
+            f"{confronto['elo']:>+7.0f} [{elo_inferior:>+6.0f}, {elo_superior:>+6.0f}]"
+        )
+    for confronto in resultado['confrontos']:
+        distintas = confronto['partidas_distintas']
+        if distintas < LIMITE_DISTINTAS and distintas * 10 < confronto['partidas']:
+            linhas.append(
+                f"⚠️  {nomes[confronto['a']]} x {nomes[confronto['b']]}: só {distintas} partidas "
+                f"distintas em {confronto['partidas']:,}; o intervalo trata as repetições como "
+                f"independentes (use --abertura para variar as partidas)"
+            )
+    linhas.append('')
+    linhas.append('Ratings (média 0):')
+    for nome, rating in sorted(zip(nomes, resultado['ratings']), key=lambda item: -item[1]):
+        linhas.append(f"  {nome:<{largura}}  {rating:>+8.0f}")
+    return '\n'.join(linhas)
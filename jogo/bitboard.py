@@ -0,0 +1,429 @@
+"""
+Representação do tabuleiro em bitboards - duas máscaras de 9 bits, uma por jogador
+"""
+
+# Cada casa (linha, coluna) corresponde ao bit linha * 3 + coluna
+NUM_CASAS = 9
+MASCARA_CHEIA = (1 << NUM_CASAS) - 1
+
+# Número de bits ligados para cada uma das 512 máscaras possíveis
+POPCOUNT = tuple(bin(mascara).count('1') for mascara in range(1 << NUM_CASAS))
+
+# Casas (linha, coluna) correspondentes aos bits ligados de cada máscara
+CASAS_POR_MASCARA = tuple(
+    tuple(divmod(pos, 3) for pos in range(NUM_CASAS) if mascara >> pos & 1)
+    for mascara in range(1 << NUM_CASAS)
+)
+
+# Valor em base 3 de cada máscara (bit i vale 3^i); o índice do tabuleiro é
+# BASE3[x] + 2 * BASE3[o], com 0 = vazio, 1 = X e 2 = O em cada dígito
+NUM_ESTADOS = 3 ** NUM_CASAS
+BASE3 = tuple(
+    sum(3 ** pos for pos in range(NUM_CASAS) if mascara >> pos & 1)
+    for mascara in range(1 << NUM_CASAS)
+)
+
+# Máscaras das 8 linhas vencedoras (3 linhas, 3 colunas e 2 diagonais)
+LINHAS_VITORIA = (
+    0b000000111, 0b000111000, 0b111000000,
+    0b001001001, 0b010010010, 0b100100100,
+    0b100010001, 0b001010100,
+)
+
+# Símbolos de uma linha do tabuleiro para cada par (bits de X, bits de O) de 3 bits
+_SIMBOLOS_LINHA = tuple(
+    tuple(
+        tuple('X' if bx >> j & 1 else 'O' if bo >> j & 1 else ' ' for j in range(3))
+        for bo in range(8)
+    )
+    for bx in range(8)
+)
+
+
+class BitBoard:
+    """Motor do tabuleiro baseado em duas máscaras inteiras (X e O)"""
+
+    __slots__ = ('x', 'o')
+
+    def __init__(self, x=0, o=0):
+        self.x = x
+        self.o = o
+
+    def limpar(self):
+        """Remove todas as peças do tabuleiro"""
+        self.x = 0
+        self.o = 0
+
+    def jogar(self, pos, jogador):
+        """
+        Coloca a peça do jogador na casa indicada (sem validação)
+
+        Args:
+            pos (int): Índice da casa (0-8)
+            jogador (str): Símbolo do jogador ('X' ou 'O')
+        """
+        if jogador == 'X':
+            self.x |= 1 << pos
+        else:
+            self.o |= 1 << pos
+
+    def desfazer(self, pos):
+        """
+        Remove a peça que estiver na casa indicada
+
+        Args:
+            pos (int): Índice da casa (0-8)
+        """
+        bit = ~(1 << pos)
+        self.x &= bit
+        self.o &= bit
+
+    def ocupadas(self):
+        """
+        Returns:
+            int: Máscara das casas ocupadas
+        """
+        return self.x | self.o
+
+    def vazias(self):
+        """
+        Returns:
+            int: Máscara das casas vazias
+        """
+        return ~(self.x | self.o) & MASCARA_CHEIA
+
+    def casa_vazia(self, pos):
+        """
+        Args:
+            pos (int): Índice da casa (0-8)
+
+        Returns:
+            bool: True se a casa está vazia
+        """
+        return not (self.x | self.o) >> pos & 1
+
+    def simbolo(self, pos):
+        """
+        Args:
+            pos (int): Índice da casa (0-8)
+
+        Returns:
+            str: 'X', 'O' ou ' '
+        """
+        if self.x >> pos & 1:
+            return 'X'
+        if self.o >> pos & 1:
+            return 'O'
+        return ' '
+
+    def num_jogadas(self):
+        """
+        Returns:
+            int: Número de peças no tabuleiro
+        """
+        return POPCOUNT[self.x | self.o]
+
+    def esta_cheio(self):
+        """
+        Returns:
+            bool: True se todas as casas estão ocupadas
+        """
+        return POPCOUNT[self.x | self.o] == NUM_CASAS
+
+    def posicoes_vazias(self):
+        """
+        Returns:
+            tuple: Tuplas (linha, coluna) das casas vazias, em ordem
+        """
+        return CASAS_POR_MASCARA[~(self.x | self.o) & MASCARA_CHEIA]
+
+    def indice(self):
+        """
+        Codifica o tabuleiro como um inteiro em base 3
+
+        Returns:
+            int: Índice do estado (0 a 3^9 - 1)
+        """
+        return BASE3[self.x] + 2 * BASE3[self.o]
+
+    def chave_compacta(self):
+        """
+        Chave inteira do estado, válida para qualquer tamanho de tabuleiro
+
+        Returns:
+            int: Índice em base 3 (no 3x3, o inteiro mais compacto possível)
+        """
+        return BASE3[self.x] + 2 * BASE3[self.o]
+
+    def copiar(self):
+        """
+        Returns:
+            BitBoard: Cópia independente do tabuleiro
+        """
+        return BitBoard(self.x, self.o)
+
+    def para_matriz(self):
+        """
+        Converte as máscaras para a matriz 3x3 de símbolos
+
+        Returns:
+            list: Matriz 3x3 com 'X', 'O' ou ' '
+        """
+        x, o = self.x, self.o
+        return [
+            list(_SIMBOLOS_LINHA[x & 7][o & 7]),
+            list(_SIMBOLOS_LINHA[x >> 3 & 7][o >> 3 & 7]),
+            list(_SIMBOLOS_LINHA[x >> 6][o >> 6]),
+        ]
+
+    def chave(self):
+        """
+        Representação string do estado, igual à da matriz concatenada
+
+        Returns:
+            str: 9 caracteres com 'X', 'O' ou ' '
+        """
+        x, o = self.x, self.o
+        return (''.join(_SIMBOLOS_LINHA[x & 7][o & 7])
+                + ''.join(_SIMBOLOS_LINHA[x >> 3 & 7][o >> 3 & 7])
+                + ''.join(_SIMBOLOS_LINHA[x >> 6][o >> 6]))
+
+    def vencedor(self):
+        """
+        Verifica as linhas vencedoras nas máscaras dos jogadores
+
+        Returns:
+            str or None: 'X', 'O' ou None se não há vencedor
+        """
+        x, o = self.x, self.o
+        for linha in LINHAS_VITORIA:
+            if x & linha == linha:
+                return 'X'
+            if o & linha == linha:
+                return 'O'
+        return None
+
+    @classmethod
+    def de_indice(cls, indice):
+        """
+        Cria um BitBoard a partir da codificação em base 3
+
+        Args:
+            indice (int): Índice do estado (0 a 3^9 - 1)
+
+        Returns:
+            BitBoard: Tabuleiro equivalente
+        """
+        x = o = 0
+        for pos in range(NUM_CASAS):
+            indice, digito = divmod(indice, 3)
+            if digito == 1:
+                x |= 1 << pos
+            elif digito == 2:
+                o |= 1 << pos
+        return cls(x, o)
+
+    @classmethod
+    def de_matriz(cls, matriz):
+        """
+        Cria um BitBoard a partir de uma matriz 3x3 de símbolos
+
+        Args:
+            matriz (list): Matriz 3x3 com 'X', 'O' ou ' '
+
+        Returns:
+            BitBoard: Tabuleiro equivalente
+        """
+        x = o = 0
+        for i in range(3):
+            for j in range(3):
+                valor = matriz[i][j]
+                if valor == 'X':
+                    x |= 1 << (i * 3 + j)
+                elif valor == 'O':
+                    o |= 1 << (i * 3 + j)
+        return cls(x, o)
+
+
+class Geometria:
+    """Tamanho N, comprimento k da sequência vencedora e as linhas pré-calculadas de um tabuleiro NxN"""
+
+    def __init__(self, tamanho, em_linha):
+        """
+        Args:
+            tamanho (int): Número de linhas e colunas
+            em_linha (int): Peças seguidas necessárias para vencer
+        """
+        self.tamanho = tamanho
+        self.em_linha = em_linha
+        self.num_casas = tamanho * tamanho
+        self.mascara_cheia = (1 << self.num_casas) - 1
+        self.padrao = (tamanho, em_linha) == (3, 3)
+        # (linha, coluna) de cada casa, para converter bits em coordenadas sem divisões
+        self.casas = tuple(divmod(pos, tamanho) for pos in range(self.num_casas))
+
+        # Todos os segmentos de k casas em horizontal, vertical e nas duas diagonais
+        linhas = []
+        for linha in range(tamanho):
+            for coluna in range(tamanho):
+                for d_linha, d_coluna in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                    fim_linha = linha + d_linha * (em_linha - 1)
+                    fim_coluna = coluna + d_coluna * (em_linha - 1)
+                    if 0 <= fim_linha < tamanho and 0 <= fim_coluna < tamanho:
+                        linhas.append(sum(
+                            1 << ((linha + d_linha * i) * tamanho + coluna + d_coluna * i)
+                            for i in range(em_linha)
+                        ))
+        self.linhas = LINHAS_VITORIA if self.padrao else tuple(linhas)
+        self.linhas_por_casa = tuple(
+            tuple(i for i, mascara in enumerate(self.linhas) if mascara >> pos & 1)
+            for pos in range(self.num_casas)
+        )
+
+
+_GEOMETRIAS = {}
+
+
+def obter_geometria(tamanho=3, em_linha=3):
+    """
+    Geometria de um tabuleiro NxN com k em linha, construída uma vez por configuração
+
+    Args:
+        tamanho (int): Número de linhas e colunas (3 a 16)
+        em_linha (int): Peças seguidas necessárias para vencer (3 a tamanho)
+
+    Returns:
+        Geometria: Instância compartilhada para a configuração
+    """
+    chave = (tamanho, em_linha)
+    if chave not in _GEOMETRIAS:
+        if not 3 <= tamanho <= 16:
+            raise ValueError(f"Tamanho do tabuleiro deve estar entre 3 e 16 (recebido {tamanho})")
+        if not 3 <= em_linha <= tamanho:
+            raise ValueError(f"Sequência para vencer deve estar entre 3 e {tamanho} (recebido {em_linha})")
+        _GEOMETRIAS[chave] = Geometria(tamanho, em_linha)
+    return _GEOMETRIAS[chave]
+
+
+class BitBoardN(BitBoard):
+    """BitBoard de um tabuleiro NxN qualquer (bit = linha * N + coluna)"""
+
+    __slots__ = ('geometria',)
+
+    def __init__(self, geometria, x=0, o=0):
+        self.geometria = geometria
+        self.x = x
+        self.o = o
+
+    def vazias(self):
+        return ~(self.x | self.o) & self.geometria.mascara_cheia
+
+    def num_jogadas(self):
+        return bin(self.x | self.o).count('1')
+
+    def esta_cheio(self):
+        return self.x | self.o == self.geometria.mascara_cheia
+
+    def posicoes_vazias(self):
+        casas = self.geometria.casas
+        vazias = ~(self.x | self.o) & self.geometria.mascara_cheia
+        posicoes = []
+        while vazias:
+            menor = vazias & -vazias
+            posicoes.append(casas[menor.bit_length() - 1])
+            vazias ^= menor
+        return tuple(posicoes)
+
+    def indice(self):
+        """
+        Returns:
+            int: O mesmo que chave_compacta() (não há índice em base 3 fora do 3x3)
+        """
+        return self.chave_compacta()
+
+    def chave_compacta(self):
+        """
+        Chave inteira do estado: máscara de X nos N² bits baixos e de O nos N² seguintes
+
+        Returns:
+            int: Chave de 2 * N² bits
+        """
+        return self.x | self.o << self.geometria.num_casas
+
+    def copiar(self):
+        return BitBoardN(self.geometria, self.x, self.o)
+
+    def para_matriz(self):
+        tamanho = self.geometria.tamanho
+        return [[self.simbolo(i * tamanho + j) for j in range(tamanho)] for i in range(tamanho)]
+
+    def chave(self):
+        return ''.join(self.simbolo(pos) for pos in range(self.geometria.num_casas))
+
+    def vencedor(self):
+        x, o = self.x, self.o
+        for linha in self.geometria.linhas:
+            if x & linha == linha:
+                return 'X'
+            if o & linha == linha:
+                return 'O'
+        return None
+
+    @classmethod
+    def de_chave(cls, geometria, chave):
+        """
+        Args:
+            geometria (Geometria): Geometria do tabuleiro
+            chave (int): Chave gerada por chave_compacta()
+
+        Returns:
+            BitBoardN: Tabuleiro equivalente
+        """
+        return cls(geometria, chave & geometria.mascara_cheia, chave >> geometria.num_casas)
+
+    @classmethod
+    def de_matriz(cls, matriz, geometria=None):
+        """
+        Args:
+            matriz (list): Matriz NxN com 'X', 'O' ou ' '
+            geometria (Geometria or None): Geometria do tabuleiro; None usa N = len(matriz)
+                e k = N
+
+        Returns:
+            BitBoardN: Tabuleiro equivalente
+        """
+        if geometria is None:
+            geometria = obter_geometria(len(matriz), len(matriz))
+        tamanho = geometria.tamanho
+        x = o = 0
+        for i in range(tamanho):
+            for j in range(tamanho):
+                valor = matriz[i][j]
+                if valor == 'X':
+                    x |= 1 << (i * tamanho + j)
+                elif valor == 'O':
+                    o |= 1 << (i * tamanho + j)
+        return cls(geometria, x, o)
+
+
+def como_bitboard(tabuleiro, geometria=None):
+    """
+    Aceita matriz, BitBoard ou chave inteira e devolve um BitBoard
+
+    Args:
+        tabuleiro (list, BitBoard or int): Tabuleiro em qualquer das representações
+        geometria (Geometria or None): Geometria do tabuleiro; None ou 3x3 usa o BitBoard
+            padrão (chave inteira = índice em base 3)
+
+    Returns:
+        BitBoard: O próprio BitBoard recebido ou um novo equivalente
+    """
+    if isinstance(tabuleiro, BitBoard):
+        return tabuleiro
+    if geometria is not None and not geometria.padrao:
+        if isinstance(tabuleiro, int):
+            return BitBoardN.de_chave(geometria, tabuleiro)
+        return BitBoardN.de_matriz(tabuleiro, geometria)
+    if isinstance(tabuleiro, int):
+        return BitBoard.de_indice(tabuleiro)
+    return BitBoard.de_matriz(tabuleiro)
@@ -0,0 +1,341 @@
+"""
+Checkpoints de treino - estado completo gravado periodicamente para retomar um treino interrompido
+
+Layout da pasta:
+
+    estado.pkl      episódio, epsilon, totais, estado do gerador `random`, do ambiente
+                    vetorizado e dos relatórios de progresso e convergência, além da lista
+                    de arquivos que compõem a Q-table
+    q-000000.qtab   Q-table completa (formato binário de agente.formato_modelo)
+    q-000001.qtab   só as linhas alteradas desde o checkpoint anterior (esparso)
+    ...
+
+A Q-table do checkpoint é a primeira tabela da lista com as seguintes aplicadas por cima,
+em ordem. Cada arquivo é escrito num temporário e renomeado, e estado.pkl é sempre o
+último: um treino morto no meio de um checkpoint deixa o anterior intacto. Quando as
+linhas alteradas acumuladas passam das linhas da tabela completa, ela é regravada e as
+diferenças antigas são apagadas. No backend 'dict' as tabelas são arquivos .pkl com os
+estados alterados.
+"""
+
+import os
+import pickle
+import random
+import re
+import time
+from collections import defaultdict
+
+try:
+    import numpy as np
+except ImportError:  # Sem NumPy só o backend 'dict' existe
+    np = None
+
+from agente import formato_modelo
+from utils.arquivos import escrita_atomica
+
+ARQUIVO_ESTADO = 'estado.pkl'
+VERSAO = 1
+
+# Arquivos de tabela e temporários de escrita_atomica que pertencem ao checkpoint
+_ARQUIVO_TABELA = re.compile(r'q-\d{6}\.(qtab|pkl)$')
+_TEMPORARIO = re.compile(r'\.(q-\d{6}\.(qtab|pkl)|estado\.pkl)\..*\.tmp$')
+
+
+class CheckpointTreino:
+    """
+    Grava o estado do treino a cada `intervalo` episódios (ou `segundos`) e o restaura
+
+    Os laços de treino chamam o objeto após cada episódio ou lote, como
+    checkpoint(concluidos, totais, ambiente); ele grava quando o intervalo venceu, no
+    último episódio e depois de interromper() (por exemplo, num SIGTERM), e devolve True
+    nesse último caso para que o treino pare. Retomado com os mesmos parâmetros, o treino
+    segue do último checkpoint como se não tivesse parado: mesma Q-table, epsilon,
+    sorteios e partidas em andamento. A exceção é o treino paralelo, cujos atores
+    recomeçam as partidas com sementes novas.
+    """
+
+    def __init__(self, pasta, intervalo=100000, segundos=None, retomar=False):
+        """
+        Args:
+            pasta (str): Pasta dos arquivos do checkpoint
+            intervalo (int or None): Episódios entre checkpoints
+            segundos (float or None): Segundos máximos entre checkpoints
+            retomar (bool): Se a pasta já tem um checkpoint, continua dele; sem checkpoint
+                o treino começa do zero
+        """
+        if intervalo is not None and intervalo <= 0:
+            raise ValueError("intervalo deve ser positivo")
+        if segundos is not None and segundos <= 0:
+            raise ValueError("segundos deve ser positivo")
+        self.pasta = pasta
+        self.intervalo = intervalo
+        self.segundos = segundos
+        self.retomar = retomar
+        self.retomado = False
+        self.interrompido = False
+        self.episodio = 0
+        self.totais = [0, 0, 0]
+        self.gravacoes = 0
+        self.agente = None
+
+        self._estado_ambiente = None
+        # Arquivos da Q-table do último checkpoint: a completa seguida das diferenças
+        self._arquivos = []
+        self._numero = 0
+        self._linhas_completa = 0
+        self._linhas_diferencas = 0
+        # Tabela do último checkpoint, comparada com a atual para achar as linhas alteradas
+        self._anterior = None
+
+    @property
+    def caminho_estado(self):
+        return os.path.join(self.pasta, ARQUIVO_ESTADO)
+
+    def iniciar(self, agente, num_episodios, config, participantes=None, gravador=None):
+        """
+        Liga o checkpoint a um treino e, com retomar, restaura o último estado gravado
+
+        Args:
+            agente (QLearningAgent): Agente em treino
+            num_episodios (int): Total de episódios do treino (pode crescer ao retomar)
+            config (dict): Parâmetros que precisam ser iguais ao retomar (modo, alpha, ...)
+            participantes (dict or None): Objetos com estado_checkpoint() e
+                restaurar_checkpoint(estado), por nome (relatório de progresso, critério
+                de convergência)
+            gravador (GravadorTrajetorias or None): Registro de trajetórias do treino;
+                ao retomar, as partidas gravadas depois do checkpoint são descartadas
+
+        Returns:
+            bool: True se um checkpoint foi retomado
+
+        Raises:
+            ValueError: A pasta já tem um checkpoint e retomar é False, ou ele foi gravado
+                com outros parâmetros
+        """
+        self.agente = agente
+        self.num_episodios = num_episodios
+        self.config = dict(config)
+        self.participantes = participantes or {}
+        self.gravador = gravador
+
+        os.makedirs(self.pasta, exist_ok=True)
+        if os.path.exists(self.caminho_estado):
+            if not self.retomar:
+                raise ValueError(f"Já existe um checkpoint em {self.pasta}; retome-o ou use outra pasta")
+            self._restaurar()
+            self.retomado = True
+
+        agora = time.monotonic()
+        self._proximo_episodio = self.episodio + self.intervalo if self.intervalo else None
+        self._proximo_tempo = agora + self.segundos if self.segundos else None
+        return self.retomado
+
+    def interromper(self):
+        """Pede um checkpoint e o fim do treino ao final do episódio ou lote atual"""
+        self.interrompido = True
+
+    def restaurar_ambiente(self, ambiente):
+        """
+        Devolve ao ambiente vetorizado as partidas em andamento e o gerador do checkpoint
+
+        Args:
+            ambiente (AmbienteVetorizado): Ambiente recém-criado do treino retomado
+        """
+        if self._estado_ambiente is not None:
+            ambiente.restaurar(self._estado_ambiente)
+            self._estado_ambiente = None
+
+    def __call__(self, concluidos, totais=None, ambiente=None):
+        """
+        Grava um checkpoint se ele venceu
+
+        Args:
+            concluidos (int): Total de episódios concluídos até agora
+            totais (list or None): (vitorias_x, vitorias_o, empates) acumulados pelo laço
+            ambiente (AmbienteVetorizado or None): Ambiente com as partidas em andamento
+
+        Returns:
+            bool: True se o treino foi interrompido e deve parar
+        """
+        if (self.interrompido or concluidos >= self.num_episodios
+                or (self._proximo_episodio is not None and concluidos >= self._proximo_episodio)
+                or (self._proximo_tempo is not None and time.monotonic() >= self._proximo_tempo)):
+            self.salvar(concluidos, totais, ambiente)
+        return self.interrompido
+
+    def salvar(self, concluidos, totais=None, ambiente=None, estado_ambiente=None):
+        """
+        Grava um checkpoint agora (ver __call__)
+
+        Args:
+            concluidos (int): Total de episódios concluídos até agora
+            totais (list or None): (vitorias_x, vitorias_o, empates) acumulados pelo laço
+            ambiente (AmbienteVetorizado or None): Ambiente com as partidas em andamento
+            estado_ambiente (dict or None): Estado já copiado do ambiente (ver
+                AmbienteVetorizado.estado), gravado no lugar do atual
+        """
+        if estado_ambiente is None and ambiente is not None:
+            estado_ambiente = ambiente.estado()
+        tamanho_trajetorias = None
+        if self.gravador is not None:
+            tamanho_trajetorias = self.gravador.tamanho()
+
+        atual, arquivos, linhas_completa, linhas_diferencas = self._gravar_tabela()
+        estado = {
+            'versao': VERSAO,
+            'config': self.config,
+            'episodio': concluidos,
+            'epsilon': self.agente.epsilon,
+            'totais': list(totais) if totais is not None else [0, 0, 0],
+            'random': random.getstate(),
+            'ambiente': estado_ambiente,
+            'participantes': {
+                nome: participante.estado_checkpoint()
+                for nome, participante in self.participantes.items()
+            },
+            'trajetorias': tamanho_trajetorias,
+            'tabela': arquivos,
+            'numero': self._numero,
+            'linhas': (linhas_completa, linhas_diferencas),
+        }
+        with escrita_atomica(self.caminho_estado) as f:
+            pickle.dump(estado, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+        self._arquivos = arquivos
+        self._linhas_completa = linhas_completa
+        self._linhas_diferencas = linhas_diferencas
+        self._anterior = atual
+        self._remover_sobras()
+        self.episodio = concluidos
+        self.gravacoes += 1
+        if self.intervalo:
+            self._proximo_episodio = concluidos + self.intervalo
+        if self.segundos:
+            self._proximo_tempo = time.monotonic() + self.segundos
+
+    def _copiar_tabela(self):
+        """Cópia da Q-table em valores reais"""
+        agente = self.agente
+        if agente.backend == 'numpy':
+            return np.asarray(agente.q_table, dtype=np.float32) * np.float32(agente.escala_q)
+        return {chave: dict(acoes) for chave, acoes in agente.q_table.items()}
+
+    def _gravar_tabela(self):
+        """
+        Grava a Q-table completa ou só as linhas alteradas desde o último checkpoint
+
+        Returns:
+            tuple: (tabela copiada, arquivos da tabela, linhas da completa, linhas das diferenças)
+        """
+        atual = self._copiar_tabela()
+        numpy = self.agente.backend == 'numpy'
+        anterior = self._anterior
+
+        completa = anterior is None
+        if not completa:
+            if numpy:
+                alteradas = np.flatnonzero(np.any(atual != anterior, axis=1))
+            else:
+                alteradas = [chave for chave, acoes in atual.items() if anterior.get(chave) != acoes]
+            if not len(alteradas):
+                return atual, self._arquivos, self._linhas_completa, self._linhas_diferencas
+            # Diferenças que já somam mais que a tabela completa: regrava a completa
+            completa = self._linhas_diferencas + len(alteradas) > self._linhas_completa
+
+        nome = f"q-{self._numero:06d}." + ('qtab' if numpy else 'pkl')
+        with escrita_atomica(os.path.join(self.pasta, nome)) as f:
+            if numpy and completa:
+                formato_modelo.salvar_tabela(f, atual, esparso=None, simetria=self.agente.simetria)
+            elif numpy:
+                formato_modelo.salvar_tabela(f, atual, simetria=self.agente.simetria, linhas=alteradas)
+            elif completa:
+                pickle.dump(atual, f, protocol=pickle.HIGHEST_PROTOCOL)
+            else:
+                pickle.dump({chave: atual[chave] for chave in alteradas}, f,
+                            protocol=pickle.HIGHEST_PROTOCOL)
+        self._numero += 1
+
+        if completa:
+            linhas = int(np.count_nonzero(np.any(atual != 0, axis=1))) if numpy else len(atual)
+            return atual, [nome], linhas, 0
+        return atual, self._arquivos + [nome], self._linhas_completa, self._linhas_diferencas + len(alteradas)
+
+    def _carregar_tabela(self, arquivos):
+        """Monta a Q-table a partir da completa e das diferenças e a entrega ao agente"""
+        agente = self.agente
+        if agente.backend == 'numpy':
+            tabela = np.zeros(agente.q_table.shape, dtype=np.float32)
+            for nome in arquivos:
+                modelo = formato_modelo.ModeloMapeado(os.path.join(self.pasta, nome), modo='r')
+                if modelo.esparso:
+                    tabela[modelo.indices] = modelo.valores
+                else:
+                    tabela[:] = modelo.valores
+            agente.escala_q = 1.0
+            agente._converter_antes_de_gravar = False
+        else:
+            tabela = defaultdict(lambda: defaultdict(float))
+            for nome in arquivos:
+                with open(os.path.join(self.pasta, nome), 'rb') as f:
+                    for chave, acoes in pickle.load(f).items():
+                        tabela[chave] = defaultdict(float, acoes)
+        agente.q_table = tabela
+        agente._snapshot = None
+
+    def _restaurar(self):
+        """Lê estado.pkl e devolve agente, geradores e participantes ao ponto gravado"""
+        with open(self.caminho_estado, 'rb') as f:
+            estado = pickle.load(f)
+        if not isinstance(estado, dict) or estado.get('versao') != VERSAO:
+            raise formato_modelo.FormatoInvalido(f"Checkpoint em formato não suportado: {self.caminho_estado}")
+
+        gravado = estado['config']
+        diferentes = sorted(
+            chave for chave in gravado.keys() | self.config.keys()
+            if gravado.get(chave) != self.config.get(chave)
+        )
+        if diferentes:
+            detalhes = ", ".join(
+                f"{chave}={gravado.get(chave)!r} (agora {self.config.get(chave)!r})" for chave in diferentes
+            )
+            raise ValueError(f"O checkpoint em {self.pasta} foi gravado com outros parâmetros: {detalhes}")
+
+        self._carregar_tabela(estado['tabela'])
+        self.agente.epsilon = estado['epsilon']
+        random.setstate(estado['random'])
+        self.episodio = estado['episodio']
+        self.totais = list(estado['totais'])
+        self._estado_ambiente = estado['ambiente']
+        for nome, participante in self.participantes.items():
+            if nome in estado['participantes']:
+                participante.restaurar_checkpoint(estado['participantes'][nome])
+        if self.gravador is not None and estado['trajetorias'] is not None:
+            self.gravador.truncar(estado['trajetorias'])
+
+        self._arquivos = list(estado['tabela'])
+        self._numero = estado['numero']
+        self._linhas_completa, self._linhas_diferencas = estado['linhas']
+        self._anterior = self._copiar_tabela()
+
+    def _remover_sobras(self):
+        """Apaga tabelas que saíram da lista e temporários de gravações interrompidas"""
+        em_uso = set(self._arquivos)
+        for nome in os.listdir(self.pasta):
+            if (_ARQUIVO_TABELA.match(nome) and nome not in em_uso) or _TEMPORARIO.match(nome):
+                try:
+                    os.unlink(os.path.join(self.pasta, nome))
+                except OSError:
+                    pass
+
+    def resumo(self):
+        """
+        Returns:
+            dict: pasta, episodio do último checkpoint, gravacoes, retomado e interrompido
+        """
+        return {
+            'pasta': self.pasta,
+            'episodio': self.episodio,
+            'gravacoes': self.gravacoes,
+            'retomado': self.retomado,
+            'interrompido': self.interrompido,
+        }
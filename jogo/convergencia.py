@@ -0,0 +1,234 @@
+"""
+Parada por convergência - avaliação periódica da política gulosa durante o treino
+"""
+
+import random
+import time
+
+from agente.negamax import AgenteNegamax
+from jogo.bitboard import BitBoard
+from jogo.terminal import EM_ANDAMENTO, EMPATE, RESULTADOS, VITORIA_O, VITORIA_X
+
+try:
+    import numpy as np
+except ImportError:  # Sem NumPy a variação é medida sobre a Q-table de dicionários
+    np = None
+
+
+class CriterioConvergencia:
+    """
+    Decide quando o treino pode parar, chamado com o total de episódios concluídos
+
+    A cada intervalo de episódios, a política gulosa do agente joga contra um oponente
+    de referência (o solver perfeito) a partir de um conjunto fixo de posições que não
+    estão perdidas para quem joga, e a Q-table é comparada com a da verificação anterior.
+    O treino para quando a taxa de derrotas e a variação média dos valores Q ficam dentro
+    dos limites em `verificacoes` verificações seguidas.
+    """
+
+    def __init__(self, agente, referencia=None, intervalo=20000, num_posicoes=500,
+                 limite_derrotas=0.01, limite_variacao=0.05, verificacoes=3, seed=0):
+        """
+        Args:
+            agente (QLearningAgent): Agente em treino (tabuleiro 3x3)
+            referencia (AgenteNegamax or None): Oponente das avaliações; None cria um solver
+            intervalo (int): Episódios entre verificações
+            num_posicoes (int or None): Posições iniciais sorteadas entre as alcançáveis
+                não perdidas; None usa todas
+            limite_derrotas (float): Taxa de derrotas máxima para considerar convergido
+            limite_variacao (float): Variação média máxima de |Q| por entrada visitada
+                desde a verificação anterior. Com alpha e epsilon constantes a tabela nunca
+                fica parada: no 3x3 com os valores padrão ela se estabiliza perto de 0.03
+            verificacoes (int): Verificações seguidas dentro dos limites para parar
+            seed (int): Semente do sorteio das posições
+        """
+        if not agente.geometria.padrao:
+            raise ValueError("A parada por convergência só existe para o tabuleiro 3x3")
+        if intervalo <= 0 or verificacoes <= 0:
+            raise ValueError("intervalo e verificacoes devem ser positivos")
+        self.agente = agente
+        self.referencia = referencia if referencia is not None else AgenteNegamax()
+        self.intervalo = intervalo
+        self.limite_derrotas = limite_derrotas
+        self.limite_variacao = limite_variacao
+        self.verificacoes = verificacoes
+
+        # Posições em que quem joga ao menos empata com jogo perfeito
+        self.referencia.aquecer()
+        posicoes = [indice for indice in sorted(self.referencia.respostas)
+                    if RESULTADOS[indice] == EM_ANDAMENTO and self.referencia.valor(indice) >= 0]
+        if num_posicoes is not None and num_posicoes < len(posicoes):
+            posicoes = random.Random(seed).sample(posicoes, num_posicoes)
+        self.posicoes = posicoes
+
+        self.proxima = intervalo
+        self.seguidas = 0
+        self.convergiu = False
+        self.episodio_parada = None
+        # Uma entrada por verificação: episodios, taxa_derrotas, variacao_q, dentro, segundos
+        self.historico = []
+        self._tabela_anterior = None
+
+    def taxa_derrotas(self):
+        """
+        Joga a política gulosa contra a referência a partir de cada posição do conjunto
+
+        Returns:
+            float: Fração das partidas perdidas pelo agente
+        """
+        # Cópia congelada: consultar o backend 'dict' inseriria as posições novas na tabela
+        politica = self.agente.congelar()
+        referencia = self.referencia
+        derrotas = 0
+        for indice in self.posicoes:
+            bits = BitBoard.de_indice(indice)
+            jogador = 'X' if bits.num_jogadas() % 2 == 0 else 'O'
+            vitoria_agente = VITORIA_X if jogador == 'X' else VITORIA_O
+            vez_agente = True
+            resultado = EM_ANDAMENTO
+            while resultado == EM_ANDAMENTO:
+                jogada = (politica if vez_agente else referencia).choose_action(bits, training=False)
+                bits.jogar(jogada[0] * 3 + jogada[1], jogador)
+                resultado = RESULTADOS[bits.indice()]
+                jogador = 'O' if jogador == 'X' else 'X'
+                vez_agente = not vez_agente
+            if resultado != EMPATE and resultado != vitoria_agente:
+                derrotas += 1
+        return derrotas / max(len(self.posicoes), 1)
+
+    def _copiar_tabela(self):
+        """Cópia da Q-table em valores reais, para comparar na próxima verificação"""
+        agente = self.agente
+        if agente.backend == 'numpy':
+            return np.asarray(agente.q_table, dtype=np.float32) * np.float32(agente.escala_q)
+        return {chave: dict(acoes) for chave, acoes in agente.q_table.items()}
+
+    def variacao_q(self):
+        """
+        Variação média de Q(s, a) desde a verificação anterior, nas entradas já visitadas
+
+        Returns:
+            float: Média de |Q_atual - Q_anterior|; infinito na primeira verificação
+        """
+        anterior = self._tabela_anterior
+        atual = self._copiar_tabela()
+        self._tabela_anterior = atual
+        if anterior is None:
+            return float('inf')
+
+        if self.agente.backend == 'numpy':
+            visitadas = (atual != 0) | (anterior != 0)
+            if not visitadas.any():
+                return 0.0
+            return float(np.abs(atual - anterior)[visitadas].mean())
+
+        soma = 0.0
+        entradas = 0
+        for chave in atual.keys() | anterior.keys():
+            acoes_atuais = atual.get(chave, {})
+            acoes_anteriores = anterior.get(chave, {})
+            for acao in acoes_atuais.keys() | acoes_anteriores.keys():
+                soma += abs(acoes_atuais.get(acao, 0.0) - acoes_anteriores.get(acao, 0.0))
+                entradas += 1
+        return soma / entradas if entradas else 0.0
+
+    def __call__(self, concluidos):
+        """
+        Verifica a convergência quando um novo intervalo de episódios foi concluído
+
+        Args:
+            concluidos (int): Total de episódios concluídos até agora
+
+        Returns:
+            bool: True se o treino deve parar
+        """
+        if concluidos < self.proxima:
+            return False
+        # Treinos em lote podem cruzar várias marcas de uma vez; verifica-se uma só
+        while self.proxima <= concluidos:
+            self.proxima += self.intervalo
+
+        inicio = time.perf_counter()
+        derrotas = self.taxa_derrotas()
+        variacao = self.variacao_q()
+        dentro = derrotas <= self.limite_derrotas and variacao <= self.limite_variacao
+        self.seguidas = self.seguidas + 1 if dentro else 0
+        self.historico.append({
+            'episodios': concluidos,
+            'taxa_derrotas': derrotas,
+            'variacao_q': variacao,
+            'dentro': dentro,
+            'segundos': time.perf_counter() - inicio,
+        })
+        if self.seguidas >= self.verificacoes:
+            self.convergiu = True
+            self.episodio_parada = concluidos
+        return self.convergiu
+
+    def estado_checkpoint(self):
+        """
+        Estado para checkpoints de treino
+
+        A tabela da verificação anterior é guardada só onde difere da tabela atual do
+        agente, que o checkpoint já grava.
+
+        Returns:
+            dict: Contadores, histórico e diferenças da tabela anterior
+        """
+        anterior = self._tabela_anterior
+        diferencas = None
+        if anterior is not None and self.agente.backend == 'numpy':
+            linhas = np.flatnonzero(np.any(self._copiar_tabela() != anterior, axis=1))
+            diferencas = (linhas, anterior[linhas])
+        elif anterior is not None:
+            atual = self.agente.q_table
+            diferencas = (
+                [chave for chave in atual if chave not in anterior],
+                {chave: acoes for chave, acoes in anterior.items() if atual.get(chave) != acoes},
+            )
+        return {
+            'proxima': self.proxima,
+            'seguidas': self.seguidas,
+            'convergiu': self.convergiu,
+            'episodio_parada': self.episodio_parada,
+            'historico': list(self.historico),
+            'anterior': diferencas,
+        }
+
+    def restaurar_checkpoint(self, estado):
+        """
+        Volta ao ponto gravado; a tabela do agente já precisa estar restaurada
+
+        Args:
+            estado (dict): Estado devolvido por estado_checkpoint()
+        """
+        self.proxima = estado['proxima']
+        self.seguidas = estado['seguidas']
+        self.convergiu = estado['convergiu']
+        self.episodio_parada = estado['episodio_parada']
+        self.historico = list(estado['historico'])
+        diferencas = estado['anterior']
+        if diferencas is None:
+            self._tabela_anterior = None
+            return
+        anterior = self._copiar_tabela()
+        if self.agente.backend == 'numpy':
+            linhas, valores = diferencas
+            anterior[linhas] = valores
+        else:
+            novas, alteradas = diferencas
+            for chave in novas:
+                anterior.pop(chave, None)
+            anterior.update(alteradas)
+        self._tabela_anterior = anterior
+
+    def resumo(self):
+        """
+        Returns:
+            dict: convergiu, episodio_parada e historico das verificações
+        """
+        return {
+            'convergiu': self.convergiu,
+            'episodio_parada': self.episodio_parada,
+            'historico': list(self.historico),
+        }
@@ -3,21 +3,57 @@ Motor principal do jogo - Lógica de controle e fluxo do Jogo da Velha
 """
 
 import random
+import signal
+import threading
 import time
 import os
 
-from agente.qlearning import QLearningAgent
+from agente.cache_modelos import cache_padrao
+from agente.mcts import AgenteMCTS
+from agente.negamax import AgenteNegamax
+from agente.qlearning import LAMBDA_PADRAO, QLearningAgent
+from jogo.progresso import ProgressoPeriodico, ProgressoTela
 from jogo.tabuleiro import Tabuleiro
+from jogo.terminal import EM_ANDAMENTO, VENCEDOR_POR_RESULTADO
+from utils.tela import tela_padrao
 
 class JogoDaVelha:
     """Classe principal que controla a lógica do Jogo da Velha"""
     
-    def __init__(self):
-        self.tabuleiro = Tabuleiro()
+    def __init__(self, tamanho=3, em_linha=3):
+        """
+        Args:
+            tamanho (int): Número de linhas e colunas do tabuleiro
+            em_linha (int): Peças seguidas necessárias para vencer
+        """
+        self.tabuleiro = Tabuleiro(tamanho, em_linha)
+        self.padrao = self.tabuleiro.geometria.padrao
         self.jogador_atual = 'X'
         self.modo_jogo = None
-        self.agente_ia = QLearningAgent()
-        self.modelo_salvo = "modelos/qlearning_model.pkl"
+        # Simetrias e o backend 'numpy' só existem no 3x3
+        self.agente_ia = QLearningAgent(simetria=self.padrao, tamanho=tamanho, em_linha=em_linha)
+        # Com NumPy o modelo usa o formato binário mapeável; sem ele, pickle
+        if not self.padrao:
+            self.modelo_salvo = f"modelos/qlearning_model_{tamanho}x{tamanho}_k{em_linha}.pkl"
+        elif self.agente_ia.backend == 'numpy':
+            self.modelo_salvo = "modelos/qlearning_model.qtab"
+        else:
+            self.modelo_salvo = "modelos/qlearning_model.pkl"
+        # Jogada gulosa pré-calculada do modelo (PoliticaCompilada no 3x3, TabelaCongelada
+        # nos demais), refeita na primeira jogada depois de carregar outro modelo ou treinar
+        self.politica_ia = None
+        self._tabela_politica = None
+        # Opções repassadas para QLearningAgent.save_model (tipo_valor, esparso)
+        self.opcoes_modelo = {}
+        # Solver perfeito, criado na primeira partida contra ele
+        self.solver = None
+        self.tabela_solver = "modelos/negamax_tt.bin"
+        # Agente MCTS e seu orçamento por jogada (argumentos de AgenteMCTS)
+        self.agente_mcts = None
+        self.orcamento_mcts = {'iteracoes': None, 'tempo_limite': 1.0}
+        # Registro de trajetórias que recebe as partidas jogadas no menu (só 3x3)
+        self.gravador_partidas = None
+        self.jogadas_partida = []
         
         # Criar diretório de modelos se não existir
         os.makedirs("modelos", exist_ok=True)
@@ -29,26 +65,38 @@ class JogoDaVelha:
         Returns:
             str or None: Símbolo do vencedor ('X' ou 'O') ou None se não há vencedor
         """
-        matriz = self.tabuleiro.matriz
-        
-        # Verificar linhas
-        for linha in matriz:
-            if linha[0] == linha[1] == linha[2] != ' ':
-                return linha[0]
-        
-        # Verificar colunas
-        for col in range(3):
-            if matriz[0][col] == matriz[1][col] == matriz[2][col] != ' ':
-                return matriz[0][col]
+        # Leitura única na tabela de resultados pré-calculada
+        return VENCEDOR_POR_RESULTADO[self.tabuleiro.resultado()]
+    
+    def carregar_modelo(self):
+        """
+        Carrega o modelo salvo pelo cache, relendo o arquivo só se ele mudou
         
-        # Verificar diagonais
-        if matriz[0][0] == matriz[1][1] == matriz[2][2] != ' ':
-            return matriz[0][0]
+        Returns:
+            bool: True se há modelo carregado, False se o arquivo não existe
+        """
+        if not cache_padrao.carregar(self.agente_ia, self.modelo_salvo):
+            return False
+        if self.agente_ia.tabela_atual() is not self._tabela_politica:
+            self.politica_ia = None
+        return True
+    
+    def carregar_solver(self):
+        """
+        Prepara o solver perfeito, lendo a tabela de transposição salva
         
-        if matriz[0][2] == matriz[1][1] == matriz[2][0] != ' ':
-            return matriz[0][2]
+        Na primeira execução resolve todas as posições e grava a tabela, para que as
+        próximas partidas respondam sem busca desde a primeira jogada.
         
-        return None
+        Returns:
+            AgenteNegamax: Solver pronto para jogar
+        """
+        if self.solver is None:
+            self.solver = AgenteNegamax()
+            if not self.solver.load_model(self.tabela_solver):
+                self.solver.aquecer()
+                self.solver.save_model(self.tabela_solver)
+        return self.solver
     
     def trocar_jogador(self):
         """Alterna entre os jogadores X e O"""
@@ -58,6 +106,7 @@ class JogoDaVelha:
         """Reinicia o jogo para um novo round"""
         self.tabuleiro.limpar()
         self.jogador_atual = 'X'
+        self.jogadas_partida = []
     
     def jogada_computador_aleatoria(self):
         """
@@ -76,10 +125,44 @@ class JogoDaVelha:
         """
         Faz uma jogada usando o agente IA treinado
         
+        No 3x3 a jogada é uma leitura na política compilada do modelo (agente.politica).
+        
+        Returns:
+            tuple: (linha, coluna) da jogada ou (None, None) se não há jogadas possíveis
+        """
+        if self.politica_ia is None:
+            agente = self.agente_ia
+            self.politica_ia = agente.compilar() if self.padrao else agente.congelar()
+            self._tabela_politica = agente.tabela_atual()
+        acao = self.politica_ia.choose_action(self.tabuleiro.bits)
+        if acao:
+            return acao[0], acao[1]
+        return None, None
+    
+    def jogada_perfeita(self):
+        """
+        Faz a jogada ótima calculada pelo solver negamax
+        
+        Returns:
+            tuple: (linha, coluna) da jogada ou (None, None) se não há jogadas possíveis
+        """
+        acao = self.carregar_solver().choose_action(self.tabuleiro.bits)
+        if acao:
+            return acao[0], acao[1]
+        return None, None
+    
+    def jogada_mcts(self):
+        """
+        Faz uma jogada com o agente MCTS, reaproveitando a árvore da jogada anterior
+        
         Returns:
             tuple: (linha, coluna) da jogada ou (None, None) se não há jogadas possíveis
         """
-        acao = self.agente_ia.choose_action(self.tabuleiro.matriz, training=False)
+        if self.agente_mcts is None:
+            self.agente_mcts = AgenteMCTS(
+                self.tabuleiro.tamanho, self.tabuleiro.em_linha, **self.orcamento_mcts
+            )
+        acao = self.agente_mcts.choose_action(self.tabuleiro.bits)
         if acao:
             return acao[0], acao[1]
         return None, None
@@ -102,27 +185,217 @@ class JogoDaVelha:
         else:
             return -1  # Derrota
     
-    def treinar_ia(self, num_episodios=10000):
+    def treinar_ia(self, num_episodios=10000, num_ambientes=None, num_processos=None, seed=None,
+                   interativo=True, intervalo_progresso=5.0, perfil=None, lambda_td=LAMBDA_PADRAO,
+                   convergencia=None, trajetorias=None, checkpoint=None):
         """
         Treina a IA usando self-play com Q-Learning
         
+        Ao fim de cada partida as jogadas de cada jogador são atualizadas de trás para
+        frente com alvos de TD(lambda): a última recebe a recompensa final e cada anterior
+        combina o valor da próxima decisão do mesmo jogador com o retorno já calculado.
+        
         Args:
             num_episodios (int): Número de episódios de treinamento
+            num_ambientes (int or None): Se informado, joga esse número de partidas
+                simultâneas no ambiente vetorizado (jogo.vecenv) em vez do tabuleiro único
+            num_processos (int or None): Se informado, usa esse número de processos atores
+                com um aprendiz central (jogo.treino_paralelo), cada um com num_ambientes
+                partidas simultâneas (1024 se não informado)
+            seed (int or None): Semente do treino
+            interativo (bool): Se True, desenha a tela de treinamento e espera Enter no fim;
+                se False, imprime uma linha de progresso a cada intervalo_progresso segundos
+            intervalo_progresso (float): Segundos entre linhas de progresso no modo não interativo
+            perfil (Perfilador or None): Se informado, mede o tempo de cada fase do treino
+                (ver jogo.perfil); o relatório fica disponível em perfil.relatorio(). Não
+                pode ser combinado com num_processos
+            lambda_td (float): Entre 0 e 1; 0 é o TD(0) de um passo, 1 o retorno de Monte
+                Carlo e valores intermediários o TD(lambda)
+            convergencia (CriterioConvergencia or None): Se informado, avalia a política
+                periodicamente e encerra o treino antes de num_episodios quando ela converge
+                (ver jogo.convergencia); num_episodios passa a ser o máximo
+            trajetorias (str or None): Se informado, acrescenta as partidas de self-play a
+                esse registro de trajetórias (ver jogo.trajetorias; só 3x3)
+            checkpoint (CheckpointTreino or None): Se informado, grava checkpoints
+                periódicos e, se ele foi criado com retomar, continua o treino do último
+                (ver jogo.checkpoint). Um SIGTERM grava um checkpoint e encerra o treino
+                no fim do episódio ou lote atual, sem salvar o modelo
+            
+        Returns:
+            dict or None: Resumo do treino no modo não interativo (com interrompido=True
+                depois de um SIGTERM)
         """
-        vitorias_x = 0
-        vitorias_o = 0
-        empates = 0
+        if not 0.0 <= lambda_td <= 1.0:
+            raise ValueError(f"lambda_td deve estar entre 0 e 1, recebido {lambda_td}")
+        if trajetorias is not None and not self.padrao:
+            raise ValueError("O registro de trajetórias só existe para o tabuleiro 3x3")
+        if perfil is not None and num_processos is not None:
+            # Os atores herdariam os métodos trocados e o tempo deles não entraria no relatório
+            raise ValueError("O perfil por fase mede só o processo atual e não pode ser usado "
+                             "com processos atores")
+        if interativo:
+            progresso = ProgressoTela(self.tabuleiro, num_episodios, self.agente_ia)
+        else:
+            progresso = ProgressoPeriodico(num_episodios, self.agente_ia, intervalo_progresso)
+        
+        gravador = None
+        if trajetorias is not None:
+            from jogo.trajetorias import GravadorTrajetorias
+            gravador = GravadorTrajetorias(trajetorias)
+        sigterm_anterior = None
+        # O treino altera a tabela no lugar; a política é recompilada na próxima jogada
+        self.politica_ia = None
+        try:
+            if checkpoint is not None:
+                participantes = {'progresso': progresso}
+                if convergencia is not None:
+                    participantes['convergencia'] = convergencia
+                config = self._config_treino(num_ambientes, num_processos, seed, lambda_td, trajetorias)
+                if checkpoint.iniciar(self.agente_ia, num_episodios, config, participantes, gravador):
+                    print(f"[treino] retomado do checkpoint de {checkpoint.pasta} "
+                          f"({checkpoint.episodio:,} episódios)", flush=True)
+                if threading.current_thread() is threading.main_thread():
+                    sigterm_anterior = signal.signal(signal.SIGTERM, lambda *_: checkpoint.interromper())
+            
+            argumentos = (num_episodios, num_ambientes, num_processos, seed, progresso, lambda_td,
+                          convergencia, gravador, checkpoint)
+            if perfil is None:
+                self._executar_treino(*argumentos)
+            else:
+                with perfil.medir(self):
+                    self._executar_treino(*argumentos)
+        finally:
+            if sigterm_anterior is not None:
+                signal.signal(signal.SIGTERM, sigterm_anterior)
+            if gravador is not None:
+                gravador.fechar()
+        
+        interrompido = checkpoint is not None and checkpoint.interrompido
+        if not interativo:
+            resumo = progresso.finalizar()
+            resumo['modelo'] = None if interrompido else self.modelo_salvo
+            resumo['interrompido'] = interrompido
+            resumo['num_estados'] = self.agente_ia.get_stats()['num_states']
+            if gravador is not None:
+                resumo['trajetorias'] = {'arquivo': trajetorias, 'partidas': gravador.partidas}
+            if checkpoint is not None:
+                resumo['checkpoint'] = checkpoint.resumo()
+            if convergencia is not None:
+                resumo['convergencia'] = convergencia.resumo()
+                if convergencia.convergiu:
+                    print(f"[treino] convergiu após {convergencia.episodio_parada:,} episódios "
+                          f"({convergencia.verificacoes} verificações seguidas dentro dos limites)",
+                          flush=True)
+            if interrompido:
+                print(f"[treino] interrompido após {checkpoint.episodio:,} episódios; "
+                      f"checkpoint gravado em {checkpoint.pasta}, modelo não salvo", flush=True)
+                return resumo
+            print(f"[treino] concluído: {resumo['episodios']:,} episódios em {resumo['segundos']:.1f}s, "
+                  f"{resumo['num_estados']:,} estados, modelo salvo em {self.modelo_salvo}", flush=True)
+            return resumo
         
-        for episodio in range(1, num_episodios + 1):
+        print()
+        if interrompido:
+            print(f"⛔ Treinamento interrompido após {checkpoint.episodio:,} episódios")
+            print(f"💾 Checkpoint gravado em: {checkpoint.pasta}")
+            print("─" * 56)
+            input("✨ Pressione Enter para continuar...")
+            return None
+        print("🎉 Treinamento concluído com sucesso!")
+        if convergencia is not None and convergencia.convergiu:
+            print(f"📉 Política convergiu após {convergencia.episodio_parada:,} episódios")
+        print(f"💾 Modelo salvo em: {self.modelo_salvo}")
+        print(f"🧠 Q-table contém {self.agente_ia.get_stats()['num_states']:,} estados aprendidos")
+        print("─" * 56)
+        input("✨ Pressione Enter para continuar...")
+        return None
+    
+    def _config_treino(self, num_ambientes, num_processos, seed, lambda_td, trajetorias):
+        """Parâmetros que um treino retomado de um checkpoint precisa repetir"""
+        agente = self.agente_ia
+        if num_processos:
+            modo = 'paralelo'
+        elif num_ambientes:
+            modo = 'vetorizado'
+        else:
+            modo = 'tabuleiro'
+        return {
+            'modo': modo,
+            # O número de processos atores pode mudar entre execuções; o de partidas não
+            'num_ambientes': num_ambientes,
+            'seed': seed,
+            'lambda_td': lambda_td,
+            'trajetorias': trajetorias,
+            'tamanho': self.tabuleiro.tamanho,
+            'em_linha': self.tabuleiro.em_linha,
+            'backend': agente.backend,
+            'simetria': agente.simetria,
+            'alpha': agente.alpha,
+            'gamma': agente.gamma,
+            'epsilon_decay': agente.epsilon_decay,
+            'epsilon_min': agente.epsilon_min,
+        }
+    
+    def _executar_treino(self, num_episodios, num_ambientes, num_processos, seed, progresso, lambda_td,
+                         convergencia, gravador, checkpoint):
+        """Escolhe o modo de treino, treina e salva o modelo (ver treinar_ia)"""
+        if (num_processos or num_ambientes) and not self.padrao:
+            raise ValueError("Treino vetorizado e paralelo só existem para o tabuleiro 3x3")
+        if num_processos:
+            from jogo.treino_paralelo import treinar_paralelo
+            treinar_paralelo(
+                self.agente_ia, num_episodios, num_atores=num_processos,
+                num_jogos=num_ambientes or 1024, seed=seed, ao_concluir=progresso,
+                lambda_td=lambda_td, parar=convergencia, gravador=gravador, checkpoint=checkpoint
+            )
+        elif num_ambientes:
+            from jogo.vecenv import treinar_vetorizado
+            treinar_vetorizado(
+                self.agente_ia, num_episodios, num_jogos=num_ambientes, seed=seed,
+                ao_concluir=progresso, lambda_td=lambda_td, parar=convergencia, gravador=gravador,
+                checkpoint=checkpoint
+            )
+        else:
+            # Um checkpoint retomado já devolveu o gerador ao estado gravado
+            if seed is not None and not (checkpoint is not None and checkpoint.retomado):
+                random.seed(seed)
+            self._treinar_ia_tabuleiro(num_episodios, progresso, lambda_td, convergencia, gravador,
+                                       checkpoint)
+        
+        # Um treino interrompido fica só no checkpoint; o modelo salvo continua o anterior
+        if checkpoint is not None and checkpoint.interrompido:
+            return
+        # Salva o modelo treinado
+        self.agente_ia.save_model(self.modelo_salvo, **self.opcoes_modelo)
+    
+    def _treinar_ia_tabuleiro(self, num_episodios, ao_concluir, lambda_td, parar=None, gravador=None,
+                              checkpoint=None):
+        """
+        Self-play partida a partida no tabuleiro do jogo
+        
+        Args:
+            num_episodios (int): Número de episódios de treinamento
+            ao_concluir (callable): Chamado após cada episódio como
+                ao_concluir(episodio, vitorias_x, vitorias_o, empates) do episódio
+            lambda_td (float): Lambda dos alvos de TD (ver treinar_ia)
+            parar (callable or None): Chamado como parar(episodio) após cada episódio;
+                se devolver True o treino termina
+            gravador (GravadorTrajetorias or None): Recebe cada partida concluída
+            checkpoint (CheckpointTreino or None): Grava o estado após os episódios; se
+                foi retomado, o treino continua do episódio seguinte ao gravado
+        """
+        inicio = checkpoint.episodio + 1 if checkpoint is not None else 1
+        for episodio in range(inicio, num_episodios + 1):
             self.reiniciar_jogo()
             estados_jogadas = []  # Para armazenar (estado, ação, jogador)
+            vencedor = None
             
             while True:
-                # Salva o estado atual
-                estado_atual = self.tabuleiro.copiar_matriz()
+                # Salva o estado atual (cópia das máscaras, sem montar listas)
+                estado_atual = self.tabuleiro.bits.copiar()
                 
                 # IA escolhe uma ação
-                acao = self.agente_ia.choose_action(self.tabuleiro.matriz, training=True)
+                acao = self.agente_ia.choose_action(estado_atual, training=True)
                 if acao is None:
                     break
                 
@@ -132,26 +405,13 @@ class JogoDaVelha:
                 # Executa a ação
                 self.tabuleiro.fazer_jogada(acao[0], acao[1], self.jogador_atual)
                 
-                # Verifica se o jogo acabou
-                vencedor = self.verificar_vitoria()
-                if vencedor or self.tabuleiro.esta_cheio():
-                    # Atualiza contadores
-                    if vencedor == 'X':
-                        vitorias_x += 1
-                    elif vencedor == 'O':
-                        vitorias_o += 1
-                    else:
-                        empates += 1
-                    
-                    # Atualiza Q-values para todas as jogadas do episódio
-                    for i, (estado, jogada, jogador) in enumerate(estados_jogadas):
-                        recompensa = self.calcular_recompensa(vencedor, jogador)
-                        
-                        # Estado seguinte (estado atual do tabuleiro)
-                        proximo_estado = self.tabuleiro.copiar_matriz()
-                        
-                        self.agente_ia.update_q_value(estado, jogada, recompensa, proximo_estado)
-                    
+                # Verifica se o jogo acabou (vitória e empate numa única consulta)
+                resultado = self.tabuleiro.resultado()
+                if resultado != EM_ANDAMENTO:
+                    vencedor = VENCEDOR_POR_RESULTADO[resultado]
+                    self._atualizar_partida(estados_jogadas, vencedor, lambda_td)
+                    if gravador is not None:
+                        gravador.registrar([l * 3 + c for _, (l, c), _ in estados_jogadas])
                     break
                 
                 self.trocar_jogador()
@@ -160,22 +420,40 @@ class JogoDaVelha:
             self.agente_ia.decay_epsilon()
             
             # Mostra progresso
-            self.tabuleiro.exibir_tela_treinamento(
-                episodio, num_episodios, self.agente_ia.epsilon,
-                vitorias_x, vitorias_o, empates
-            )
-            
-            if episodio % 1000 == 0:
-                vitorias_x = vitorias_o = empates = 0
+            ao_concluir(episodio, vencedor == 'X', vencedor == 'O', vencedor is None)
+            if parar is not None and parar(episodio):
+                if checkpoint is not None:
+                    checkpoint.salvar(episodio)
+                break
+            if checkpoint is not None and checkpoint(episodio):
+                break
+    
+    def _atualizar_partida(self, estados_jogadas, vencedor, lambda_td):
+        """
+        Atualiza as jogadas de uma partida encerrada com alvos de TD(lambda)
         
-        # Salva o modelo treinado
-        self.agente_ia.save_model(self.modelo_salvo)
-        print()
-        print("🎉 Treinamento concluído com sucesso!")
-        print(f"💾 Modelo salvo em: {self.modelo_salvo}")
-        print(f"🧠 Q-table contém {len(self.agente_ia.q_table):,} estados aprendidos")
-        print("─" * 56)
-        input("✨ Pressione Enter para continuar...")
+        As jogadas de cada jogador são percorridas da última para a primeira. O estado
+        seguinte de uma jogada é a próxima decisão do mesmo jogador (duas jogadas depois),
+        e estados terminais não entram no alvo: a última jogada recebe só a recompensa.
+        
+        Args:
+            estados_jogadas (list): (estado, ação, jogador) de cada jogada, em ordem
+            vencedor (str or None): Símbolo do vencedor ou None para empate
+            lambda_td (float): Lambda dos alvos de TD (ver treinar_ia)
+        """
+        agente = self.agente_ia
+        gamma = agente.gamma
+        # Os jogadores alternam: as jogadas de cada um são uma fatia de passo 2 a partir do fim
+        for jogadas_jogador in (estados_jogadas[-1::-2], estados_jogadas[-2::-2]):
+            retorno = self.calcular_recompensa(vencedor, jogadas_jogador[0][2])
+            seguinte = None
+            for estado, jogada, _ in jogadas_jogador:
+                if seguinte is not None:
+                    # A próxima decisão já foi atualizada nesta varredura
+                    valor = agente.valor_maximo(seguinte) if lambda_td < 1.0 else 0.0
+                    retorno = gamma * ((1.0 - lambda_td) * valor + lambda_td * retorno)
+                agente.update_q_target(estado, jogada, retorno)
+                seguinte = estado
     
     def escolher_modo_jogo(self):
         """Menu para escolher o modo de jogo"""
@@ -183,7 +461,7 @@ class JogoDaVelha:
             self.tabuleiro.exibir_menu_principal()
             
             try:
-                escolha = input("\nDigite sua escolha (1-5): ").strip()
+                escolha = input("\nDigite sua escolha (1-7): ").strip()
                 
                 if escolha == '1':
                     self.modo_jogo = 'humano'
@@ -193,7 +471,7 @@ class JogoDaVelha:
                     return
                 elif escolha == '3':
                     # Tenta carregar o modelo treinado
-                    if self.agente_ia.load_model(self.modelo_salvo):
+                    if self.carregar_modelo():
                         print(f"✅ Modelo carregado de {self.modelo_salvo}")
                         time.sleep(1)
                         self.modo_jogo = 'ia'
@@ -204,7 +482,7 @@ class JogoDaVelha:
                         continue
                 elif escolha == '4':
                     # Verifica se tem IA treinada para o modo assistir
-                    if self.agente_ia.load_model(self.modelo_salvo):
+                    if self.carregar_modelo():
                         print(f"✅ IA carregada para modo assistir")
                         time.sleep(1)
                         self.modo_jogo = 'assistir'
@@ -225,8 +503,21 @@ class JogoDaVelha:
                         self.modo_jogo = 'ia'
                         return
                     continue  # Volta ao menu
+                elif escolha == '6':
+                    if not self.padrao:
+                        print("❌ O solver perfeito só existe para o tabuleiro 3x3")
+                        input("Pressione Enter para continuar...")
+                        continue
+                    self.carregar_solver()
+                    print("✅ Solver perfeito pronto")
+                    time.sleep(1)
+                    self.modo_jogo = 'perfeito'
+                    return
+                elif escolha == '7':
+                    self.modo_jogo = 'mcts'
+                    return
                 else:
-                    print("❌ Digite apenas números de 1 a 5")
+                    print("❌ Digite apenas números de 1 a 7")
                     time.sleep(1)
                     
             except KeyboardInterrupt:
@@ -254,8 +545,9 @@ class JogoDaVelha:
             
             linha, coluna = map(int, entrada.split())
             
-            if linha < 0 or linha > 2 or coluna < 0 or coluna > 2:
-                return False, None, None, "❌ Coordenadas inválidas! Use valores entre 0 e 2"
+            maximo = self.tabuleiro.tamanho - 1
+            if linha < 0 or linha > maximo or coluna < 0 or coluna > maximo:
+                return False, None, None, f"❌ Coordenadas inválidas! Use valores entre 0 e {maximo}"
             
             if not self.tabuleiro.posicao_vazia(linha, coluna):
                 return False, None, None, "❌ Posição já ocupada! Tente outra"
@@ -279,6 +571,12 @@ class JogoDaVelha:
         if self.modo_jogo == 'ia':
             linha, coluna = self.jogada_ia()
             tipo_jogador = "🤖 IA"
+        elif self.modo_jogo == 'perfeito':
+            linha, coluna = self.jogada_perfeita()
+            tipo_jogador = "🧮 Solver"
+        elif self.modo_jogo == 'mcts':
+            linha, coluna = self.jogada_mcts()
+            tipo_jogador = "🌳 MCTS"
         elif self.modo_jogo == 'assistir':
             if self.jogador_atual == 'X':
                 # X é sempre computador aleatório no modo assistir
@@ -315,8 +613,7 @@ class JogoDaVelha:
             if resposta == 's':
                 return True
             elif resposta == 'n':
-                from utils.limpar_tela import limpar_tela
-                limpar_tela()
+                tela_padrao.limpar()
                 print("Obrigado por jogar! Até logo! 👋")
                 return False
             else:
@@ -331,7 +628,9 @@ class JogoDaVelha:
             'computador': "🎯 Você é ❌, computador é ⭕. Você começa!",
             'ia': "🎯 Você é ❌, IA é ⭕. Você começa!",
             'humano': "🎯 Jogador ❌ começa!",
-            'assistir': "👀 Assistindo: 🎲 Computador Random vs 🤖 IA Treinada"
+            'assistir': "👀 Assistindo: 🎲 Computador Random vs 🤖 IA Treinada",
+            'perfeito': "🎯 Você é ❌, Solver Perfeito é ⭕. O melhor possível é empatar!",
+            'mcts': "🎯 Você é ❌, MCTS é ⭕. Você começa!"
         }
 
         if self.modo_jogo in mensagens_iniciais:
@@ -341,7 +640,7 @@ class JogoDaVelha:
         while True:
             self.tabuleiro.exibir(self.modo_jogo, self.jogador_atual)
 
-            if self.modo_jogo in ['computador', 'ia', 'assistir'] and self.jogador_atual == 'O':
+            if self.modo_jogo in ['computador', 'ia', 'assistir', 'perfeito', 'mcts'] and self.jogador_atual == 'O':
                 linha, coluna, mensagem = self.executar_jogada_automatica()
             elif self.modo_jogo == 'assistir' and self.jogador_atual == 'X':
                 linha, coluna, mensagem = self.executar_jogada_automatica()
@@ -360,12 +659,19 @@ class JogoDaVelha:
 
             if linha is not None and coluna is not None:
                 self.tabuleiro.fazer_jogada(linha, coluna, self.jogador_atual)
+                self.jogadas_partida.append(linha * self.tabuleiro.tamanho + coluna)
 
-            vencedor = self.verificar_vitoria()
-            if vencedor or self.tabuleiro.esta_cheio():
+            resultado = self.tabuleiro.resultado()
+            if resultado != EM_ANDAMENTO:
+                vencedor = VENCEDOR_POR_RESULTADO[resultado]
+                if self.gravador_partidas is not None:
+                    self.gravador_partidas.registrar(self.jogadas_partida)
                 self.tabuleiro.exibir(self.modo_jogo, self.jogador_atual, f"🎉 Vitória de {vencedor}!" if vencedor else "🤝 Empate!")
                 if not self.perguntar_novo_jogo():
                     break
+                if self.modo_jogo in ('ia', 'assistir'):
+                    # Entre partidas, troca para um modelo mais novo se ele foi salvo
+                    self.carregar_modelo()
                 self.reiniciar_jogo()
                 continue
 
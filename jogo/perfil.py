@@ -0,0 +1,198 @@
+"""
+Perfil por fase do treino - contadores e cronômetros opcionais em JogoDaVelha, Tabuleiro e QLearningAgent
+
+Nada muda no código medido: ao ativar, os métodos de cada fase são trocados por versões
+cronometradas e, ao final, os originais voltam. Sem perfil ativo o custo é zero.
+"""
+
+import cProfile
+import time
+from contextlib import contextmanager
+
+from jogo.bitboard import BitBoard
+
+try:
+    from jogo.vecenv import AmbienteVetorizado
+except ImportError:  # Sem NumPy não há ambiente vetorizado para medir
+    AmbienteVetorizado = None
+
+# Fases medidas: (atributo do jogo, ou None para o próprio jogo, método, nome da fase)
+FASES_INSTANCIA = (
+    (None, 'reiniciar_jogo', 'reiniciar_jogo'),
+    (None, 'verificar_vitoria', 'verificar_vitoria'),
+    (None, 'calcular_recompensa', 'calcular_recompensa'),
+    (None, 'trocar_jogador', 'trocar_jogador'),
+    ('tabuleiro', 'fazer_jogada', 'fazer_jogada'),
+    ('tabuleiro', 'resultado', 'resultado'),
+    ('tabuleiro', 'exibir_tela_treinamento', 'exibir_tela_treinamento'),
+    ('agente_ia', 'choose_action', 'choose_action'),
+    ('agente_ia', 'update_q_value', 'update_q_value'),
+    ('agente_ia', 'update_q_target', 'update_q_target'),
+    ('agente_ia', 'valor_maximo', 'valor_maximo'),
+    ('agente_ia', 'update_q_values_batch', 'update_q_values_batch'),
+    ('agente_ia', 'decay_epsilon', 'decay_epsilon'),
+    ('agente_ia', 'save_model', 'save_model'),
+)
+
+# Métodos de classes sem __dict__ por instância (BitBoard) ou criadas dentro do treino
+FASES_CLASSE = (
+    (BitBoard, 'copiar', 'copiar_estado'),
+    (AmbienteVetorizado, 'escolher_acoes', 'escolher_acoes'),
+    (AmbienteVetorizado, 'passo', 'passo_ambiente'),
+)
+
+
+class Perfilador:
+    """Acumula chamadas, tempo total e tempo próprio (sem subfases) de cada fase"""
+
+    def __init__(self, arquivo_pstats=None):
+        """
+        Args:
+            arquivo_pstats (str or None): Se informado, roda também o cProfile durante a
+                medição e grava as estatísticas nesse arquivo (lido com pstats)
+        """
+        self.arquivo_pstats = arquivo_pstats
+        # fase -> [chamadas, tempo total em ns, tempo próprio em ns]
+        self.fases = {}
+        self.tempo_total_ns = 0
+        self._filhos = []
+        self._restaurar = []
+        self.custo_por_chamada_ns = self._calibrar()
+
+    def _calibrar(self, repeticoes=20000):
+        """Estima o custo do próprio cronômetro por chamada, descontado no relatório"""
+        def vazia():
+            return None
+
+        cronometrada = Perfilador._cronometrar(self, vazia, '_calibracao')
+        relogio = time.perf_counter_ns
+        inicio = relogio()
+        for _ in range(repeticoes):
+            vazia()
+        direto = relogio() - inicio
+        inicio = relogio()
+        for _ in range(repeticoes):
+            cronometrada()
+        medido = relogio() - inicio
+        del self.fases['_calibracao']
+        return max(0.0, (medido - direto) / repeticoes)
+
+    def _cronometrar(self, funcao, fase):
+        """Devolve uma versão de funcao que soma seu tempo na fase"""
+        estatisticas = self.fases.setdefault(fase, [0, 0, 0])
+        filhos = self._filhos
+        relogio = time.perf_counter_ns
+
+        def cronometrada(*args, **kwargs):
+            filhos.append(0)
+            inicio = relogio()
+            try:
+                return funcao(*args, **kwargs)
+            finally:
+                duracao = relogio() - inicio
+                proprio = duracao - filhos.pop()
+                estatisticas[0] += 1
+                estatisticas[1] += duracao
+                estatisticas[2] += proprio
+                if filhos:
+                    filhos[-1] += duracao
+
+        cronometrada.__wrapped__ = funcao
+        return cronometrada
+
+    def _instrumentar(self, jogo):
+        for atributo, metodo, fase in FASES_INSTANCIA:
+            alvo = jogo if atributo is None else getattr(jogo, atributo)
+            if not hasattr(alvo, metodo):
+                continue
+            setattr(alvo, metodo, self._cronometrar(getattr(alvo, metodo), fase))
+            self._restaurar.append((alvo, metodo, None))
+        for classe, metodo, fase in FASES_CLASSE:
+            if classe is None:
+                continue
+            original = classe.__dict__[metodo]
+            setattr(classe, metodo, self._cronometrar(original, fase))
+            self._restaurar.append((classe, metodo, original))
+
+    def _remover(self):
+        for alvo, metodo, original in reversed(self._restaurar):
+            if original is None:
+                # O método da instância volta a ser o da classe
+                delattr(alvo, metodo)
+            else:
+                setattr(alvo, metodo, original)
+        self._restaurar = []
+
+    @contextmanager
+    def medir(self, jogo):
+        """
+        Instrumenta o jogo durante o bloco e restaura os métodos originais ao sair
+
+        Args:
+            jogo (JogoDaVelha): Jogo cujo tabuleiro e agente serão medidos
+        """
+        self._instrumentar(jogo)
+        perfil_c = cProfile.Profile() if self.arquivo_pstats else None
+        inicio = time.perf_counter_ns()
+        if perfil_c is not None:
+            perfil_c.enable()
+        try:
+            yield self
+        finally:
+            if perfil_c is not None:
+                perfil_c.disable()
+            self.tempo_total_ns += time.perf_counter_ns() - inicio
+            self._remover()
+            if perfil_c is not None:
+                perfil_c.dump_stats(self.arquivo_pstats)
+
+    def resumo(self):
+        """
+        Returns:
+            dict: Por fase, chamadas, total_ms, proprio_ms e ns_por_chamada; mais
+                'total_ms' da medição, 'fora_das_fases_ms' (inclui o custo dos cronômetros)
+                e 'instrumentacao_ms', a estimativa desse custo
+        """
+        fases = {
+            fase: {
+                'chamadas': chamadas,
+                'total_ms': total / 1e6,
+                'proprio_ms': proprio / 1e6,
+                'ns_por_chamada': total / chamadas if chamadas else 0.0,
+            }
+            for fase, (chamadas, total, proprio) in self.fases.items()
+            if chamadas
+        }
+        proprio_total = sum(proprio for _, _, proprio in self.fases.values())
+        chamadas_total = sum(chamadas for chamadas, _, _ in self.fases.values())
+        return {
+            'fases': fases,
+            'total_ms': self.tempo_total_ns / 1e6,
+            'fora_das_fases_ms': (self.tempo_total_ns - proprio_total) / 1e6,
+            'instrumentacao_ms': chamadas_total * self.custo_por_chamada_ns / 1e6,
+        }
+
+    def relatorio(self):
+        """
+        Returns:
+            str: Tabela das fases ordenadas pelo tempo próprio
+        """
+        resumo = self.resumo()
+        total = max(resumo['total_ms'], 1e-9)
+        largura = max([len(fase) for fase in resumo['fases']] + [len('fora das fases')])
+        linhas = [f"{'fase':<{largura}}  {'chamadas':>10}  {'total ms':>10}  "
+                  f"{'próprio ms':>10}  {'%':>6}  {'ns/chamada':>10}"]
+        ordenadas = sorted(resumo['fases'].items(), key=lambda item: -item[1]['proprio_ms'])
+        for fase, dados in ordenadas:
+            linhas.append(
+                f"{fase:<{largura}}  {dados['chamadas']:>10,}  {dados['total_ms']:>10.1f}  "
+                f"{dados['proprio_ms']:>10.1f}  {dados['proprio_ms'] / total:>6.1%}  "
+                f"{dados['ns_por_chamada']:>10,.0f}"
+            )
+        fora = resumo['fora_das_fases_ms']
+        linhas.append(f"{'fora das fases':<{largura}}  {'':>10}  {'':>10}  {fora:>10.1f}  {fora / total:>6.1%}")
+        linhas.append(f"total medido: {resumo['total_ms']:.1f} ms, dos quais ~{resumo['instrumentacao_ms']:.1f} ms "
+                      f"são custo dos próprios cronômetros")
+        if self.arquivo_pstats:
+            linhas.append(f"cProfile gravado em {self.arquivo_pstats} (python -m pstats {self.arquivo_pstats})")
+        return '\n'.join(linhas)
@@ -0,0 +1,170 @@
+"""
+Relatórios de progresso do treinamento - tela interativa ou linhas periódicas para jobs em lote
+"""
+
+import sys
+import time
+
+
+class ProgressoTela:
+    """Repassa o progresso para Tabuleiro.exibir_tela_treinamento a cada 1000 episódios"""
+
+    def __init__(self, tabuleiro, total_episodios, agente):
+        """
+        Args:
+            tabuleiro (Tabuleiro): Tabuleiro que desenha a tela de treinamento
+            total_episodios (int): Total de episódios do treino
+            agente (QLearningAgent): Agente em treino (para mostrar o epsilon)
+        """
+        self.tabuleiro = tabuleiro
+        self.total_episodios = total_episodios
+        self.agente = agente
+        self.janela = [0, 0, 0]
+        self.proximo = 1000
+        self.tabuleiro.exibir_tela_treinamento(1, total_episodios, agente.epsilon, 0, 0, 0)
+
+    def __call__(self, concluidos, vitorias_x, vitorias_o, empates):
+        """
+        Registra episódios concluídos desde a última chamada
+
+        Args:
+            concluidos (int): Total de episódios concluídos até agora
+            vitorias_x (int): Vitórias do X desde a última chamada
+            vitorias_o (int): Vitórias do O desde a última chamada
+            empates (int): Empates desde a última chamada
+        """
+        janela = self.janela
+        janela[0] += vitorias_x
+        janela[1] += vitorias_o
+        janela[2] += empates
+        if concluidos < self.proximo:
+            return
+        # Treinos em lote podem cruzar várias marcas de 1000 episódios de uma vez
+        while concluidos >= self.proximo:
+            self.tabuleiro.exibir_tela_treinamento(
+                self.proximo, self.total_episodios, self.agente.epsilon, *janela
+            )
+            janela[0] = janela[1] = janela[2] = 0
+            self.proximo += 1000
+
+    def estado_checkpoint(self):
+        """
+        Returns:
+            dict: Janela em andamento e próxima marca, para checkpoints de treino
+        """
+        return {'janela': list(self.janela), 'proximo': self.proximo}
+
+    def restaurar_checkpoint(self, estado):
+        """
+        Continua a contagem de um treino retomado e redesenha a tela no ponto gravado
+
+        Args:
+            estado (dict): Estado devolvido por estado_checkpoint()
+        """
+        self.janela = list(estado['janela'])
+        self.proximo = estado['proximo']
+        self.tabuleiro.exibir_tela_treinamento(
+            max(self.proximo - 1000, 1), self.total_episodios, self.agente.epsilon, 0, 0, 0
+        )
+
+
+class ProgressoPeriodico:
+    """Imprime uma linha de progresso a cada intervalo de tempo, sem limpar a tela"""
+
+    def __init__(self, total_episodios, agente, intervalo=5.0, saida=None):
+        """
+        Args:
+            total_episodios (int): Total de episódios do treino
+            agente (QLearningAgent): Agente em treino (para mostrar o epsilon)
+            intervalo (float): Segundos entre linhas de progresso
+            saida (file or None): Destino das linhas; None usa sys.stdout
+        """
+        self.total_episodios = total_episodios
+        self.agente = agente
+        self.intervalo = intervalo
+        self.saida = saida if saida is not None else sys.stdout
+        self.janela = [0, 0, 0]
+        self.totais = [0, 0, 0]
+        self.concluidos = 0
+        # Episódios já concluídos antes desta execução (treino retomado de um checkpoint)
+        self.concluidos_iniciais = 0
+        self.inicio = time.monotonic()
+        self.ultimo_relatorio = (self.inicio, 0)
+        self.proximo = self.inicio + intervalo
+
+    def __call__(self, concluidos, vitorias_x, vitorias_o, empates):
+        """
+        Registra episódios concluídos desde a última chamada
+
+        Args:
+            concluidos (int): Total de episódios concluídos até agora
+            vitorias_x (int): Vitórias do X desde a última chamada
+            vitorias_o (int): Vitórias do O desde a última chamada
+            empates (int): Empates desde a última chamada
+        """
+        self.concluidos = concluidos
+        janela = self.janela
+        janela[0] += vitorias_x
+        janela[1] += vitorias_o
+        janela[2] += empates
+        agora = time.monotonic()
+        if agora >= self.proximo:
+            self._relatar(agora)
+
+    def _relatar(self, agora):
+        momento_anterior, concluidos_anterior = self.ultimo_relatorio
+        taxa = (self.concluidos - concluidos_anterior) / max(agora - momento_anterior, 1e-9)
+        partidas = max(sum(self.janela), 1)
+        progresso = self.concluidos / max(self.total_episodios, 1) * 100
+        print(
+            f"[treino] {self.concluidos:,}/{self.total_episodios:,} ({progresso:.1f}%) | "
+            f"{taxa:,.0f} ep/s | epsilon {self.agente.epsilon:.3f} | "
+            f"X {self.janela[0] / partidas:.1%} O {self.janela[1] / partidas:.1%} "
+            f"empates {self.janela[2] / partidas:.1%}",
+            file=self.saida, flush=True
+        )
+        for i in range(3):
+            self.totais[i] += self.janela[i]
+            self.janela[i] = 0
+        self.ultimo_relatorio = (agora, self.concluidos)
+        self.proximo = agora + self.intervalo
+
+    def estado_checkpoint(self):
+        """
+        Returns:
+            dict: Episódios concluídos e contagens de resultados, para checkpoints de treino
+        """
+        return {'concluidos': self.concluidos, 'janela': list(self.janela), 'totais': list(self.totais)}
+
+    def restaurar_checkpoint(self, estado):
+        """
+        Continua as contagens de um treino retomado; taxas e segundos contam só desta execução
+
+        Args:
+            estado (dict): Estado devolvido por estado_checkpoint()
+        """
+        self.concluidos = self.concluidos_iniciais = estado['concluidos']
+        self.janela = list(estado['janela'])
+        self.totais = list(estado['totais'])
+        self.ultimo_relatorio = (self.ultimo_relatorio[0], self.concluidos)
+
+    def finalizar(self):
+        """
+        Imprime a última linha de progresso e devolve o resumo do treino
+
+        Returns:
+            dict: episodios, segundos, episodios_por_segundo, vitorias_x, vitorias_o e empates
+                (num treino retomado, episodios e resultados incluem os de antes do checkpoint)
+        """
+        agora = time.monotonic()
+        if self.concluidos != self.ultimo_relatorio[1]:
+            self._relatar(agora)
+        segundos = agora - self.inicio
+        return {
+            'episodios': self.concluidos,
+            'segundos': segundos,
+            'episodios_por_segundo': (self.concluidos - self.concluidos_iniciais) / max(segundos, 1e-9),
+            'vitorias_x': self.totais[0],
+            'vitorias_o': self.totais[1],
+            'empates': self.totais[2],
+        }
@@ -2,35 +2,127 @@
 Módulo responsável pela exibição e manipulação visual do tabuleiro
 """
 
-from utils.limpar_tela import limpar_tela
+from jogo.bitboard import BitBoard, BitBoardN, obter_geometria
+from jogo.terminal import EM_ANDAMENTO, EMPATE, VITORIA_O, VITORIA_X
+from utils.tela import tela_padrao
 
 class Tabuleiro:
     """Classe responsável pela exibição do tabuleiro do jogo"""
     
-    def __init__(self):
-        self.matriz = [[' ' for _ in range(3)] for _ in range(3)]
+    def __init__(self, tamanho=3, em_linha=3):
+        """
+        Args:
+            tamanho (int): Número de linhas e colunas do tabuleiro
+            em_linha (int): Peças seguidas necessárias para vencer
+        """
+        self.geometria = obter_geometria(tamanho, em_linha)
+        self.tamanho = tamanho
+        self.em_linha = em_linha
+        self.num_casas = self.geometria.num_casas
+        # O estado fica nas máscaras do BitBoard; a matriz é apenas uma visão
+        self.bits = BitBoard() if self.geometria.padrao else BitBoardN(self.geometria)
+        # Peças de cada jogador (X, O) em cada linha vencedora, atualizadas a cada jogada
+        num_linhas = len(self.geometria.linhas)
+        self.contagens = ([0] * num_linhas, [0] * num_linhas)
+        self._linhas_por_casa = self.geometria.linhas_por_casa
+        self.num_ocupadas = 0
+        self._resultado = EM_ANDAMENTO
+    
+    @property
+    def matriz(self):
+        """
+        Matriz NxN de símbolos montada a partir do BitBoard
+        
+        Returns:
+            list: Nova matriz NxN com 'X', 'O' ou ' '
+        """
+        return self.bits.para_matriz()
     
     def limpar(self):
         """Reinicia o tabuleiro com todas as posições vazias"""
-        self.matriz = [[' ' for _ in range(3)] for _ in range(3)]
+        self.bits.limpar()
+        for contagem in self.contagens:
+            contagem[:] = [0] * len(contagem)
+        self.num_ocupadas = 0
+        self._resultado = EM_ANDAMENTO
+    
+    def definir_posicao(self, bits):
+        """
+        Substitui o conteúdo do tabuleiro e recalcula os contadores
+        
+        Args:
+            bits (BitBoard): Posição a copiar para o tabuleiro
+        """
+        self.bits.x, self.bits.o = bits.x, bits.o
+        for mascara, contagem in zip((bits.x, bits.o), self.contagens):
+            contagem[:] = [bin(mascara & linha).count('1') for linha in self.geometria.linhas]
+        self.num_ocupadas = bin(bits.x | bits.o).count('1')
+        self._recalcular_resultado()
+    
+    def _recalcular_resultado(self):
+        """Resultado a partir dos contadores de todas as linhas (usado fora do caminho da jogada)"""
+        if self.em_linha in self.contagens[0]:
+            self._resultado = VITORIA_X
+        elif self.em_linha in self.contagens[1]:
+            self._resultado = VITORIA_O
+        elif self.num_ocupadas == self.num_casas:
+            self._resultado = EMPATE
+        else:
+            self._resultado = EM_ANDAMENTO
     
     def fazer_jogada(self, linha, coluna, jogador):
         """
         Faz uma jogada no tabuleiro
         
         Args:
-            linha (int): Linha da jogada (0-2)
-            coluna (int): Coluna da jogada (0-2)
+            linha (int): Linha da jogada (0 a N-1)
+            coluna (int): Coluna da jogada (0 a N-1)
             jogador (str): Símbolo do jogador ('X' ou 'O')
             
         Returns:
             bool: True se a jogada foi válida, False caso contrário
         """
-        if 0 <= linha <= 2 and 0 <= coluna <= 2 and self.matriz[linha][coluna] == ' ':
-            self.matriz[linha][coluna] = jogador
-            return True
+        tamanho = self.tamanho
+        if 0 <= linha < tamanho and 0 <= coluna < tamanho:
+            pos = linha * tamanho + coluna
+            if self.bits.casa_vazia(pos):
+                self.bits.jogar(pos, jogador)
+                self.num_ocupadas += 1
+                # Só as linhas que passam pela casa jogada podem ter sido completadas
+                contagem = self.contagens[jogador == 'O']
+                for indice in self._linhas_por_casa[pos]:
+                    contagem[indice] += 1
+                    if contagem[indice] == self.em_linha and self._resultado == EM_ANDAMENTO:
+                        self._resultado = VITORIA_X if jogador == 'X' else VITORIA_O
+                if self._resultado == EM_ANDAMENTO and self.num_ocupadas == self.num_casas:
+                    self._resultado = EMPATE
+                return True
         return False
     
+    def desfazer_jogada(self, linha, coluna):
+        """
+        Remove a peça de uma posição do tabuleiro, desfazendo fazer_jogada
+        
+        Os contadores das linhas que passam pela casa, o número de casas ocupadas e o
+        resultado voltam ao que eram antes da jogada.
+        
+        Args:
+            linha (int): Linha da jogada (0 a N-1)
+            coluna (int): Coluna da jogada (0 a N-1)
+        """
+        tamanho = self.tamanho
+        if not (0 <= linha < tamanho and 0 <= coluna < tamanho):
+            return
+        pos = linha * tamanho + coluna
+        if self.bits.casa_vazia(pos):
+            return
+        contagem = self.contagens[not (self.bits.x >> pos & 1)]
+        for indice in self._linhas_por_casa[pos]:
+            contagem[indice] -= 1
+        self.num_ocupadas -= 1
+        self.bits.desfazer(pos)
+        self._recalcular_resultado()
+    
     def posicao_vazia(self, linha, coluna):
         """
         Verifica se uma posição está vazia
@@ -42,7 +134,7 @@ class Tabuleiro:
         Returns:
             bool: True se a posição está vazia, False caso contrário
         """
-        return self.matriz[linha][coluna] == ' '
+        return self.bits.casa_vazia(linha * self.tamanho + coluna)
     
     def obter_posicoes_vazias(self):
         """
@@ -51,12 +143,7 @@ class Tabuleiro:
         Returns:
             list: Lista de tuplas (linha, coluna) das posições vazias
         """
-        posicoes = []
-        for i in range(3):
-            for j in range(3):
-                if self.matriz[i][j] == ' ':
-                    posicoes.append((i, j))
-        return posicoes
+        return list(self.bits.posicoes_vazias())
     
     def esta_cheio(self):
         """
@@ -65,19 +152,25 @@ class Tabuleiro:
         Returns:
             bool: True se não há posições vazias, False caso contrário
         """
-        for linha in self.matriz:
-            if ' ' in linha:
-                return False
-        return True
+        return self.num_ocupadas == self.num_casas
+    
+    def resultado(self):
+        """
+        Resultado mantido pelos contadores de linha (sem varrer o tabuleiro)
+        
+        Returns:
+            int: Código de jogo.terminal (EM_ANDAMENTO, VITORIA_X, VITORIA_O ou EMPATE)
+        """
+        return self._resultado
     
     def copiar_matriz(self):
         """
         Retorna uma cópia da matriz do tabuleiro
         
         Returns:
-            list: Cópia da matriz 3x3 do tabuleiro
+            list: Cópia da matriz NxN do tabuleiro
         """
-        return [linha[:] for linha in self.matriz]
+        return self.bits.para_matriz()
     
     def exibir(self, modo_jogo, jogador_atual, mensagem=""):
         """
@@ -88,72 +181,99 @@ class Tabuleiro:
             jogador_atual (str): Jogador atual ('X' ou 'O')
             mensagem (str): Mensagem adicional para exibir
         """
-        limpar_tela()
-
-        print("╔══════════════════════════════════════════════════════╗")
-        print("║                🎮 JOGO DA VELHA COM IA 🤖            ║")
-        print("╚══════════════════════════════════════════════════════╝")
+        tela_padrao.desenhar(self.linhas_tela(modo_jogo, jogador_atual, mensagem))
+    
+    def linhas_tela(self, modo_jogo, jogador_atual, mensagem=""):
+        """
+        Monta as linhas da tela do jogo, sem escrevê-las
+        
+        Args:
+            modo_jogo (str): Modo atual do jogo
+            jogador_atual (str): Jogador atual ('X' ou 'O')
+            mensagem (str): Mensagem adicional para exibir
+            
+        Returns:
+            list: Linhas da tela, sem quebras de linha
+        """
+        linhas = [
+            "╔══════════════════════════════════════════════════════╗",
+            "║                🎮 JOGO DA VELHA COM IA 🤖            ║",
+            "╚══════════════════════════════════════════════════════╝",
+        ]
 
         modo_texto = {
             'humano': "👥 Dois Jogadores",
             'computador': "👤 Humano (X) vs 🎲 Computador Random (O)",
             'ia': "👤 Humano (X) vs 🤖 IA Treinada (O)",
             'assistir': "🎲 Computador Random (X) vs 🤖 IA Treinada (O)",
+            'perfeito': "👤 Humano (X) vs 🧮 Solver Perfeito (O)",
+            'mcts': "👤 Humano (X) vs 🌳 MCTS (O)",
             'treino': "🧠 Modo: Treinamento da IA"
         }
-        print(f"\n{modo_texto.get(modo_jogo, 'Modo: Desconhecido')}\n")
+        linhas += ["", modo_texto.get(modo_jogo, 'Modo: Desconhecido'), ""]
+        if not self.geometria.padrao:
+            linhas += [f"📐 Tabuleiro {self.tamanho}x{self.tamanho}, {self.em_linha} em linha para vencer", ""]
 
-        # Cabeçalho do tabuleiro
-        print("    0   1   2")
-        print("  +---+---+---+")
+        # Cabeçalho do tabuleiro (a largura do rótulo das linhas acompanha N)
+        tamanho = self.tamanho
+        largura = len(str(tamanho - 1))
+        separador = " " * (largura + 1) + "+" + "---+" * tamanho
+        linhas.append((" " * (largura + 2) + " ".join(f"{j:^3}" for j in range(tamanho))).rstrip())
+        linhas.append(separador)
 
         # Linhas do tabuleiro
-        for i in range(3):
-            linha = f"{i} |"
-            for j in range(3):
-                valor = self.matriz[i][j] if self.matriz[i][j] != ' ' else ' '
-                linha += f" {valor} |"
-            print(linha)
-            print("  +---+---+---+")
+        simbolo = self.bits.simbolo
+        for i in range(tamanho):
+            casas = "".join(f" {simbolo(i * tamanho + j)} |" for j in range(tamanho))
+            linhas.append(f"{i:>{largura}} |{casas}")
+            linhas.append(separador)
 
-        print("\n📍 Legenda: X = jogador 1, O = jogador 2 ou IA")
+        linhas += ["", "📍 Legenda: X = jogador 1, O = jogador 2 ou IA"]
 
         if mensagem:
-            print(f"\n💬 {mensagem}")
+            linhas += ["", f"💬 {mensagem}"]
 
-        print()
+        linhas.append("")
         
         # Informações específicas por modo
-        if modo_jogo in ['computador', 'ia'] and jogador_atual == 'O':
-            tipo_oponente = "🤖 IA Treinada" if modo_jogo == 'ia' else "🎲 Computador Random"
-            print(f"🎯 Vez do {tipo_oponente} ({jogador_atual}) - Pensando...")
-            print("⏳ Aguarde...")
+        if modo_jogo in ['computador', 'ia', 'perfeito', 'mcts'] and jogador_atual == 'O':
+            tipo_oponente = {
+                'ia': "🤖 IA Treinada",
+                'perfeito': "🧮 Solver Perfeito",
+                'mcts': "🌳 MCTS",
+            }.get(modo_jogo, "🎲 Computador Random")
+            linhas.append(f"🎯 Vez do {tipo_oponente} ({jogador_atual}) - Pensando...")
+            linhas.append("⏳ Aguarde...")
         elif modo_jogo == 'assistir':
             jogador_nome = "🎲 Computador Random" if jogador_atual == 'X' else "🤖 IA Treinada"
-            print(f"🎯 Vez do {jogador_nome} ({jogador_atual}) - Pensando...")
-            print("⏳ Pressione Ctrl+C para sair")
+            linhas.append(f"🎯 Vez do {jogador_nome} ({jogador_atual}) - Pensando...")
+            linhas.append("⏳ Pressione Ctrl+C para sair")
         elif modo_jogo != 'treino':
-            print(f"🎯 Vez do jogador {jogador_atual}")
-            print("📝 Digite: linha coluna (ex: 1 2) ou 'q' para sair")
+            linhas.append(f"🎯 Vez do jogador {jogador_atual}")
+            linhas.append("📝 Digite: linha coluna (ex: 1 2) ou 'q' para sair")
 
-        print("─" * 56)
+        linhas.append("─" * 56)
+        return linhas
     
     def exibir_menu_principal(self):
         """Exibe o menu principal do jogo"""
-        limpar_tela()
-        print("╔══════════════════════════════════════════════════════╗")
-        print("║                🎮 JOGO DA VELHA COM IA 🤖             ║")
-        print("╚══════════════════════════════════════════════════════╝")
-        print()
-        print("🎯 Escolha o modo de jogo:")
-        print()
-        print("  1️⃣  - 👥 Dois jogadores")
-        print("  2️⃣  - 👤 Humano vs 🎲 Computador (aleatório)")
-        print("  3️⃣  - 👤 Humano vs 🤖 IA Treinada")
-        print("  4️⃣  - 👀 Assistir: 🎲 Computador Random vs 🤖 IA")
-        print("  5️⃣  - 🧠 Treinar a IA")
-        print()
-        print("─" * 56)
+        tela_padrao.desenhar([
+            "╔══════════════════════════════════════════════════════╗",
+            "║                🎮 JOGO DA VELHA COM IA 🤖             ║",
+            "╚══════════════════════════════════════════════════════╝",
+            "",
+            "🎯 Escolha o modo de jogo:",
+            "",
+            "  1️⃣  - 👥 Dois jogadores",
+            "  2️⃣  - 👤 Humano vs 🎲 Computador (aleatório)",
+            "  3️⃣  - 👤 Humano vs 🤖 IA Treinada",
+            "  4️⃣  - 👀 Assistir: 🎲 Computador Random vs 🤖 IA",
+            "  5️⃣  - 🧠 Treinar a IA",
+            "  6️⃣  - 👤 Humano vs 🧮 Solver Perfeito (negamax)",
+            "  7️⃣  - 👤 Humano vs 🌳 MCTS (busca em árvore Monte Carlo)",
+            "",
+            "─" * 56,
+        ], limpar=True)
     
     def exibir_tela_treinamento(self, episodio, total_episodios, epsilon, vitorias_x, vitorias_o, empates):
         """
@@ -167,23 +287,29 @@ class Tabuleiro:
             vitorias_o (int): Número de vitórias do O
             empates (int): Número de empates
         """
+        linhas = [
+            "╔══════════════════════════════════════════════════════╗",
+            "║                🧠 TREINAMENTO DA IA 🤖                ║",
+            "╚══════════════════════════════════════════════════════╝",
+            "",
+            f"🚀 Iniciando treinamento com {total_episodios:,} episódios...",
+            "⏳ Isso pode levar alguns segundos...",
+            "",
+            "📊 Progresso do treinamento:",
+            "─" * 56,
+        ]
         if episodio == 1:
-            limpar_tela()
-            print("╔══════════════════════════════════════════════════════╗")
-            print("║                🧠 TREINAMENTO DA IA 🤖                ║")
-            print("╚══════════════════════════════════════════════════════╝")
-            print()
-            print(f"🚀 Iniciando treinamento com {total_episodios:,} episódios...")
-            print("⏳ Isso pode levar alguns segundos...")
-            print()
-            print("📊 Progresso do treinamento:")
-            print("─" * 56)
+            tela_padrao.desenhar(linhas, limpar=True)
         
+        # O bloco de progresso é redesenhado no lugar; só os números que mudaram são escritos
         if episodio % 1000 == 0:
             progresso = episodio / total_episodios * 100
             barra = "█" * int(progresso / 2) + "░" * (50 - int(progresso / 2))
             
-            print(f"📈 Episódio {episodio:,}/{total_episodios:,} [{barra}] {progresso:.1f}%")
-            print(f"🎯 Epsilon: {epsilon:.3f}")
-            print(f"📊 Últimos 1000: ❌{vitorias_x:3d} ⭕{vitorias_o:3d} 🤝{empates:3d}")
-            print("─" * 56)
\ No newline at end of file
+            linhas += [
+                f"📈 Episódio {episodio:,}/{total_episodios:,} [{barra}] {progresso:.1f}%",
+                f"🎯 Epsilon: {epsilon:.3f}",
+                f"📊 Últimos 1000: ❌{vitorias_x:3d} ⭕{vitorias_o:3d} 🤝{empates:3d}",
+                "─" * 56,
+            ]
+            tela_padrao.desenhar(linhas)
@@ -0,0 +1,57 @@
+"""
+Tabela pré-calculada com o resultado de todos os 3^9 tabuleiros possíveis
+"""
+
+from jogo.bitboard import BASE3, LINHAS_VITORIA, MASCARA_CHEIA, NUM_ESTADOS
+
+# Códigos de resultado armazenados na tabela
+EM_ANDAMENTO = 0
+VITORIA_X = 1
+VITORIA_O = 2
+EMPATE = 3
+
+# Símbolo do vencedor para cada código de resultado
+VENCEDOR_POR_RESULTADO = (None, 'X', 'O', None)
+
+
+def _vence(mascara):
+    for linha in LINHAS_VITORIA:
+        if mascara & linha == linha:
+            return True
+    return False
+
+
+def construir_tabela():
+    """
+    Calcula o resultado de cada codificação em base 3 do tabuleiro
+
+    Tabuleiros em que os dois jogadores têm linha completa não acontecem em
+    jogo real e são marcados como vitória de X.
+
+    Returns:
+        bytes: Tabela indexada por BitBoard.indice() com um código por estado
+    """
+    tabela = bytearray(NUM_ESTADOS)
+    for x in range(MASCARA_CHEIA + 1):
+        x_vence = _vence(x)
+        livres = MASCARA_CHEIA & ~x
+        # Percorre todos os submasks das casas livres como posições de O
+        o = livres
+        while True:
+            if x_vence:
+                resultado = VITORIA_X
+            elif _vence(o):
+                resultado = VITORIA_O
+            elif x | o == MASCARA_CHEIA:
+                resultado = EMPATE
+            else:
+                resultado = EM_ANDAMENTO
+            tabela[BASE3[x] + 2 * BASE3[o]] = resultado
+            if o == 0:
+                break
+            o = (o - 1) & livres
+    return bytes(tabela)
+
+
+# Construída uma única vez na importação (alguns milissegundos)
+RESULTADOS = construir_tabela()
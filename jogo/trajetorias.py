@@ -0,0 +1,284 @@
+"""
+Registro de trajetórias - partidas 3x3 gravadas em um arquivo só de acréscimo, 5 bytes cada
+
+Layout do arquivo (little-endian):
+
+    cabeçalho (16 bytes)  magic, versão e bytes por partida
+    partidas              um registro de 40 bits por partida: os 4 bits baixos guardam o
+                          número de jogadas e cada grupo de 4 bits seguinte uma casa jogada
+                          (0-8), em ordem, com X jogando primeiro
+
+O resultado não é gravado: ele é refeito a partir das jogadas. Um registro incompleto no
+fim do arquivo (escrita interrompida) é ignorado na leitura e descartado ao reabrir para
+gravar. Treino, arena e partidas ao vivo gravam no mesmo formato; treinar_offline
+reaplica o registro na Q-table com leituras por memmap, sem simular partidas de novo.
+"""
+
+import os
+import struct
+import time
+
+import numpy as np
+
+from agente.qlearning import LAMBDA_PADRAO
+from agente.formato_modelo import FormatoInvalido
+from jogo.bitboard import NUM_CASAS
+from jogo.treino_paralelo import resultados_finais
+from jogo.vecenv import alvos_td, contar_resultados
+
+MAGIC = b'TTTTRAJ\x00'
+VERSAO = 1
+BYTES_POR_PARTIDA = 5
+
+# Campos: magic, versão, bytes por partida
+_CABECALHO = struct.Struct('<8sHB5x')
+TAMANHO_CABECALHO = _CABECALHO.size
+
+
+def empacotar(jogadas, comprimentos):
+    """
+    Args:
+        jogadas (numpy.ndarray): Casas jogadas em ordem, (P, 9); as posições além do
+            comprimento são ignoradas
+        comprimentos (numpy.ndarray): Número de jogadas de cada partida, (P,)
+
+    Returns:
+        numpy.ndarray: Registros (P, BYTES_POR_PARTIDA) em uint8
+    """
+    comprimentos = np.asarray(comprimentos)
+    validas = np.arange(NUM_CASAS)[None, :] < comprimentos[:, None]
+    # 10 grupos de 4 bits por partida: comprimento e as 9 casas
+    grupos = np.empty((len(comprimentos), 2 * BYTES_POR_PARTIDA), dtype=np.uint8)
+    grupos[:, 0] = comprimentos
+    grupos[:, 1:] = np.where(validas, jogadas, 0)
+    return grupos[:, 0::2] | (grupos[:, 1::2] << 4)
+
+
+def desempacotar(registros):
+    """
+    Args:
+        registros (numpy.ndarray): Registros (P, BYTES_POR_PARTIDA) em uint8
+
+    Returns:
+        tuple: (jogadas, comprimentos) como arrays (P, 9) e (P,)
+
+    Raises:
+        FormatoInvalido: Registro com comprimento ou casa fora do intervalo
+    """
+    grupos = np.empty((len(registros), 2 * BYTES_POR_PARTIDA), dtype=np.uint8)
+    grupos[:, 0::2] = registros & 0x0F
+    grupos[:, 1::2] = registros >> 4
+    comprimentos = grupos[:, 0].astype(np.int64)
+    jogadas = grupos[:, 1:]
+    if (comprimentos > NUM_CASAS).any() or (jogadas >= NUM_CASAS).any():
+        raise FormatoInvalido("Registro de trajetória corrompido")
+    return jogadas, comprimentos
+
+
+def _ler_cabecalho(arquivo, caminho):
+    dados = arquivo.read(TAMANHO_CABECALHO)
+    if len(dados) < TAMANHO_CABECALHO:
+        raise FormatoInvalido(f"Registro de trajetórias truncado: {caminho}")
+    magic, versao, bytes_por_partida = _CABECALHO.unpack(dados)
+    if magic != MAGIC:
+        raise FormatoInvalido(f"Não é um registro de trajetórias: {caminho}")
+    if versao != VERSAO or bytes_por_partida != BYTES_POR_PARTIDA:
+        raise FormatoInvalido(f"Versão {versao} do registro de trajetórias não suportada")
+
+
+class GravadorTrajetorias:
+    """Acrescenta partidas a um registro de trajetórias, com escrita em blocos"""
+
+    def __init__(self, caminho, tamanho_buffer=1 << 16):
+        """
+        Abre (ou cria) o registro para acréscimo
+
+        Args:
+            caminho (str): Caminho do arquivo
+            tamanho_buffer (int): Bytes acumulados em memória entre escritas
+        """
+        self.caminho = caminho
+        self.tamanho_buffer = tamanho_buffer
+        self.partidas = 0
+        self._buffer = bytearray()
+        self._arquivo = open(caminho, 'a+b')
+        tamanho = self._arquivo.seek(0, os.SEEK_END)
+        if tamanho == 0:
+            self._arquivo.write(_CABECALHO.pack(MAGIC, VERSAO, BYTES_POR_PARTIDA))
+            self._arquivo.flush()
+        else:
+            self._arquivo.seek(0)
+            _ler_cabecalho(self._arquivo, caminho)
+            # Descarta um registro incompleto deixado por uma escrita interrompida
+            sobra = (tamanho - TAMANHO_CABECALHO) % BYTES_POR_PARTIDA
+            if sobra:
+                self._arquivo.truncate(tamanho - sobra)
+
+    def registrar(self, jogadas):
+        """
+        Acrescenta uma partida
+
+        Args:
+            jogadas (list): Casas jogadas (0-8) em ordem, X primeiro
+        """
+        valor = len(jogadas)
+        for numero, casa in enumerate(jogadas):
+            valor |= casa << (4 + 4 * numero)
+        self._buffer += valor.to_bytes(BYTES_POR_PARTIDA, 'little')
+        self.partidas += 1
+        if len(self._buffer) >= self.tamanho_buffer:
+            self.descarregar()
+
+    def registrar_lote(self, jogadas, comprimentos):
+        """
+        Acrescenta várias partidas
+
+        Args:
+            jogadas (numpy.ndarray): Casas jogadas em ordem, (P, 9)
+            comprimentos (numpy.ndarray): Número de jogadas de cada partida, (P,)
+        """
+        self._buffer += empacotar(jogadas, comprimentos).tobytes()
+        self.partidas += len(comprimentos)
+        if len(self._buffer) >= self.tamanho_buffer:
+            self.descarregar()
+
+    def registrar_bytes(self, dados):
+        """
+        Acrescenta registros já empacotados (por exemplo, vindos de outro processo)
+
+        Args:
+            dados (bytes): Registros de BYTES_POR_PARTIDA bytes cada
+        """
+        self._buffer += dados
+        self.partidas += len(dados) // BYTES_POR_PARTIDA
+        if len(self._buffer) >= self.tamanho_buffer:
+            self.descarregar()
+
+    def descarregar(self):
+        """Escreve no arquivo as partidas acumuladas em memória"""
+        if self._buffer:
+            self._arquivo.write(self._buffer)
+            self._arquivo.flush()
+            self._buffer.clear()
+
+    def tamanho(self):
+        """
+        Descarrega e devolve o tamanho do arquivo (ponto a restaurar com truncar)
+
+        Returns:
+            int: Bytes gravados no arquivo, com o cabeçalho
+        """
+        self.descarregar()
+        return self._arquivo.seek(0, os.SEEK_END)
+
+    def truncar(self, tamanho):
+        """
+        Descarta as partidas gravadas depois de um ponto, como as de um treino retomado
+        de um checkpoint anterior a elas
+
+        Args:
+            tamanho (int): Tamanho devolvido por tamanho()
+        """
+        self._buffer.clear()
+        if self._arquivo.seek(0, os.SEEK_END) > tamanho:
+            self._arquivo.truncate(tamanho)
+
+    def fechar(self):
+        """Descarrega e fecha o arquivo"""
+        if not self._arquivo.closed:
+            self.descarregar()
+            self._arquivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        self.fechar()
+
+
+def abrir_trajetorias(caminho):
+    """
+    Mapeia os registros do arquivo em memória, somente leitura
+
+    Args:
+        caminho (str): Caminho do registro de trajetórias
+
+    Returns:
+        numpy.ndarray: Registros (P, BYTES_POR_PARTIDA) em uint8, lidos sob demanda
+    """
+    with open(caminho, 'rb') as f:
+        _ler_cabecalho(f, caminho)
+        tamanho = f.seek(0, os.SEEK_END)
+    num_partidas = (tamanho - TAMANHO_CABECALHO) // BYTES_POR_PARTIDA
+    if num_partidas == 0:
+        return np.zeros((0, BYTES_POR_PARTIDA), dtype=np.uint8)
+    return np.memmap(caminho, dtype=np.uint8, mode='r', offset=TAMANHO_CABECALHO,
+                     shape=(num_partidas, BYTES_POR_PARTIDA))
+
+
+def iterar_blocos(registros, tamanho_bloco=65536, rng=None):
+    """
+    Percorre os registros em blocos decodificados
+
+    Args:
+        registros (numpy.ndarray): Registros de abrir_trajetorias
+        tamanho_bloco (int): Partidas por bloco
+        rng (numpy.random.Generator or None): Se informado, sorteia a ordem dos blocos e
+            das partidas dentro de cada bloco; None percorre na ordem do arquivo
+
+    Yields:
+        tuple: (jogadas, comprimentos) de cada bloco
+    """
+    inicios = np.arange(0, len(registros), tamanho_bloco)
+    if rng is not None:
+        rng.shuffle(inicios)
+    for inicio in inicios:
+        bloco = np.array(registros[inicio:inicio + tamanho_bloco])
+        if rng is not None:
+            bloco = bloco[rng.permutation(len(bloco))]
+        yield desempacotar(bloco)
+
+
+def treinar_offline(agente, caminho, epocas=1, tamanho_bloco=65536, lambda_td=LAMBDA_PADRAO,
+                    seed=None, ao_concluir=None):
+    """
+    Treina o agente reaplicando as partidas de um registro de trajetórias
+
+    Cada bloco recebe a mesma atualização de fim de partida de treinar_vetorizado
+    (alvos de TD(lambda) sobre a Q-table atual e update_q_values_batch), então o mesmo
+    registro pode ser reaproveitado com outros alpha, gamma e lambda. Epsilon não muda.
+
+    Args:
+        agente (QLearningAgent): Agente com backend 'numpy' (tabuleiro 3x3)
+        caminho (str): Registro de trajetórias
+        epocas (int): Passadas completas pelo registro
+        tamanho_bloco (int): Partidas por atualização em lote
+        lambda_td (float): Lambda dos alvos de TD (0 = TD(0), 1 = Monte Carlo)
+        seed (int or None): Se informada, embaralha a ordem das partidas a cada época
+        ao_concluir (callable or None): Chamado após cada bloco, como
+            ao_concluir(partidas_concluidas, vitorias_x, vitorias_o, empates) do bloco
+
+    Returns:
+        dict: partidas (do registro), epocas, atualizacoes (jogadas aplicadas) e segundos
+    """
+    if agente.backend != 'numpy' or not agente.geometria.padrao:
+        raise ValueError("O treino offline requer um QLearningAgent 3x3 com backend 'numpy'")
+    registros = abrir_trajetorias(caminho)
+    rng = np.random.default_rng(seed) if seed is not None else None
+    inicio = time.perf_counter()
+    concluidas = 0
+    atualizacoes = 0
+    for _ in range(epocas):
+        for jogadas, comprimentos in iterar_blocos(registros, tamanho_bloco, rng):
+            resultados = resultados_finais(jogadas, comprimentos)
+            agente.update_q_values_batch(*alvos_td(agente, jogadas, comprimentos, resultados, lambda_td))
+            concluidas += len(comprimentos)
+            atualizacoes += int(comprimentos.sum())
+            if ao_concluir is not None:
+                ao_concluir(concluidas, *contar_resultados(resultados))
+    return {
+        'partidas': len(registros),
+        'epocas': epocas,
+        'atualizacoes': atualizacoes,
+        'segundos': time.perf_counter() - inicio,
+    }
@@ -0,0 +1,257 @@
+"""
+Treinamento ator-aprendiz - vários processos geram partidas e um aprendiz atualiza a Q-table
+"""
+
+import ctypes
+import multiprocessing as mp
+import os
+import queue
+
+import numpy as np
+
+from agente.qlearning import LAMBDA_PADRAO, QLearningAgent
+from jogo.bitboard import NUM_CASAS, NUM_ESTADOS
+from jogo.vecenv import (
+    POTENCIAS_3, RESULTADOS_NP, AmbienteVetorizado, alvos_td, contar_resultados,
+)
+
+# Cada partida trafega como 1 byte de comprimento + 9 bytes de jogadas
+BYTES_POR_PARTIDA = 1 + NUM_CASAS
+
+
+def empacotar_partidas(jogadas, comprimentos):
+    """
+    Serializa partidas no formato compacto enviado pelos atores
+
+    Args:
+        jogadas (numpy.ndarray): Casas jogadas em ordem, (P, 9)
+        comprimentos (numpy.ndarray): Número de jogadas de cada partida, (P,)
+
+    Returns:
+        bytes: P registros de BYTES_POR_PARTIDA bytes
+    """
+    registros = np.empty((len(comprimentos), BYTES_POR_PARTIDA), dtype=np.uint8)
+    registros[:, 0] = comprimentos
+    registros[:, 1:] = jogadas
+    return registros.tobytes()
+
+
+def desempacotar_partidas(dados):
+    """
+    Args:
+        dados (bytes): Registros gerados por empacotar_partidas
+
+    Returns:
+        tuple: (jogadas, comprimentos) como arrays
+    """
+    registros = np.frombuffer(dados, dtype=np.uint8).reshape(-1, BYTES_POR_PARTIDA)
+    return registros[:, 1:], registros[:, 0].astype(np.int64)
+
+
+def resultados_finais(jogadas, comprimentos):
+    """
+    Args:
+        jogadas (numpy.ndarray): Casas jogadas em ordem, (P, 9); X joga primeiro
+        comprimentos (numpy.ndarray): Número de jogadas de cada partida, (P,)
+
+    Returns:
+        numpy.ndarray: Código de jogo.terminal do tabuleiro final de cada partida
+    """
+    ordem = np.arange(NUM_CASAS)
+    validas = ordem[None, :] < comprimentos[:, None]
+    digito = np.where(ordem % 2 == 0, 1, 2)
+    contribuicao = POTENCIAS_3[jogadas.astype(np.intp)] * digito[None, :]
+    return RESULTADOS_NP[np.where(validas, contribuicao, 0).sum(axis=1)]
+
+
+def _executar_ator(semente, config, compartilhado, fila, parar):
+    """
+    Laço de um processo ator: joga em lote contra o snapshot mais recente da Q-table
+
+    Args:
+        semente (numpy.random.SeedSequence): Semente própria do ator
+        config (dict): num_jogos, partidas_por_envio e simetria
+        compartilhado (tuple): (q_compartilhada, versao, epsilon, trava) do aprendiz
+        fila (multiprocessing.Queue): Destino dos lotes de partidas empacotadas
+        parar (multiprocessing.Event): Sinal de encerramento
+    """
+    q_compartilhada, versao, epsilon, trava = compartilhado
+    snapshot = np.frombuffer(q_compartilhada, dtype=np.float32).reshape(NUM_ESTADOS, NUM_CASAS)
+
+    agente = QLearningAgent(backend='numpy', simetria=config['simetria'])
+    ambiente = AmbienteVetorizado(config['num_jogos'], seed=semente)
+    versao_local = -1
+
+    while not parar.is_set():
+        if versao.value != versao_local:
+            with trava:
+                np.copyto(agente.q_table, snapshot)
+                agente.epsilon = epsilon.value
+                versao_local = versao.value
+
+        pendentes = []
+        total = 0
+        while total < config['partidas_por_envio']:
+            ambiente.passo(ambiente.escolher_acoes(agente, training=True))
+            if ambiente.partidas_terminadas is not None:
+                jogadas, comprimentos, _ = ambiente.partidas_terminadas
+                pendentes.append(empacotar_partidas(jogadas, comprimentos))
+                total += len(comprimentos)
+
+        try:
+            fila.put(b''.join(pendentes), timeout=1.0)
+        except queue.Full:
+            continue
+
+
+def _receber(fila, atores, espera=1.0):
+    """
+    Próximo envio dos atores, conferindo se algum deles morreu
+
+    Atores só terminam depois do pedido de encerramento; um ator que saiu antes (exceção,
+    morto pelo sistema) nunca mais envia e deixaria o aprendiz esperando para sempre.
+
+    Raises:
+        RuntimeError: Um ator terminou durante o treino
+    """
+    while True:
+        for ator in atores:
+            if ator.exitcode is not None:
+                raise RuntimeError(
+                    f"O ator {ator.name} terminou durante o treino (código {ator.exitcode})"
+                )
+        try:
+            return fila.get(timeout=espera)
+        except queue.Empty:
+            continue
+
+
+def treinar_paralelo(agente, num_episodios, num_atores=None, num_jogos=1024,
+                     partidas_por_envio=4096, intervalo_snapshot=20000, seed=None,
+                     ao_concluir=None, lambda_td=LAMBDA_PADRAO, parar=None, gravador=None,
+                     checkpoint=None):
+    """
+    Treina o agente com atores em processos separados e o aprendiz no processo atual
+
+    Cada ator roda um AmbienteVetorizado com sua própria semente contra uma cópia da
+    Q-table, lida de memória compartilhada sempre que o aprendiz publica um snapshot novo.
+    As partidas chegam empacotadas (10 bytes cada) por uma fila e o aprendiz aplica a mesma
+    atualização de fim de partida de treinar_vetorizado, com alvos de TD(lambda) calculados
+    sobre a sua própria Q-table.
+
+    Args:
+        agente (QLearningAgent): Agente com backend 'numpy', atualizado no lugar
+        num_episodios (int): Número de partidas a aprender
+        num_atores (int or None): Processos atores; None usa os.cpu_count() - 1 (mínimo 1)
+        num_jogos (int): Partidas simultâneas em cada ator
+        partidas_por_envio (int): Partidas acumuladas por ator antes de cada envio
+        intervalo_snapshot (int): Partidas aprendidas entre publicações de snapshot
+        seed (int or None): Semente base; cada ator recebe uma derivada independente
+        ao_concluir (callable or None): Chamado a cada lote recebido, como
+            ao_concluir(episodios_concluidos, vitorias_x, vitorias_o, empates) do lote
+        lambda_td (float): Lambda dos alvos de TD (0 = TD(0), 1 = Monte Carlo)
+        parar (callable or None): Chamado como parar(episodios_concluidos) após cada lote
+            aprendido; se devolver True o treino termina antes de num_episodios
+        gravador (GravadorTrajetorias or None): Recebe as partidas aprendidas (ver
+            jogo.trajetorias)
+        checkpoint (CheckpointTreino or None): Grava o estado do aprendiz após os lotes
+            (ver jogo.checkpoint); se foi retomado, o aprendiz continua do episódio e dos
+            totais gravados e os atores recebem sementes derivadas também desse episódio
+
+    Returns:
+        tuple: (vitorias_x, vitorias_o, empates) acumulados
+
+    Raises:
+        RuntimeError: Um ator morreu antes do fim do treino
+    """
+    if agente.backend != 'numpy':
+        raise ValueError("O treino paralelo requer um QLearningAgent com backend 'numpy'")
+    if num_atores is None:
+        num_atores = max(1, (os.cpu_count() or 2) - 1)
+    concluidos = 0
+    totais = [0, 0, 0]
+    if checkpoint is not None:
+        concluidos = checkpoint.episodio
+        totais = list(checkpoint.totais)
+
+    q_compartilhada = mp.RawArray(ctypes.c_float, NUM_ESTADOS * NUM_CASAS)
+    snapshot = np.frombuffer(q_compartilhada, dtype=np.float32).reshape(NUM_ESTADOS, NUM_CASAS)
+    versao = mp.RawValue(ctypes.c_long, 0)
+    epsilon = mp.RawValue(ctypes.c_double, agente.epsilon)
+    trava = mp.Lock()
+    fila = mp.Queue(maxsize=4 * num_atores)
+    encerrar = mp.Event()
+
+    def publicar():
+        with trava:
+            np.copyto(snapshot, agente.q_table)
+            epsilon.value = agente.epsilon
+            versao.value += 1
+
+    publicar()
+    config = {
+        'num_jogos': num_jogos,
+        'partidas_por_envio': partidas_por_envio,
+        'simetria': agente.simetria,
+    }
+    # Um treino retomado não repete as partidas que os atores jogaram antes do checkpoint
+    raiz = np.random.SeedSequence(seed, spawn_key=(concluidos,) if concluidos else ())
+    sementes = raiz.spawn(num_atores)
+    atores = [
+        mp.Process(
+            target=_executar_ator,
+            args=(sementes[i], config, (q_compartilhada, versao, epsilon, trava), fila, encerrar),
+            daemon=True,
+        )
+        for i in range(num_atores)
+    ]
+    for ator in atores:
+        ator.start()
+
+    ultimo_snapshot = concluidos
+    try:
+        while concluidos < num_episodios:
+            jogadas, comprimentos = desempacotar_partidas(_receber(fila, atores))
+            restantes = num_episodios - concluidos
+            jogadas, comprimentos = jogadas[:restantes], comprimentos[:restantes]
+            if gravador is not None:
+                gravador.registrar_lote(jogadas, comprimentos)
+
+            # O resultado é refeito a partir das jogadas, que é tudo o que o ator envia
+            resultados = resultados_finais(jogadas, comprimentos)
+            agente.update_q_values_batch(*alvos_td(agente, jogadas, comprimentos, resultados, lambda_td))
+            agente.decay_epsilon(len(comprimentos))
+
+            lote = contar_resultados(resultados)
+            for i in range(3):
+                totais[i] += lote[i]
+            concluidos += len(comprimentos)
+            if concluidos - ultimo_snapshot >= intervalo_snapshot:
+                publicar()
+                ultimo_snapshot = concluidos
+            if ao_concluir is not None:
+                ao_concluir(concluidos, *lote)
+            if parar is not None and parar(concluidos):
+                if checkpoint is not None:
+                    checkpoint.salvar(concluidos, totais)
+                break
+            if checkpoint is not None and checkpoint(concluidos, totais):
+                break
+    finally:
+        encerrar.set()
+        # Esvazia a fila para que atores bloqueados em put() consigam sair; depois de uma
+        # falha, os atores restantes são terminados (um morto pode ter deixado a trava presa)
+        falhou = any(ator.exitcode not in (None, 0) for ator in atores)
+        while any(ator.is_alive() for ator in atores):
+            if falhou:
+                for ator in atores:
+                    ator.terminate()
+            try:
+                fila.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        for ator in atores:
+            ator.join()
+
+    return tuple(totais)
+
@@ -0,0 +1,320 @@
+"""
+Ambiente vetorizado - N partidas simultâneas em arrays NumPy para self-play em lote
+"""
+
+import numpy as np
+
+from agente.qlearning import DO_CANONICO, LAMBDA_PADRAO, tabelas_simetria_np
+from jogo.bitboard import NUM_CASAS
+from jogo.terminal import EM_ANDAMENTO, RESULTADOS, VITORIA_O, VITORIA_X
+
+# Peso em base 3 de cada casa e resultado de cada índice como arrays
+POTENCIAS_3 = 3 ** np.arange(NUM_CASAS, dtype=np.int64)
+RESULTADOS_NP = np.frombuffer(RESULTADOS, dtype=np.uint8)
+# DO_CANONICO_NP[t][pos]: casa original levada para pos pela transformação t
+DO_CANONICO_NP = np.array(DO_CANONICO, dtype=np.intp)
+
+# Valores das casas/jogadores dentro do ambiente (mesmos dígitos do índice em base 3)
+VAZIO = 0
+JOGADOR_X = 1
+JOGADOR_O = 2
+
+def acoes_gulosas(agente, indices, legal):
+    """
+    Jogada de maior valor Q em cada estado, com o argmax mascarado pelas casas vazias
+
+    Args:
+        agente (QLearningAgent): Agente com backend 'numpy'
+        indices (numpy.ndarray): Índices em base 3 dos estados, (N,)
+        legal (numpy.ndarray): Casas vazias de cada estado, (N, 9)
+
+    Returns:
+        numpy.ndarray: Casa escolhida (0-8) para cada estado
+    """
+    if agente.backend != 'numpy':
+        raise ValueError("O ambiente vetorizado requer um QLearningAgent com backend 'numpy'")
+    if agente.simetria:
+        canonico, transformacao, _ = tabelas_simetria_np()
+        # argmax nas coordenadas canônicas, como choose_action (mesmo desempate), com a
+        # casa escolhida levada de volta às coordenadas de cada partida
+        do_canonico = DO_CANONICO_NP[transformacao[indices]]
+        legal_canonico = np.take_along_axis(legal, do_canonico, axis=1)
+        escolhidas = np.where(legal_canonico, agente.q_table[canonico[indices]], -np.inf).argmax(axis=1)
+        return np.take_along_axis(do_canonico, escolhidas[:, None], axis=1)[:, 0]
+    return np.where(legal, agente.q_table[indices], -np.inf).argmax(axis=1)
+
+
+class AmbienteVetorizado:
+    """Conjunto de N partidas de Jogo da Velha avançadas juntas, com reinício automático"""
+
+    def __init__(self, num_jogos, seed=None):
+        """
+        Inicializa o ambiente
+
+        Args:
+            num_jogos (int): Número de partidas simultâneas
+            seed (int or None): Semente do gerador aleatório do ambiente
+        """
+        self.num_jogos = num_jogos
+        self.rng = np.random.default_rng(seed)
+        self.casas = np.zeros((num_jogos, NUM_CASAS), dtype=np.int8)
+        self.indices = np.zeros(num_jogos, dtype=np.int64)
+        self.jogador = np.full(num_jogos, JOGADOR_X, dtype=np.int8)
+        self.num_jogadas = np.zeros(num_jogos, dtype=np.int64)
+        # Casas jogadas em ordem em cada partida em andamento
+        self.jogadas = np.zeros((num_jogos, NUM_CASAS), dtype=np.int8)
+        # (jogadas, comprimentos, resultados) das partidas encerradas no último passo
+        self.partidas_terminadas = None
+        self._linhas = np.arange(num_jogos)
+
+    def reiniciar(self, selecao=None):
+        """
+        Volta partidas ao tabuleiro vazio com X para jogar
+
+        Args:
+            selecao (numpy.ndarray or None): Máscara booleana das partidas; None reinicia todas
+        """
+        if selecao is None:
+            selecao = slice(None)
+        self.casas[selecao] = VAZIO
+        self.indices[selecao] = 0
+        self.jogador[selecao] = JOGADOR_X
+        self.num_jogadas[selecao] = 0
+
+    def estado(self):
+        """
+        Returns:
+            dict: Cópia das partidas em andamento e do estado do gerador, para checkpoints
+        """
+        return {
+            'casas': self.casas.copy(),
+            'indices': self.indices.copy(),
+            'jogador': self.jogador.copy(),
+            'num_jogadas': self.num_jogadas.copy(),
+            'jogadas': self.jogadas.copy(),
+            'rng': self.rng.bit_generator.state,
+        }
+
+    def restaurar(self, estado):
+        """
+        Volta às partidas e ao gerador de um estado devolvido por estado()
+
+        Args:
+            estado (dict): Estado de um ambiente com o mesmo número de partidas
+        """
+        if len(estado['casas']) != self.num_jogos:
+            raise ValueError(
+                f"Estado de {len(estado['casas'])} partidas para um ambiente de {self.num_jogos}"
+            )
+        for nome in ('casas', 'indices', 'jogador', 'num_jogadas', 'jogadas'):
+            setattr(self, nome, estado[nome].copy())
+        self.rng.bit_generator.state = estado['rng']
+
+    def mascara_legal(self):
+        """
+        Returns:
+            numpy.ndarray: Array booleano (N, 9) com as casas vazias de cada partida
+        """
+        return self.casas == VAZIO
+
+    def escolher_acoes(self, agente, training=True):
+        """
+        Escolhe uma jogada por partida com epsilon-greedy sobre a Q-table do agente
+
+        Args:
+            agente (QLearningAgent): Agente com backend 'numpy'
+            training (bool): Se True, explora com probabilidade agente.epsilon
+
+        Returns:
+            numpy.ndarray: Casa escolhida (0-8) para cada partida
+        """
+        legal = self.mascara_legal()
+        gulosas = acoes_gulosas(agente, self.indices, legal)
+
+        if not training:
+            return gulosas
+
+        # Jogada aleatória uniforme entre as casas vazias: argmax de ruído mascarado
+        aleatorias = np.where(legal, self.rng.random(legal.shape), -1.0).argmax(axis=1)
+        explorar = self.rng.random(self.num_jogos) < agente.epsilon
+        return np.where(explorar, aleatorias, gulosas)
+
+    def passo(self, acoes):
+        """
+        Aplica uma jogada em cada partida e reinicia as que terminaram
+
+        Args:
+            acoes (numpy.ndarray): Casa (0-8) jogada em cada partida; precisa estar vazia
+
+        Returns:
+            numpy.ndarray: Código de jogo.terminal de cada partida após a jogada
+                (partidas com código diferente de EM_ANDAMENTO já foram reiniciadas)
+        """
+        self.casas[self._linhas, acoes] = self.jogador
+        self.jogadas[self._linhas, self.num_jogadas] = acoes
+        self.indices += POTENCIAS_3[acoes] * self.jogador
+        self.num_jogadas += 1
+        self.jogador = (3 - self.jogador).astype(np.int8)
+
+        resultados = RESULTADOS_NP[self.indices]
+        terminadas = resultados != EM_ANDAMENTO
+        if terminadas.any():
+            self.partidas_terminadas = (
+                self.jogadas[terminadas].copy(),
+                self.num_jogadas[terminadas].copy(),
+                resultados[terminadas],
+            )
+            self.reiniciar(terminadas)
+        else:
+            self.partidas_terminadas = None
+        return resultados
+
+
+def _estados_das_partidas(jogadas, comprimentos):
+    """
+    Returns:
+        tuple: (estados, jogadas, validas), arrays (P, 9) com o índice em base 3 antes de
+            cada jogada, as casas como índices e a máscara das jogadas existentes
+    """
+    jogadas = jogadas.astype(np.intp)
+    ordem = np.arange(NUM_CASAS)
+    validas = ordem[None, :] < comprimentos[:, None]
+
+    # X joga nas posições pares da partida (dígito 1) e O nas ímpares (dígito 2)
+    digito = np.where(ordem % 2 == 0, JOGADOR_X, JOGADOR_O)
+    contribuicao = np.where(validas, POTENCIAS_3[jogadas] * digito[None, :], 0)
+    estados = np.cumsum(contribuicao, axis=1) - contribuicao
+    return estados, jogadas, validas
+
+
+def _recompensas_finais(resultados):
+    """Recompensa (1, 0 ou -1) de quem fez cada jogada da partida, (P, 9)"""
+    ordem = np.arange(NUM_CASAS)
+    sinal_x = np.where(resultados == VITORIA_X, 1.0, np.where(resultados == VITORIA_O, -1.0, 0.0))
+    return np.where(ordem % 2 == 0, 1.0, -1.0)[None, :] * sinal_x[:, None]
+
+
+def alvos_td(agente, jogadas, comprimentos, resultados, lambda_td):
+    """
+    Alvos de TD(lambda) de cada jogada, calculados de trás para frente para cada jogador
+
+    A próxima decisão de quem fez a jogada t vem na jogada t + 2. A última jogada de cada
+    jogador tem como alvo a recompensa final; as anteriores,
+    G_t = gamma * ((1 - lambda) * max_a Q(s_t+2, a) + lambda * G_t+2).
+    lambda = 0 é o TD(0) de um passo e lambda = 1 o retorno de Monte Carlo descontado.
+
+    Args:
+        agente (QLearningAgent): Agente com backend 'numpy' (fornece gamma e os valores Q)
+        jogadas (numpy.ndarray): Casas jogadas em ordem, (P, 9); X joga primeiro
+        comprimentos (numpy.ndarray): Número de jogadas de cada partida, (P,)
+        resultados (numpy.ndarray): Código de jogo.terminal de cada partida, (P,)
+        lambda_td (float): Peso entre o valor estimado (0) e o retorno observado (1)
+
+    Returns:
+        tuple: (estados, casas, alvos) achatados, com o índice em base 3 antes de cada
+            jogada, a casa jogada e o alvo de quem jogou
+    """
+    estados, jogadas, validas = _estados_das_partidas(jogadas, comprimentos)
+    alvos = _recompensas_finais(resultados)
+    ordem = np.arange(NUM_CASAS)
+    # A jogada t tem sucessora do mesmo jogador se a partida passou da jogada t + 2
+    seguintes = (ordem[None, :] + 2 < comprimentos[:, None])[:, :-2]
+
+    valores = np.zeros((len(comprimentos), NUM_CASAS - 2))
+    if lambda_td < 1.0:
+        valores[seguintes] = agente.valores_maximos(estados[:, 2:][seguintes])
+
+    gamma = agente.gamma
+    for t in range(NUM_CASAS - 3, -1, -1):
+        retorno = gamma * ((1.0 - lambda_td) * valores[:, t] + lambda_td * alvos[:, t + 2])
+        alvos[:, t] = np.where(seguintes[:, t], retorno, alvos[:, t])
+    return estados[validas], jogadas[validas], alvos[validas]
+
+
+def treinar_vetorizado(agente, num_episodios, num_jogos=1024, seed=None, ao_concluir=None,
+                       lambda_td=LAMBDA_PADRAO, parar=None, gravador=None, checkpoint=None):
+    """
+    Self-play em lote com a mesma regra de atualização de JogoDaVelha.treinar_ia
+
+    Ao fim de cada partida, cada jogada recebe Q(s, a) += alpha * (G - Q(s, a)), com G o
+    alvo de TD(lambda) do ponto de vista de quem jogou (ver alvos_td e
+    QLearningAgent.update_q_values_batch para pares repetidos no mesmo lote).
+
+    Args:
+        agente (QLearningAgent): Agente com backend 'numpy'
+        num_episodios (int): Número de partidas a concluir
+        num_jogos (int): Número de partidas simultâneas
+        seed (int or None): Semente do ambiente
+        ao_concluir (callable or None): Chamado após cada lote com partidas terminadas, como
+            ao_concluir(episodios_concluidos, vitorias_x, vitorias_o, empates) do lote
+        lambda_td (float): Lambda dos alvos de TD (0 = TD(0), 1 = Monte Carlo)
+        parar (callable or None): Chamado como parar(episodios_concluidos) após cada lote;
+            se devolver True o treino termina antes de num_episodios
+        gravador (GravadorTrajetorias or None): Recebe as partidas concluídas (ver
+            jogo.trajetorias)
+        checkpoint (CheckpointTreino or None): Grava o estado após os lotes (ver
+            jogo.checkpoint); se foi retomado, o treino continua do episódio, dos totais e
+            das partidas em andamento gravados
+
+    Returns:
+        tuple: (vitorias_x, vitorias_o, empates) acumulados
+    """
+    ambiente = AmbienteVetorizado(num_jogos, seed)
+    concluidos = 0
+    totais = [0, 0, 0]
+    if checkpoint is not None:
+        checkpoint.restaurar_ambiente(ambiente)
+        concluidos = checkpoint.episodio
+        totais = list(checkpoint.totais)
+    while concluidos < num_episodios:
+        # Só um lote que termine mais partidas que as restantes passa do total: perto do fim
+        # o ambiente é copiado antes de cada passo
+        antes = None
+        if checkpoint is not None and num_episodios - concluidos < num_jogos:
+            antes = ambiente.estado()
+        ambiente.passo(ambiente.escolher_acoes(agente, training=True))
+        if ambiente.partidas_terminadas is None:
+            continue
+
+        # Excedentes do último lote não contam nem atualizam a tabela
+        restantes = num_episodios - concluidos
+        excedeu = len(ambiente.partidas_terminadas[2]) > restantes
+        if excedeu and antes is not None:
+            # O checkpoint final fica antes do lote cortado: retomado com mais episódios,
+            # o treino joga o lote inteiro, como um treino que não tivesse parado
+            checkpoint.salvar(concluidos, totais, estado_ambiente=antes)
+        jogadas, comprimentos, resultados = (a[:restantes] for a in ambiente.partidas_terminadas)
+        if gravador is not None:
+            gravador.registrar_lote(jogadas, comprimentos)
+        agente.update_q_values_batch(*alvos_td(agente, jogadas, comprimentos, resultados, lambda_td))
+        agente.decay_epsilon(len(resultados))
+
+        lote = contar_resultados(resultados)
+        for i in range(3):
+            totais[i] += lote[i]
+        concluidos += len(resultados)
+        if ao_concluir is not None:
+            ao_concluir(concluidos, *lote)
+        if excedeu:
+            break
+        if parar is not None and parar(concluidos):
+            if checkpoint is not None:
+                checkpoint.salvar(concluidos, totais, ambiente)
+            break
+        if checkpoint is not None and checkpoint(concluidos, totais, ambiente):
+            break
+
+    return tuple(totais)
+
+
+def contar_resultados(resultados):
+    """
+    Args:
+        resultados (numpy.ndarray): Códigos de jogo.terminal de partidas encerradas
+
+    Returns:
+        tuple: (vitorias_x, vitorias_o, empates)
+    """
+    vitorias_x = int(np.count_nonzero(resultados == VITORIA_X))
+    vitorias_o = int(np.count_nonzero(resultados == VITORIA_O))
+    return vitorias_x, vitorias_o, len(resultados) - vitorias_x - vitorias_o
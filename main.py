@@ -1,13 +1,476 @@
 """
 Ponto de entrada principal do Jogo da Velha com IA
+
+Sem argumentos abre o menu interativo. Subcomandos permitem rodar tarefas sem
+interação, por exemplo:
+
+    python main.py train --episodes 100000 --out modelos/qlearning_model.pkl
+    python main.py arena aleatorio perfeito modelos/qlearning_model.qtab --partidas 1000000
+    python main.py servir --porta 8765
+    python main.py train --episodes 1000000 --ambientes 1024 --trajetorias partidas.traj
+    python main.py train --episodes 50000000 --ambientes 1024 --checkpoint ckpt --retomar
+    python main.py replay partidas.traj --epocas 3 --alpha 0.05 --out modelos/offline.qtab
+    python main.py compilar --out modelos/qlearning_model.pol
 """
 
+import argparse
+import json
+import os
+import sys
+
+from agente.qlearning import LAMBDA_PADRAO
 from jogo.motor import JogoDaVelha
+from utils.arquivos import escrita_atomica
+
+# Códigos de saída dos subcomandos
+SAIDA_OK = 0
+SAIDA_ERRO = 1
+SAIDA_INTERROMPIDO = 130
+# Treino encerrado por SIGTERM, com o estado só no checkpoint (128 + SIGTERM)
+SAIDA_TERMINADO = 143
+
+
+def adicionar_opcoes_tabuleiro(parser, padrao):
+    """
+    Opções de tamanho do tabuleiro, aceitas antes ou depois do subcomando
+
+    Args:
+        parser (argparse.ArgumentParser): Parser que recebe as opções
+        padrao (dict or str): Valores padrão por opção, ou argparse.SUPPRESS para não
+            sobrescrever o valor já lido pelo parser principal
+    """
+    parser.add_argument('--tamanho', type=int,
+                        default=padrao if padrao is argparse.SUPPRESS else padrao['tamanho'],
+                        help="Linhas e colunas do tabuleiro (padrão: 3)")
+    parser.add_argument('--em-linha', type=int,
+                        default=padrao if padrao is argparse.SUPPRESS else padrao['em_linha'],
+                        help="Peças seguidas para vencer (padrão: 3)")
+
+
+def adicionar_opcao_trajetorias(parser, padrao):
+    """
+    Opção do registro de trajetórias, aceita antes ou depois do subcomando
+
+    Args:
+        parser (argparse.ArgumentParser): Parser que recebe a opção
+        padrao (None or str): Valor padrão, ou argparse.SUPPRESS (ver adicionar_opcoes_tabuleiro)
+    """
+    parser.add_argument('--trajetorias', metavar='ARQUIVO', default=padrao,
+                        help="Acrescenta as partidas jogadas a um registro de trajetórias (só 3x3)")
+
+
+def criar_parser():
+    """
+    Monta o parser de argumentos da linha de comando
+
+    Returns:
+        argparse.ArgumentParser: Parser com os subcomandos disponíveis
+    """
+    parser = argparse.ArgumentParser(description="Jogo da Velha com IA (Q-Learning)")
+    adicionar_opcoes_tabuleiro(parser, {'tamanho': 3, 'em_linha': 3})
+    adicionar_opcao_trajetorias(parser, None)
+    subcomandos = parser.add_subparsers(dest='comando')
+
+    treino = subcomandos.add_parser(
+        'train', aliases=['treinar'],
+        help="Treina a IA sem interação e salva o modelo"
+    )
+    treino.add_argument('--episodes', '--episodios', dest='episodios', type=int, default=10000,
+                        help="Número de episódios de self-play (padrão: 10000)")
+    treino.add_argument('--out', '--saida', dest='saida', default=None,
+                        help="Caminho do modelo salvo (padrão: o mesmo do menu)")
+    treino.add_argument('--ambientes', type=int, default=None,
+                        help="Partidas simultâneas no ambiente vetorizado")
+    treino.add_argument('--processos', type=int, default=None,
+                        help="Processos atores no treino paralelo")
+    treino.add_argument('--seed', type=int, default=None, help="Semente do treino")
+    treino.add_argument('--lambda', dest='lambda_td', type=float, default=LAMBDA_PADRAO,
+                        help="Lambda dos alvos de TD: 0 = TD(0), 1 = Monte Carlo, que dispensa "
+                             "as consultas de valor dos estados seguintes; no 3x3 vetorizado, "
+                             "fração de posições com jogada gulosa não ótima de 0.037 em 20k "
+                             "episódios e 0.012 em 100k com lambda 1 "
+                             f"(padrão: {LAMBDA_PADRAO:g})")
+    treino.add_argument('--tipo-valor', choices=('float32', 'float16', 'int8'), default='float32',
+                        help="Tipo dos valores no modelo binário (padrão: float32)")
+    treino.add_argument('--esparso', action='store_true',
+                        help="Grava só os estados visitados no modelo binário")
+    treino.add_argument('--intervalo-progresso', type=float, default=5.0,
+                        help="Segundos entre linhas de progresso (padrão: 5)")
+    treino.add_argument('--convergencia', action='store_true',
+                        help="Para antes de --episodes quando a política converge (só 3x3)")
+    treino.add_argument('--intervalo-avaliacao', type=int, default=20000,
+                        help="Com --convergencia, episódios entre avaliações (padrão: 20000)")
+    treino.add_argument('--limite-derrotas', type=float, default=0.01,
+                        help="Com --convergencia, taxa máxima de derrotas contra o solver "
+                             "perfeito (padrão: 0.01)")
+    treino.add_argument('--limite-variacao', type=float, default=0.05,
+                        help="Com --convergencia, variação média máxima de Q entre avaliações "
+                             "(padrão: 0.05)")
+    treino.add_argument('--verificacoes', type=int, default=3,
+                        help="Com --convergencia, avaliações seguidas dentro dos limites "
+                             "para parar (padrão: 3)")
+    treino.add_argument('--checkpoint', metavar='PASTA', default=None,
+                        help="Grava checkpoints periódicos do treino nessa pasta")
+    treino.add_argument('--checkpoint-episodios', dest='checkpoint_episodios', type=int,
+                        default=100000,
+                        help="Com --checkpoint, episódios entre checkpoints (padrão: 100000)")
+    treino.add_argument('--checkpoint-segundos', dest='checkpoint_segundos', type=float,
+                        default=None,
+                        help="Com --checkpoint, segundos máximos entre checkpoints")
+    treino.add_argument('--retomar', action='store_true',
+                        help="Com --checkpoint, continua do último checkpoint da pasta, se houver")
+    treino.add_argument('--perfil', action='store_true',
+                        help="Mede o tempo de cada fase do treino e imprime o detalhamento no fim "
+                             "(não combina com --processos)")
+    treino.add_argument('--perfil-pstats', metavar='ARQUIVO', default=None,
+                        help="Com --perfil, grava também um perfil do cProfile (lido com pstats)")
+    adicionar_opcoes_tabuleiro(treino, argparse.SUPPRESS)
+    adicionar_opcao_trajetorias(treino, argparse.SUPPRESS)
+
+    replay = subcomandos.add_parser(
+        'replay', aliases=['reprocessar'],
+        help="Treina a IA reaplicando um registro de trajetórias, sem simular partidas"
+    )
+    replay.add_argument('registro', help="Registro de trajetórias gravado com --trajetorias")
+    replay.add_argument('--epocas', type=int, default=1,
+                        help="Passadas completas pelo registro (padrão: 1)")
+    replay.add_argument('--alpha', type=float, default=None,
+                        help="Taxa de aprendizado (padrão: a do agente, 0.1)")
+    replay.add_argument('--gamma', type=float, default=None,
+                        help="Fator de desconto (padrão: o do agente, 0.9)")
+    replay.add_argument('--lambda', dest='lambda_td', type=float, default=LAMBDA_PADRAO,
+                        help=f"Lambda dos alvos de TD (padrão: {LAMBDA_PADRAO:g})")
+    replay.add_argument('--bloco', type=int, default=65536,
+                        help="Partidas por atualização em lote (padrão: 65536)")
+    replay.add_argument('--seed', type=int, default=None,
+                        help="Embaralha a ordem das partidas a cada época com esta semente")
+    replay.add_argument('--inicial', default=None,
+                        help="Modelo de partida; sem ele a Q-table começa zerada")
+    replay.add_argument('--out', '--saida', dest='saida', default=None,
+                        help="Caminho do modelo salvo (padrão: o mesmo do menu)")
+    replay.add_argument('--tipo-valor', choices=('float32', 'float16', 'int8'), default='float32',
+                        help="Tipo dos valores no modelo binário (padrão: float32)")
+    replay.add_argument('--esparso', action='store_true',
+                        help="Grava só os estados visitados no modelo binário")
+
+    arena = subcomandos.add_parser(
+        'arena',
+        help="Torneio sem tela entre agentes, com vitórias/empates/derrotas, IC 95%% e Elo"
+    )
+    arena.add_argument('jogadores', nargs='+',
+                       help="aleatorio, perfeito, mcts[:iteracoes] ou caminho de um modelo "
+                            "ou política compilada")
+    arena.add_argument('--partidas', type=int, default=10000,
+                       help="Partidas por par de jogadores (padrão: 10000)")
+    arena.add_argument('--processos', type=int, default=None,
+                       help="Processos de trabalho (padrão: número de CPUs)")
+    arena.add_argument('--seed', type=int, default=0, help="Semente da arena (padrão: 0)")
+    arena.add_argument('--abertura', type=int, default=0,
+                       help="Jogadas iniciais sorteadas em cada partida (padrão: 0)")
+    arena.add_argument('--saida', default=None, help="Arquivo JSON com os resultados")
+    adicionar_opcoes_tabuleiro(arena, argparse.SUPPRESS)
+    adicionar_opcao_trajetorias(arena, argparse.SUPPRESS)
+
+    servir = subcomandos.add_parser(
+        'servir',
+        help="Servidor de partidas contra a IA, JSON por linha sobre TCP ou socket Unix"
+    )
+    servir.add_argument('--host', default='127.0.0.1', help="Endereço TCP (padrão: 127.0.0.1)")
+    servir.add_argument('--porta', type=int, default=8765, help="Porta TCP (padrão: 8765)")
+    servir.add_argument('--unix', default=None, help="Socket Unix, no lugar de host e porta")
+    servir.add_argument('--modelo', default=None, help="Modelo a servir (padrão: o do jogo)")
+    servir.add_argument('--tempo-ocioso', dest='tempo_ocioso', type=float, default=60.0,
+                        help="Segundos sem mensagens até encerrar a sessão (padrão: 60)")
+    servir.add_argument('--max-sessoes', dest='max_sessoes', type=int, default=10000,
+                        help="Conexões simultâneas aceitas (padrão: 10000)")
+    servir.add_argument('--espera-lote', dest='espera_lote', type=float, default=0.0,
+                        help="Microssegundos que uma jogada da IA espera seu lote de inferência "
+                             "(padrão: 0, só a mesma volta do laço)")
+    servir.add_argument('--tamanho-lote', dest='tamanho_lote', type=int, default=256,
+                        help="Jogadas da IA por lote de inferência; 1 desliga a fila (padrão: 256)")
+    servir.add_argument('--recarga', type=float, default=5.0,
+                        help="Segundos entre conferências do arquivo do modelo para trocar por "
+                             "versões novas; 0 desliga (padrão: 5)")
+    adicionar_opcoes_tabuleiro(servir, argparse.SUPPRESS)
+    adicionar_opcao_trajetorias(servir, argparse.SUPPRESS)
+
+    compilar = subcomandos.add_parser(
+        'compilar',
+        help="Pré-calcula a jogada do modelo em cada posição do 3x3 (política de 19 KB)"
+    )
+    compilar.add_argument('--modelo', default=None, help="Modelo a compilar (padrão: o do jogo)")
+    compilar.add_argument('--out', '--saida', dest='saida', default='modelos/qlearning_model.pol',
+                          help="Arquivo da política (padrão: modelos/qlearning_model.pol)")
+    return parser
+
+
+def comando_treinar(args):
+    """
+    Executa o subcomando de treino
+
+    Args:
+        args (argparse.Namespace): Argumentos do subcomando
+
+    Returns:
+        int: Código de saída do processo
+    """
+    if args.episodios <= 0:
+        print("❌ --episodes deve ser positivo", file=sys.stderr)
+        return SAIDA_ERRO
+
+    jogo = JogoDaVelha(args.tamanho, args.em_linha)
+    if args.saida:
+        pasta = os.path.dirname(args.saida)
+        if pasta:
+            os.makedirs(pasta, exist_ok=True)
+        jogo.modelo_salvo = args.saida
+    jogo.opcoes_modelo = {'tipo_valor': args.tipo_valor, 'esparso': args.esparso}
+
+    convergencia = None
+    if args.convergencia:
+        from jogo.convergencia import CriterioConvergencia
+        convergencia = CriterioConvergencia(
+            jogo.agente_ia, jogo.carregar_solver(),
+            intervalo=args.intervalo_avaliacao,
+            limite_derrotas=args.limite_derrotas,
+            limite_variacao=args.limite_variacao,
+            verificacoes=args.verificacoes,
+        )
+
+    checkpoint = None
+    if args.checkpoint:
+        from jogo.checkpoint import CheckpointTreino
+        checkpoint = CheckpointTreino(
+            args.checkpoint,
+            intervalo=args.checkpoint_episodios,
+            segundos=args.checkpoint_segundos,
+            retomar=args.retomar,
+        )
+    elif args.retomar:
+        print("❌ --retomar requer --checkpoint", file=sys.stderr)
+        return SAIDA_ERRO
+
+    perfil = None
+    if args.perfil or args.perfil_pstats:
+        from jogo.perfil import Perfilador
+        perfil = Perfilador(arquivo_pstats=args.perfil_pstats)
+
+    resumo = jogo.treinar_ia(
+        args.episodios,
+        num_ambientes=args.ambientes,
+        num_processos=args.processos,
+        seed=args.seed,
+        interativo=False,
+        intervalo_progresso=args.intervalo_progresso,
+        perfil=perfil,
+        lambda_td=args.lambda_td,
+        convergencia=convergencia,
+        trajetorias=args.trajetorias,
+        checkpoint=checkpoint,
+    )
+    if perfil is not None:
+        print(perfil.relatorio(), file=sys.stderr)
+    if resumo['interrompido']:
+        return SAIDA_TERMINADO
+    return SAIDA_OK
+
 
-def main():
-    """Função principal do programa"""
+def comando_arena(args):
+    """
+    Executa o subcomando da arena
+
+    Args:
+        args (argparse.Namespace): Argumentos do subcomando
+
+    Returns:
+        int: Código de saída do processo
+    """
+    from jogo.arena import disputar, formatar_resultado
+
+    tabela_solver = "modelos/negamax_tt.bin"
+    resultado = disputar(
+        args.jogadores,
+        partidas=args.partidas,
+        processos=args.processos,
+        tamanho=args.tamanho,
+        em_linha=args.em_linha,
+        seed=args.seed,
+        abertura=args.abertura,
+        tabela_solver=tabela_solver if os.path.exists(tabela_solver) else None,
+        trajetorias=args.trajetorias,
+    )
+    print(formatar_resultado(resultado))
+    if args.saida:
+        with escrita_atomica(args.saida, 'w') as f:
+            json.dump(resultado, f, indent=2)
+            f.write('\n')
+    return SAIDA_OK
+
+
+def comando_replay(args):
+    """
+    Executa o subcomando de treino offline a partir de um registro de trajetórias
+
+    Args:
+        args (argparse.Namespace): Argumentos do subcomando
+
+    Returns:
+        int: Código de saída do processo
+    """
+    from jogo.trajetorias import treinar_offline
+
+    if args.epocas <= 0:
+        print("❌ --epocas deve ser positivo", file=sys.stderr)
+        return SAIDA_ERRO
+    if not 0.0 <= args.lambda_td <= 1.0:
+        print("❌ --lambda deve estar entre 0 e 1", file=sys.stderr)
+        return SAIDA_ERRO
+
+    jogo = JogoDaVelha(args.tamanho, args.em_linha)
+    agente = jogo.agente_ia
+    if args.inicial and not agente.load_model(args.inicial):
+        print(f"❌ Modelo não encontrado: {args.inicial}", file=sys.stderr)
+        return SAIDA_ERRO
+    if args.alpha is not None:
+        agente.alpha = args.alpha
+    if args.gamma is not None:
+        agente.gamma = args.gamma
+    if args.saida:
+        pasta = os.path.dirname(args.saida)
+        if pasta:
+            os.makedirs(pasta, exist_ok=True)
+        jogo.modelo_salvo = args.saida
+
+    resumo = treinar_offline(agente, args.registro, epocas=args.epocas, tamanho_bloco=args.bloco,
+                             lambda_td=args.lambda_td, seed=args.seed)
+    agente.save_model(jogo.modelo_salvo, tipo_valor=args.tipo_valor, esparso=args.esparso)
+    print(f"[replay] {resumo['partidas']:,} partidas x {resumo['epocas']} épocas "
+          f"({resumo['atualizacoes']:,} atualizações) em {resumo['segundos']:.1f}s, "
+          f"{agente.get_stats()['num_states']:,} estados, modelo salvo em {jogo.modelo_salvo}",
+          flush=True)
+    return SAIDA_OK
+
+
+def comando_servir(args):
+    """
+    Executa o subcomando do servidor de partidas
+
+    Args:
+        args (argparse.Namespace): Argumentos do subcomando
+
+    Returns:
+        int: Código de saída do processo
+    """
+    from servidor.servidor import ServidorJogo, servir
+    from jogo.trajetorias import GravadorTrajetorias
+
+    jogo = JogoDaVelha(args.tamanho, args.em_linha)
+    if args.modelo:
+        jogo.modelo_salvo = args.modelo
+    if not jogo.carregar_modelo():
+        print(f"❌ Modelo não encontrado: {jogo.modelo_salvo}", file=sys.stderr)
+        return SAIDA_ERRO
+
+    gravador = GravadorTrajetorias(args.trajetorias) if args.trajetorias else None
+    servidor = ServidorJogo(
+        jogo.agente_ia,
+        tamanho=args.tamanho,
+        em_linha=args.em_linha,
+        tempo_ocioso=args.tempo_ocioso,
+        max_sessoes=args.max_sessoes,
+        espera_lote=args.espera_lote / 1e6,
+        tamanho_lote=args.tamanho_lote,
+        gravador=gravador,
+        modelo=jogo.modelo_salvo,
+        intervalo_recarga=args.recarga,
+    )
+    endereco = args.unix or f"{args.host}:{args.porta}"
+    try:
+        servir(servidor, args.host, args.porta, args.unix,
+               ao_iniciar=lambda _: print(f"[servidor] escutando em {endereco}", file=sys.stderr))
+    finally:
+        if gravador is not None:
+            gravador.fechar()
+    print(f"[servidor] {json.dumps(servidor.estatisticas())}", file=sys.stderr)
+    return SAIDA_OK
+
+
+def comando_compilar(args):
+    """
+    Executa o subcomando que compila o modelo numa política de jogadas pré-calculadas
+
+    Args:
+        args (argparse.Namespace): Argumentos do subcomando
+
+    Returns:
+        int: Código de saída do processo
+    """
     jogo = JogoDaVelha()
-    jogo.jogar()
+    if args.modelo:
+        jogo.modelo_salvo = args.modelo
+    if not jogo.carregar_modelo():
+        print(f"❌ Modelo não encontrado: {jogo.modelo_salvo}", file=sys.stderr)
+        return SAIDA_ERRO
+
+    politica = jogo.agente_ia.compilar()
+    pasta = os.path.dirname(args.saida)
+    if pasta:
+        os.makedirs(pasta, exist_ok=True)
+    politica.save_model(args.saida)
+    print(f"[compilar] {jogo.modelo_salvo} ({os.path.getsize(jogo.modelo_salvo):,} bytes) -> "
+          f"{args.saida} ({os.path.getsize(args.saida):,} bytes)", flush=True)
+    return SAIDA_OK
+
+
+def main(argv=None):
+    """
+    Função principal do programa
+
+    Args:
+        argv (list or None): Argumentos da linha de comando (None usa sys.argv)
+
+    Returns:
+        int: Código de saída do processo
+    """
+    args = criar_parser().parse_args(argv)
+
+    if args.comando is None:
+        try:
+            jogo = JogoDaVelha(args.tamanho, args.em_linha)
+        except ValueError as erro:
+            print(f"❌ {erro}", file=sys.stderr)
+            return SAIDA_ERRO
+        if args.trajetorias:
+            if not jogo.padrao:
+                print("❌ O registro de trajetórias só existe para o tabuleiro 3x3", file=sys.stderr)
+                return SAIDA_ERRO
+            from jogo.trajetorias import GravadorTrajetorias
+            jogo.gravador_partidas = GravadorTrajetorias(args.trajetorias)
+        try:
+            jogo.jogar()
+        finally:
+            if jogo.gravador_partidas is not None:
+                jogo.gravador_partidas.fechar()
+        return SAIDA_OK
+
+    try:
+        if args.comando in ('train', 'treinar'):
+            return comando_treinar(args)
+        if args.comando == 'arena':
+            return comando_arena(args)
+        if args.comando == 'servir':
+            return comando_servir(args)
+        if args.comando in ('replay', 'reprocessar'):
+            return comando_replay(args)
+        if args.comando == 'compilar':
+            return comando_compilar(args)
+    except KeyboardInterrupt:
+        print("⛔ Interrompido.", file=sys.stderr)
+        return SAIDA_INTERROMPIDO
+    except (OSError, ValueError, ImportError, RuntimeError) as erro:
+        print(f"❌ {erro}", file=sys.stderr)
+        return SAIDA_ERRO
+    return SAIDA_ERRO
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
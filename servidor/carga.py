@@ -0,0 +1,170 @@
+"""
+Cliente de carga do servidor de partidas - muitas conexões jogando ao mesmo tempo
+
+    python -m servidor.carga --porta 8765 --conexoes 2000 --partidas 5
+    python -m servidor.carga --local --conexoes 1000      # sobe o servidor no mesmo processo
+
+Cada conexão joga partidas com jogadas humanas aleatórias e mede o tempo de ida e volta
+de cada jogada.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+
+# Permite também `python servidor/carga.py` a partir da raiz do projeto
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+async def _pedir(reader, writer, mensagem):
+    writer.write(json.dumps(mensagem).encode() + b'\n')
+    await writer.drain()
+    linha = await reader.readline()
+    if not linha:
+        raise ConnectionError("o servidor encerrou a conexão")
+    return json.loads(linha)
+
+
+async def _jogador(abrir, partidas, rng, latencias, totais):
+    """Uma conexão: joga as partidas em sequência, alternando o lado humano"""
+    reader, writer = await abrir()
+    try:
+        for numero in range(partidas):
+            estado = await _pedir(reader, writer, {
+                'tipo': 'nova_partida', 'humano': 'X' if numero % 2 == 0 else 'O',
+            })
+            while estado['resultado'] == 'em_andamento':
+                vazias = [(i, j) for i, linha in enumerate(estado['tabuleiro'])
+                          for j, casa in enumerate(linha) if casa == ' ']
+                linha, coluna = rng.choice(vazias)
+                inicio = time.perf_counter_ns()
+                estado = await _pedir(reader, writer, {
+                    'tipo': 'jogar', 'partida': estado['partida'], 'linha': linha, 'coluna': coluna,
+                })
+                latencias.append(time.perf_counter_ns() - inicio)
+                if estado['tipo'] == 'erro':
+                    raise RuntimeError(estado['mensagem'])
+            totais[estado['resultado']] += 1
+        await _pedir(reader, writer, {'tipo': 'sair'})
+    finally:
+        writer.close()
+
+
+async def executar_carga(abrir, conexoes=100, partidas=10, seed=0):
+    """
+    Abre as conexões ao mesmo tempo e espera todas terminarem
+
+    Args:
+        abrir (callable): Corrotina sem argumentos que devolve (reader, writer)
+        conexoes (int): Conexões simultâneas
+        partidas (int): Partidas jogadas em cada conexão
+        seed (int): Semente das jogadas humanas
+
+    Returns:
+        dict: conexoes, partidas, jogadas, segundos, jogadas_por_s, p50_us e p99_us (ida e
+            volta no cliente), resultados e falhas
+    """
+    latencias = []
+    totais = {'X': 0, 'O': 0, 'empate': 0}
+    inicio = time.perf_counter()
+    tarefas = [
+        _jogador(abrir, partidas, random.Random(f"{seed}:{i}"), latencias, totais)
+        for i in range(conexoes)
+    ]
+    resultados = await asyncio.gather(*tarefas, return_exceptions=True)
+    segundos = time.perf_counter() - inicio
+
+    falhas = [repr(r) for r in resultados if isinstance(r, BaseException)]
+    latencias.sort()
+
+    def percentil(p):
+        if not latencias:
+            return 0.0
+        return latencias[min(len(latencias) - 1, int(p / 100 * len(latencias)))] / 1000
+
+    return {
+        'conexoes': conexoes,
+        'partidas': sum(totais.values()),
+        'jogadas': len(latencias),
+        'segundos': segundos,
+        'jogadas_por_s': len(latencias) / max(segundos, 1e-9),
+        'p50_us': percentil(50),
+        'p99_us': percentil(99),
+        'resultados': totais,
+        'falhas': len(falhas),
+        'primeiras_falhas': falhas[:5],
+    }
+
+
+def criar_parser():
+    """
+    Returns:
+        argparse.ArgumentParser: Parser dos argumentos do cliente de carga
+    """
+    parser = argparse.ArgumentParser(description="Teste de carga do servidor de partidas")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--porta', type=int, default=8765)
+    parser.add_argument('--unix', default=None, help="Socket Unix do servidor")
+    parser.add_argument('--conexoes', type=int, default=100, help="Conexões simultâneas")
+    parser.add_argument('--partidas', type=int, default=10, help="Partidas por conexão")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--local', action='store_true',
+                        help="Sobe um servidor no próprio processo (modelo padrão, se existir)")
+    parser.add_argument('--espera-lote', dest='espera_lote', type=float, default=0.0,
+                        help="Com --local, microssegundos de espera do lote de inferência")
+    parser.add_argument('--tamanho-lote', dest='tamanho_lote', type=int, default=256,
+                        help="Com --local, tamanho máximo do lote de inferência (1 desliga)")
+    return parser
+
+
+async def _principal(args):
+    servidor = None
+    if args.local:
+        from jogo.motor import JogoDaVelha
+        from servidor.servidor import ServidorJogo
+
+        jogo = JogoDaVelha()
+        jogo.carregar_modelo()
+        servidor = ServidorJogo(
+            jogo.agente_ia,
+            max_sessoes=max(10000, args.conexoes),
+            espera_lote=args.espera_lote / 1e6,
+            tamanho_lote=args.tamanho_lote,
+        )
+        escuta = await servidor.iniciar_tcp('127.0.0.1', 0)
+        args.host, args.porta = escuta.sockets[0].getsockname()[:2]
+
+    if args.unix:
+        def abrir():
+            return asyncio.open_unix_connection(args.unix)
+    else:
+        def abrir():
+            return asyncio.open_connection(args.host, args.porta)
+
+    resumo = await executar_carga(abrir, args.conexoes, args.partidas, args.seed)
+    if servidor is not None:
+        resumo['servidor'] = servidor.estatisticas()
+        await servidor.fechar()
+    return resumo
+
+
+def main(argv=None):
+    """
+    Args:
+        argv (list or None): Argumentos da linha de comando (None usa sys.argv)
+
+    Returns:
+        int: 0 se todas as conexões terminaram, 1 se alguma falhou
+    """
+    args = criar_parser().parse_args(argv)
+    resumo = asyncio.run(_principal(args))
+    print(json.dumps(resumo, indent=2, ensure_ascii=False))
+    return 1 if resumo['falhas'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+"""
+Fila de inferência em micro-lotes - junta pedidos de jogada concorrentes num argmax vetorizado
+"""
+
+import asyncio
+
+try:
+    import numpy as np
+except ImportError:  # Sem NumPy cada pedido é respondido na hora por choose_action
+    np = None
+
+if np is not None:
+    from jogo.bitboard import MASCARA_CHEIA, NUM_CASAS
+    from jogo.vecenv import acoes_gulosas
+
+    # CASAS_LIVRES[mascara]: linha booleana das casas vazias de uma máscara
+    CASAS_LIVRES = (np.arange(MASCARA_CHEIA + 1)[:, None] >> np.arange(NUM_CASAS) & 1).astype(bool)
+
+
+class FilaInferencia:
+    """
+    Acumula pedidos de jogada da IA e responde todos de uma vez
+
+    O lote sai quando completa `tamanho_lote` pedidos ou quando o primeiro pedido pendente
+    espera `espera` segundos, o que vier antes. Cada lote é um único argmax mascarado sobre
+    as linhas da Q-table (com o mesmo desempate de choose_action). Com tamanho_lote 1, sem
+    NumPy, fora do 3x3 ou com a tabela de dicionários os pedidos são respondidos um a um,
+    sem fila: no 3x3 pela política compilada (QLearningAgent.compilar) e nos demais por
+    uma cópia congelada (QLearningAgent.congelar), que não cresce com as posições novas
+    que os clientes alcançam.
+    """
+
+    def __init__(self, agente, espera=0.0, tamanho_lote=256):
+        """
+        Args:
+            agente (QLearningAgent): Agente com o modelo carregado; só é consultado
+            espera (float): Segundos máximos que um pedido aguarda o lote encher; 0 junta
+                só os pedidos que chegam na mesma volta do laço de eventos. Esperas menores
+                que 1 ms são arredondadas para 1 ms pelo epoll do laço asyncio no Linux
+            tamanho_lote (int): Pedidos que disparam o lote na hora; 1 desliga a fila
+        """
+        if tamanho_lote <= 0:
+            raise ValueError("tamanho_lote deve ser positivo")
+        self.agente = agente
+        self.espera = espera
+        self.tamanho_lote = tamanho_lote
+        self.em_lote = (
+            tamanho_lote > 1 and np is not None
+            and agente.backend == 'numpy' and agente.geometria.padrao
+        )
+        self.tabela = None
+        self.atualizar_modelo()
+        self._pendentes = []
+        self._disparo = None
+        self.lotes = 0
+        self.pedidos = 0
+        self.maior_lote = 0
+
+    def atualizar_modelo(self):
+        """
+        Refaz a política dos pedidos sem lote depois que o agente trocou de tabela
+
+        Os lotes leem a tabela atual do agente a cada argmax e não precisam de nada.
+        """
+        if not self.em_lote:
+            agente = self.agente
+            self.tabela = agente.compilar() if agente.geometria.padrao else agente.congelar()
+
+    async def jogada(self, bits):
+        """
+        Jogada gulosa da IA para o tabuleiro
+
+        Args:
+            bits (BitBoard): Posição atual, com a IA na vez
+
+        Returns:
+            tuple or None: (linha, coluna) da jogada ou None se não há casas vazias
+        """
+        if not self.em_lote:
+            self.pedidos += 1
+            return self.tabela.choose_action(bits)
+        vazias = bits.vazias()
+        if not vazias:
+            return None
+
+        futuro = asyncio.get_running_loop().create_future()
+        self._pendentes.append((bits.indice(), vazias, futuro))
+        if len(self._pendentes) >= self.tamanho_lote:
+            self._esvaziar()
+        elif self._disparo is None:
+            loop = asyncio.get_running_loop()
+            if self.espera > 0:
+                self._disparo = loop.call_later(self.espera, self._esvaziar)
+            else:
+                self._disparo = loop.call_soon(self._esvaziar)
+        return await futuro
+
+    def _esvaziar(self):
+        """Responde todos os pedidos pendentes com um argmax em lote"""
+        if self._disparo is not None:
+            self._disparo.cancel()
+            self._disparo = None
+        pendentes = self._pendentes
+        if not pendentes:
+            return
+        self._pendentes = []
+        self.lotes += 1
+        self.pedidos += len(pendentes)
+        self.maior_lote = max(self.maior_lote, len(pendentes))
+
+        indices, vazias, futuros = zip(*pendentes)
+        try:
+            casas = acoes_gulosas(
+                self.agente, np.array(indices, dtype=np.int64), CASAS_LIVRES[list(vazias)]
+            ).tolist()
+        except Exception as erro:
+            for futuro in futuros:
+                if not futuro.done():
+                    futuro.set_exception(erro)
+            return
+        for futuro, casa in zip(futuros, casas):
+            # Pedidos cancelados (conexão caiu) são simplesmente ignorados
+            if not futuro.done():
+                futuro.set_result(divmod(casa, 3))
+
+    def estatisticas(self):
+        """
+        Returns:
+            dict: lotes, pedidos, media_lote e maior_lote
+        """
+        return {
+            'lotes': self.lotes,
+            'pedidos': self.pedidos,
+            'media_lote': self.pedidos / self.lotes if self.lotes else 0.0,
+            'maior_lote': self.maior_lote,
+        }
@@ -0,0 +1,412 @@
+"""
+Servidor de partidas assíncrono - JSON por linha (NDJSON) sobre TCP ou socket Unix
+
+Cada conexão é uma sessão com suas próprias partidas; todas as sessões consultam a mesma
+Q-table somente leitura, por uma fila que responde em lote os pedidos de jogada que chegam
+juntos. Mensagens do cliente (uma por linha):
+
+    {"tipo": "nova_partida", "humano": "X"}          humano "X" (padrão) ou "O"
+    {"tipo": "jogar", "partida": 1, "linha": 0, "coluna": 2}
+    {"tipo": "estatisticas"}
+    {"tipo": "ping"}
+    {"tipo": "sair"}
+
+Cada mensagem recebe exatamente uma resposta, na ordem. Partidas respondem com
+{"tipo": "estado", "partida", "tabuleiro" (linhas de 'X', 'O' e ' '), "jogada_ia"
+([linha, coluna] ou null), "resultado" ('em_andamento', 'X', 'O' ou 'empate')}; erros com
+{"tipo": "erro", "mensagem"}. Erros de jogada mantêm a conexão; linhas inválidas,
+ociosidade acima do limite, servidor cheio e falhas internas a encerram.
+
+Com o caminho do modelo, o servidor confere o arquivo a intervalos pelo cache de modelos
+e, se ele mudou, troca a tabela entre dois lotes de inferência, sem reiniciar.
+"""
+
+import asyncio
+import collections
+import json
+import time
+
+from agente.cache_modelos import cache_padrao
+from jogo.tabuleiro import Tabuleiro
+from servidor.inferencia import FilaInferencia
+from jogo.terminal import EM_ANDAMENTO, EMPATE, VITORIA_O, VITORIA_X
+
+NOME_RESULTADO = {EM_ANDAMENTO: 'em_andamento', VITORIA_X: 'X', VITORIA_O: 'O', EMPATE: 'empate'}
+
+
+class ErroProtocolo(ValueError):
+    """Mensagem bem formada, mas que não pode ser atendida (a conexão continua)"""
+
+
+class EstatisticasLatencia:
+    """Latência de processamento das jogadas, nas últimas N amostras"""
+
+    def __init__(self, amostras=100000):
+        """
+        Args:
+            amostras (int): Quantas latências recentes guardar para os percentis
+        """
+        self.recentes = collections.deque(maxlen=amostras)
+        self.total = 0
+
+    def registrar(self, nanossegundos):
+        self.recentes.append(nanossegundos)
+        self.total += 1
+
+    def resumo(self):
+        """
+        Returns:
+            dict: jogadas (total), p50_us, p99_us e max_us das amostras recentes
+        """
+        ordenadas = sorted(self.recentes)
+        if not ordenadas:
+            return {'jogadas': self.total, 'p50_us': 0.0, 'p99_us': 0.0, 'max_us': 0.0}
+
+        def percentil(p):
+            return ordenadas[min(len(ordenadas) - 1, int(p / 100 * len(ordenadas)))] / 1000
+
+        return {
+            'jogadas': self.total,
+            'p50_us': percentil(50),
+            'p99_us': percentil(99),
+            'max_us': ordenadas[-1] / 1000,
+        }
+
+
+class Partida:
+    """Estado de uma partida de uma sessão"""
+
+    __slots__ = ('tabuleiro', 'humano', 'vez', 'jogadas')
+
+    def __init__(self, tamanho, em_linha, humano):
+        self.tabuleiro = Tabuleiro(tamanho, em_linha)
+        self.humano = humano
+        self.vez = 'X'
+        self.jogadas = []
+
+    def jogar(self, linha, coluna):
+        """
+        Joga pelo jogador da vez e passa a vez
+
+        Returns:
+            bool: False se a casa não existe ou está ocupada
+        """
+        if not self.tabuleiro.fazer_jogada(linha, coluna, self.vez):
+            return False
+        self.jogadas.append(linha * self.tabuleiro.tamanho + coluna)
+        self.vez = 'O' if self.vez == 'X' else 'X'
+        return True
+
+
+class Sessao:
+    """Partidas e contadores de uma conexão"""
+
+    def __init__(self, numero):
+        self.numero = numero
+        self.partidas = {}
+        self.proxima_partida = 1
+
+
+class ServidorJogo:
+    """Atende muitas sessões num único laço asyncio, com a IA jogando contra cada cliente"""
+
+    def __init__(self, agente, tamanho=3, em_linha=3, tempo_ocioso=60.0, max_sessoes=10000,
+                 max_partidas=16, tamanho_max_linha=4096, espera_lote=0.0, tamanho_lote=256,
+                 gravador=None, modelo=None, intervalo_recarga=5.0):
+        """
+        Args:
+            agente (QLearningAgent): Agente com o modelo carregado; só é consultado
+            tamanho (int): Número de linhas e colunas do tabuleiro
+            em_linha (int): Peças seguidas necessárias para vencer
+            tempo_ocioso (float): Segundos sem mensagens até a conexão ser encerrada
+            max_sessoes (int): Conexões simultâneas aceitas; as excedentes são recusadas
+            max_partidas (int): Partidas abertas por sessão
+            tamanho_max_linha (int): Bytes máximos de uma mensagem
+            espera_lote (float): Segundos máximos que uma jogada da IA espera seu lote; 0
+                junta só os pedidos que chegam na mesma volta do laço de eventos
+            tamanho_lote (int): Jogadas da IA que disparam o lote na hora
+            gravador (GravadorTrajetorias or None): Recebe cada partida encerrada (só 3x3)
+            modelo (str or None): Arquivo do modelo do agente, conferido a cada
+                intervalo_recarga segundos para trocar por versões novas; None não recarrega
+            intervalo_recarga (float or None): Segundos entre conferências; 0 ou None não
+                recarrega
+        """
+        if gravador is not None and (tamanho, em_linha) != (3, 3):
+            raise ValueError("O registro de trajetórias só existe para o tabuleiro 3x3")
+        self.agente = agente
+        self.tamanho = tamanho
+        self.em_linha = em_linha
+        self.tempo_ocioso = tempo_ocioso
+        self.max_sessoes = max_sessoes
+        self.max_partidas = max_partidas
+        self.tamanho_max_linha = tamanho_max_linha
+        self.fila = FilaInferencia(agente, espera_lote, tamanho_lote)
+        self.gravador = gravador
+        self.modelo = modelo
+        self.intervalo_recarga = intervalo_recarga
+        self._recarga = None
+        self.sessoes = {}
+        self.latencias = EstatisticasLatencia()
+        self.contadores = collections.Counter()
+        self._proxima_sessao = 1
+        self.servidor = None
+
+    def _backlog(self):
+        # Com a fila padrão (100), rajadas de conexões perdem SYNs e esperam retransmissões
+        return max(100, min(self.max_sessoes, 4096))
+
+    async def iniciar_tcp(self, host='127.0.0.1', porta=8765):
+        """
+        Returns:
+            asyncio.AbstractServer: Servidor escutando em host:porta (porta 0 escolhe uma livre)
+        """
+        self.servidor = await asyncio.start_server(
+            self._atender, host, porta, limit=self.tamanho_max_linha, backlog=self._backlog()
+        )
+        self._iniciar_recarga()
+        return self.servidor
+
+    async def iniciar_unix(self, caminho):
+        """
+        Returns:
+            asyncio.AbstractServer: Servidor escutando no socket Unix do caminho
+        """
+        self.servidor = await asyncio.start_unix_server(
+            self._atender, caminho, limit=self.tamanho_max_linha, backlog=self._backlog()
+        )
+        self._iniciar_recarga()
+        return self.servidor
+
+    async def fechar(self):
+        """Para de aceitar conexões e espera o servidor fechar"""
+        if self._recarga is not None:
+            self._recarga.cancel()
+            self._recarga = None
+        if self.servidor is not None:
+            self.servidor.close()
+            await self.servidor.wait_closed()
+
+    def recarregar_modelo(self):
+        """
+        Troca o modelo do agente se o arquivo mudou desde a última leitura
+
+        Roda no laço de eventos, entre dois lotes: cada lote usa uma única tabela. Um
+        arquivo que não pode ser lido mantém o modelo atual.
+
+        Returns:
+            bool: True se o modelo foi trocado
+        """
+        if self.modelo is None:
+            return False
+        anterior = self.agente.tabela_atual()
+        try:
+            if not cache_padrao.carregar(self.agente, self.modelo):
+                return False
+        except (OSError, ValueError):
+            self.contadores['falhas_recarga'] += 1
+            return False
+        if self.agente.tabela_atual() is anterior:
+            return False
+        self.fila.atualizar_modelo()
+        self.contadores['recargas'] += 1
+        return True
+
+    def _iniciar_recarga(self):
+        if self.modelo is not None and self.intervalo_recarga and self._recarga is None:
+            self._recarga = asyncio.ensure_future(self._recarregar_periodicamente())
+
+    async def _recarregar_periodicamente(self):
+        while True:
+            await asyncio.sleep(self.intervalo_recarga)
+            self.recarregar_modelo()
+
+    async def _enviar(self, writer, mensagem):
+        writer.write(json.dumps(mensagem, separators=(',', ':')).encode() + b'\n')
+        # Contrapressão: um cliente que não lê para de ser atendido até o buffer esvaziar
+        await writer.drain()
+
+    async def _atender(self, reader, writer):
+        """Laço de uma conexão: lê uma mensagem, responde, repete"""
+        if len(self.sessoes) >= self.max_sessoes:
+            self.contadores['recusadas'] += 1
+            await self._encerrar(writer, {'tipo': 'erro', 'mensagem': 'servidor cheio'})
+            return
+
+        sessao = Sessao(self._proxima_sessao)
+        self._proxima_sessao += 1
+        self.sessoes[sessao.numero] = sessao
+        self.contadores['sessoes'] += 1
+        despedida = None
+        try:
+            while True:
+                try:
+                    linha = await asyncio.wait_for(reader.readline(), self.tempo_ocioso)
+                except asyncio.TimeoutError:
+                    self.contadores['ociosas'] += 1
+                    despedida = {'tipo': 'erro', 'mensagem': 'tempo ocioso esgotado'}
+                    break
+                except ValueError:
+                    # Linha maior que tamanho_max_linha
+                    despedida = {'tipo': 'erro', 'mensagem': 'mensagem grande demais'}
+                    break
+                if not linha:
+                    break
+                try:
+                    mensagem = json.loads(linha)
+                    if not isinstance(mensagem, dict):
+                        raise ValueError
+                except ValueError:
+                    despedida = {'tipo': 'erro', 'mensagem': 'JSON inválido'}
+                    break
+                if mensagem.get('tipo') == 'sair':
+                    despedida = {'tipo': 'tchau'}
+                    break
+
+                try:
+                    resposta = await self._processar(sessao, mensagem)
+                except ErroProtocolo as erro:
+                    self.contadores['erros'] += 1
+                    resposta = {'tipo': 'erro', 'mensagem': str(erro)}
+                await self._enviar(writer, resposta)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            despedida = None
+        except Exception as erro:
+            # Uma falha não prevista encerra só esta conexão, com resposta ao cliente
+            self.contadores['falhas'] += 1
+            despedida = {'tipo': 'erro', 'mensagem': f"erro interno: {type(erro).__name__}"}
+        finally:
+            del self.sessoes[sessao.numero]
+        await self._encerrar(writer, despedida)
+
+    async def _encerrar(self, writer, mensagem):
+        try:
+            if mensagem is not None:
+                await self._enviar(writer, mensagem)
+            writer.close()
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+
+    async def _processar(self, sessao, mensagem):
+        """
+        Atende uma mensagem da sessão
+
+        Returns:
+            dict: Resposta a enviar
+
+        Raises:
+            ErroProtocolo: Mensagem que não pode ser atendida
+        """
+        tipo = mensagem.get('tipo')
+        if tipo == 'nova_partida':
+            return await self._nova_partida(sessao, mensagem)
+        if tipo == 'jogar':
+            return await self._jogar(sessao, mensagem)
+        if tipo == 'estatisticas':
+            return dict(self.estatisticas(), tipo='estatisticas')
+        if tipo == 'ping':
+            return {'tipo': 'pong'}
+        raise ErroProtocolo(f"tipo de mensagem desconhecido: {tipo!r}")
+
+    async def _nova_partida(self, sessao, mensagem):
+        humano = mensagem.get('humano', 'X')
+        if humano not in ('X', 'O'):
+            raise ErroProtocolo("'humano' deve ser 'X' ou 'O'")
+        if len(sessao.partidas) >= self.max_partidas:
+            raise ErroProtocolo(f"limite de {self.max_partidas} partidas abertas por sessão")
+        numero = sessao.proxima_partida
+        sessao.proxima_partida += 1
+        partida = Partida(self.tamanho, self.em_linha, humano)
+        sessao.partidas[numero] = partida
+        self.contadores['partidas'] += 1
+
+        jogada_ia = None
+        if humano == 'O':
+            inicio = time.perf_counter_ns()
+            jogada_ia = await self._jogada_ia(partida)
+            self.latencias.registrar(time.perf_counter_ns() - inicio)
+        return self._estado(sessao, numero, partida, jogada_ia)
+
+    async def _jogar(self, sessao, mensagem):
+        inicio = time.perf_counter_ns()
+        numero = mensagem.get('partida')
+        # type() e não isinstance(): true/false do JSON chegam como bool, subclasse de int
+        partida = sessao.partidas.get(numero) if type(numero) is int else None
+        if partida is None:
+            raise ErroProtocolo(f"partida inexistente: {numero!r}")
+        linha, coluna = mensagem.get('linha'), mensagem.get('coluna')
+        if not (type(linha) is int and type(coluna) is int):
+            raise ErroProtocolo("'linha' e 'coluna' devem ser inteiros")
+        if partida.vez != partida.humano:
+            raise ErroProtocolo("não é a vez do humano")
+        if not partida.jogar(linha, coluna):
+            raise ErroProtocolo(f"jogada inválida: ({linha}, {coluna})")
+
+        jogada_ia = None
+        if partida.tabuleiro.resultado() == EM_ANDAMENTO:
+            jogada_ia = await self._jogada_ia(partida)
+        self.latencias.registrar(time.perf_counter_ns() - inicio)
+        return self._estado(sessao, numero, partida, jogada_ia)
+
+    async def _jogada_ia(self, partida):
+        """Joga pela IA na partida e devolve a casa escolhida"""
+        jogada = await self.fila.jogada(partida.tabuleiro.bits)
+        partida.jogar(*jogada)
+        return jogada
+
+    def _estado(self, sessao, numero, partida, jogada_ia):
+        resultado = partida.tabuleiro.resultado()
+        if resultado != EM_ANDAMENTO:
+            # Partidas encerradas liberam a vaga na sessão
+            del sessao.partidas[numero]
+            if self.gravador is not None:
+                self.gravador.registrar(partida.jogadas)
+        return {
+            'tipo': 'estado',
+            'partida': numero,
+            'tabuleiro': [''.join(linha) for linha in partida.tabuleiro.matriz],
+            'jogada_ia': list(jogada_ia) if jogada_ia is not None else None,
+            'resultado': NOME_RESULTADO[resultado],
+        }
+
+    def estatisticas(self):
+        """
+        Returns:
+            dict: Sessões e partidas abertas, contadores acumulados, latência das jogadas
+                e tamanho dos lotes de inferência
+        """
+        return {
+            'sessoes_abertas': len(self.sessoes),
+            'partidas_abertas': sum(len(sessao.partidas) for sessao in self.sessoes.values()),
+            'contadores': dict(self.contadores),
+            'latencia': self.latencias.resumo(),
+            'inferencia': self.fila.estatisticas(),
+        }
+
+
+async def _servir(servidor, host, porta, unix, ao_iniciar):
+    if unix:
+        await servidor.iniciar_unix(unix)
+    else:
+        await servidor.iniciar_tcp(host, porta)
+    if ao_iniciar is not None:
+        ao_iniciar(servidor)
+    async with servidor.servidor:
+        await servidor.servidor.serve_forever()
+
+
+def servir(servidor, host='127.0.0.1', porta=8765, unix=None, ao_iniciar=None):
+    """
+    Roda o servidor até ser interrompido (Ctrl+C)
+
+    Args:
+        servidor (ServidorJogo): Servidor configurado
+        host (str): Endereço TCP
+        porta (int): Porta TCP
+        unix (str or None): Caminho de socket Unix, usado no lugar de host e porta
+        ao_iniciar (callable or None): Chamado com o servidor assim que ele escuta
+    """
+    try:
+        asyncio.run(_servir(servidor, host, porta, unix, ao_iniciar))
+    except KeyboardInterrupt:
+        pass
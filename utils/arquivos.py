@@ -0,0 +1,68 @@
+# utils/arquivos.py
+
+import os
+import tempfile
+from contextlib import contextmanager
+
+# Lida uma vez na importação: trocar a umask é global ao processo e não é seguro entre threads
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def _modo_destino(caminho):
+    """Permissões do arquivo existente, ou as de um open() comum para arquivos novos"""
+    try:
+        return os.stat(caminho).st_mode & 0o7777
+    except FileNotFoundError:
+        return 0o666 & ~_UMASK
+
+
+def _sincronizar_pasta(pasta):
+    """Grava no disco a entrada renomeada na pasta (não suportado em todos os sistemas)"""
+    try:
+        descritor = os.open(pasta, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(descritor)
+    except OSError:
+        pass
+    finally:
+        os.close(descritor)
+
+
+@contextmanager
+def escrita_atomica(caminho, modo='wb'):
+    """
+    Abre um arquivo temporário na mesma pasta e o renomeia para o destino ao final
+
+    Leitores nunca veem um arquivo pela metade: ou encontram a versão antiga ou a nova
+    completa. Se ocorrer um erro durante a escrita, o destino fica intacto. O arquivo novo
+    mantém as permissões do destino que substitui (ou as da umask, se ele não existia).
+
+    Args:
+        caminho (str): Caminho final do arquivo
+        modo (str): Modo de abertura ('wb' ou 'w')
+
+    Yields:
+        file: Arquivo temporário aberto para escrita
+    """
+    pasta = os.path.dirname(os.path.abspath(caminho))
+    descritor, temporario = tempfile.mkstemp(
+        dir=pasta, prefix=f".{os.path.basename(caminho)}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(descritor, modo) as arquivo:
+            yield arquivo
+            arquivo.flush()
+            if hasattr(os, 'fchmod'):
+                os.fchmod(arquivo.fileno(), _modo_destino(caminho))
+            os.fsync(arquivo.fileno())
+        os.replace(temporario, caminho)
+        _sincronizar_pasta(pasta)
+    except BaseException:
+        try:
+            os.unlink(temporario)
+        except OSError:
+            pass
+        raise
@@ -0,0 +1,156 @@
+# utils/tela.py
+
+import os
+import shutil
+import sys
+
+from utils.limpar_tela import limpar_tela
+
+# Sequências ANSI usadas pelo renderizador
+LIMPAR = "\x1b[H\x1b[2J"
+APAGAR_FIM_LINHA = "\x1b[K"
+APAGAR_ABAIXO = "\x1b[J"
+
+# Trechos alterados separados por menos casas iguais que isto são reescritos juntos
+_INTERVALO_MINIMO = 4
+
+
+def _posicionar(linha, coluna=0):
+    """Sequência que leva o cursor à linha e coluna dadas (contadas a partir de 0)"""
+    return f"\x1b[{linha + 1};{coluna + 1}H"
+
+
+def _trechos_alterados(antiga, nova):
+    """
+    Colunas alteradas entre duas versões ASCII de mesmo tamanho de uma linha
+
+    Returns:
+        list: (inicio, fim) de cada trecho a reescrever
+    """
+    trechos = []
+    inicio = None
+    iguais = 0
+    for coluna, (a, b) in enumerate(zip(antiga, nova)):
+        if a != b:
+            if inicio is None:
+                inicio = coluna
+            iguais = 0
+            fim = coluna + 1
+        elif inicio is not None:
+            iguais += 1
+            if iguais >= _INTERVALO_MINIMO:
+                trechos.append((inicio, fim))
+                inicio = None
+    if inicio is not None:
+        trechos.append((inicio, fim))
+    return trechos
+
+
+def suporta_ansi(saida):
+    """
+    Args:
+        saida (file): Destino da tela
+
+    Returns:
+        bool: Se o destino é um terminal que entende as sequências ANSI
+    """
+    if not (hasattr(saida, 'isatty') and saida.isatty()):
+        return False
+    if os.environ.get('TERM') == 'dumb':
+        return False
+    # No Windows, só terminais modernos (Windows Terminal, VS Code) interpretam ANSI por padrão
+    return os.name != 'nt' or 'WT_SESSION' in os.environ or 'TERM_PROGRAM' in os.environ
+
+
+class RenderizadorTela:
+    """
+    Tela com buffer duplo: cada quadro é montado numa string e escrito de uma vez
+
+    O quadro anterior fica guardado; no quadro seguinte só as linhas que mudaram são
+    reescritas, posicionando o cursor com sequências ANSI (em linhas ASCII de mesmo
+    tamanho, como as do tabuleiro, só as casas que mudaram). Nada abaixo do quadro é
+    preservado: mensagens e entradas impressas entre dois quadros são apagadas no
+    seguinte. Fora de um terminal ANSI cada quadro é escrito inteiro, sem limpar a tela.
+    """
+
+    def __init__(self, saida=None):
+        """
+        Args:
+            saida (file or None): Destino da tela; None usa sys.stdout do momento da escrita
+        """
+        self._saida = saida
+        self.anterior = None
+
+    @property
+    def saida(self):
+        return self._saida if self._saida is not None else sys.stdout
+
+    def invalidar(self):
+        """Esquece o quadro anterior: o próximo é redesenhado do zero"""
+        self.anterior = None
+
+    def limpar(self):
+        """Limpa a tela sem criar processos e esquece o quadro anterior"""
+        saida = self.saida
+        if suporta_ansi(saida):
+            saida.write(LIMPAR)
+            saida.flush()
+        else:
+            limpar_tela()
+        self.anterior = None
+
+    def montar(self, linhas, limpar=False):
+        """
+        Sequência a escrever para passar do quadro anterior ao novo
+
+        Args:
+            linhas (list): Linhas do novo quadro, sem quebras de linha
+            limpar (bool): Limpa a tela inteira antes de desenhar
+
+        Returns:
+            str: Texto com as sequências ANSI do quadro
+        """
+        anterior = self.anterior
+        altura = shutil.get_terminal_size().lines
+        # Quadros que não cabem rolam a tela e desalinham as posições absolutas
+        if limpar or anterior is None or len(linhas) >= altura:
+            partes = [LIMPAR, "\n".join(linhas)]
+        else:
+            partes = []
+            for numero, linha in enumerate(linhas):
+                antiga = anterior[numero] if numero < len(anterior) else None
+                if linha == antiga:
+                    continue
+                if (antiga is not None and len(antiga) == len(linha)
+                        and antiga.isascii() and linha.isascii()):
+                    for inicio, fim in _trechos_alterados(antiga, linha):
+                        partes.append(_posicionar(numero, inicio))
+                        partes.append(linha[inicio:fim])
+                else:
+                    partes.append(_posicionar(numero))
+                    partes.append(linha)
+                    partes.append(APAGAR_FIM_LINHA)
+        # Cursor logo abaixo do quadro, com o resto da tela apagado, para prompts e mensagens
+        partes.append(_posicionar(len(linhas)))
+        partes.append(APAGAR_ABAIXO)
+        self.anterior = list(linhas)
+        return "".join(partes)
+
+    def desenhar(self, linhas, limpar=False):
+        """
+        Desenha um quadro com uma única escrita
+
+        Args:
+            linhas (list): Linhas do quadro, sem quebras de linha
+            limpar (bool): Limpa a tela inteira antes de desenhar (troca de tela)
+        """
+        saida = self.saida
+        if suporta_ansi(saida):
+            saida.write(self.montar(linhas, limpar))
+        else:
+            saida.write("\n".join(linhas) + "\n")
+        saida.flush()
+
+
+# Instância única do processo: há um só terminal
+tela_padrao = RenderizadorTela()